@@ -1,32 +1,53 @@
+import uuid
 import streamlit as st
-from google.cloud import bigquery
-from datetime import datetime
-from data_fetcher import get_user_workouts, get_user_profile
+from datetime import datetime, date
+from data_fetcher import get_user_workouts, get_user_profile, get_user_posts, get_activity_rollup
+from data_gateway import get_gateway
+from read_cache import invalidate
+from feed import fan_out_post
 
 
 
 def insert_post(user_id, content, timestamp=None, image_url=None):
-    project_id = "vivianaramos6techx25"
-    dataset_id = "ISE"
-    table_id = f"{project_id}.{dataset_id}.Posts"
-
-    client = bigquery.Client(project=project_id)
+    client = get_gateway()
 
     if timestamp is None:
         timestamp = datetime.now()
 
     row = {
+        "PostId": f"post_{uuid.uuid4().hex}",
         "AuthorId": user_id,
         "Timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
         "Content": content,
         "ImageUrl": image_url if image_url else None
     }
 
-    errors = client.insert_rows_json(table_id, [row])
+    errors = client.insert_rows_json("Posts", [row])
     if errors:
         raise RuntimeError(f"Failed to insert post: {errors}")
     else:
+        invalidate(user_id, get_user_posts)
         print("Post inserted:", row)
+        _fan_out(user_id, row)
+
+
+def _fan_out(user_id, row):
+    """Pushes a just-written post into the author's friends' feed inboxes."""
+    author = get_user_profile(user_id)
+    if not author:
+        return
+    post = {
+        'user_id': user_id,
+        'post_id': row["PostId"],
+        # Same form as str() of a TIMESTAMP read back from BigQuery, so the
+        # post sorts correctly against inbox entries loaded from the table
+        'timestamp': row["Timestamp"] + "+00:00",
+        'content': row["Content"],
+        'image': row["ImageUrl"],
+        'username': author['username'],
+        'user_image': author['profile_image']
+    }
+    fan_out_post(post, author.get('friends', []))
 
 def activity_page(user_id):
     #This function was generated by ChatGPT
@@ -44,10 +65,11 @@ def activity_page(user_id):
         st.info("No workouts found.")
 
     # --- Activity Summary ---
-    st.subheader("📊 Activity Summary")
-    total_steps = sum(w["steps"] for w in workouts)
-    total_calories = sum(w["calories_burned"] for w in workouts)
-    total_distance = sum(w["distance"] for w in workouts)
+    st.subheader("📊 Today's Activity")
+    today = get_activity_rollup(user_id, "day", date.today())[0]
+    total_steps = today["steps"]
+    total_calories = today["calories"]
+    total_distance = today["distance"]
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Steps", f"{total_steps:,}")
@@ -0,0 +1,129 @@
+#############################################################################
+# activity_rollups.py
+#
+# This file contains the per-user daily and ISO-week activity rollups
+# (steps, calories, distance, workout count, active minutes). The rollups
+# are fed by the workout store: every sync that brings in new workouts adds
+# them to the matching day and week, and a re-read workout that changed
+# (e.g. one that was in progress and has since ended) has its old values
+# subtracted and its new values added, so reading a period's totals is a
+# dictionary lookup instead of a pass over the user's whole history.
+#############################################################################
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from workout_store import MAX_USERS
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ROLLUP_FIELDS = ["steps", "calories", "distance", "workouts", "active_minutes"]
+GRANULARITIES = ("day", "week")
+
+
+def period_start(day, granularity):
+    """Returns the first day of the day/ISO week containing `day`."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "day":
+        return day
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class ActivityRollups:
+    """Daily and weekly activity totals per user, updated incrementally."""
+
+    def __init__(self, max_users=MAX_USERS):
+        self.max_users = max_users
+        # user_id -> {'day': {date: totals}, 'week': {monday: totals}}
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def apply(self, user_id, workouts, reset=False, changed=()):
+        """Adds workouts to the user's rollups (WorkoutStore listener).
+
+        Args:
+            user_id (str): The ID of the user.
+            workouts (list): Workout dictionaries that have not been counted yet.
+            reset (bool): Drop the user's existing rollups first (the workouts
+                are then the user's whole history).
+            changed (list): (old, new) pairs of counted workouts whose values
+                changed; old is taken out of the totals and new put in.
+        """
+        with self._lock:
+            if reset or user_id not in self._users:
+                self._users[user_id] = {granularity: {} for granularity in GRANULARITIES}
+            rollups = self._users[user_id]
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+            try:
+                for workout in workouts:
+                    self._add_workout(rollups, workout)
+                if not reset:
+                    for old, new in changed:
+                        self._add_workout(rollups, old, sign=-1)
+                        self._add_workout(rollups, new)
+            except Exception:
+                # Half-applied totals would be wrong; drop the user so the
+                # next read rebuilds them from a full sync.
+                del self._users[user_id]
+                raise
+
+    def _add_workout(self, rollups, workout, sign=1):
+        # A workout without a start cannot be placed in any period
+        if workout['start_timestamp'] is None:
+            return
+        start = datetime.strptime(workout['start_timestamp'], TIMESTAMP_FORMAT)
+        # A workout still in progress has no end yet and counts as 0 minutes
+        active_minutes = 0.0
+        if workout['end_timestamp'] is not None:
+            end = datetime.strptime(workout['end_timestamp'], TIMESTAMP_FORMAT)
+            active_minutes = max((end - start).total_seconds(), 0) / 60.0
+        values = (
+            workout['steps'] or 0,
+            workout['calories_burned'] or 0,
+            workout['distance'] or 0,
+            1,
+            active_minutes,
+        )
+        for granularity in GRANULARITIES:
+            key = period_start(start.date(), granularity)
+            totals = rollups[granularity].setdefault(key, dict.fromkeys(ROLLUP_FIELDS, 0))
+            for field, value in zip(ROLLUP_FIELDS, values):
+                totals[field] += sign * value
+
+    def has_user(self, user_id):
+        with self._lock:
+            return user_id in self._users
+
+    def get(self, user_id, granularity, start, end):
+        """Returns the user's rollup rows for the periods between start and end.
+
+        Args:
+            granularity (str): 'day' or 'week'.
+            start (date): First day of the range (inclusive).
+            end (date): Last day of the range (inclusive).
+
+        Returns:
+            list: One dict per period in the range, oldest first, with keys
+            period (the period's first day) plus ROLLUP_FIELDS. Periods with
+            no workouts are included with zero totals.
+        """
+        step = timedelta(days=7 if granularity == "week" else 1)
+        first = period_start(start, granularity)
+        last = period_start(end, granularity)
+        with self._lock:
+            rollups = self._users.get(user_id, {}).get(granularity, {})
+            rows = []
+            period = first
+            while period <= last:
+                totals = rollups.get(period, dict.fromkeys(ROLLUP_FIELDS, 0))
+                rows.append({'period': period, **totals})
+                period += step
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
@@ -0,0 +1,105 @@
+#############################################################################
+# activity_rollups_test.py
+#
+# This file contains tests for activity_rollups.py.
+#############################################################################
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from activity_rollups import ActivityRollups
+from workout_store import WorkoutStore
+
+
+def workout(workout_id, start, end, steps=1000, calories=100, distance=1.0):
+    return {
+        'workout_id': workout_id,
+        'start_timestamp': start,
+        'end_timestamp': end,
+        'steps': steps,
+        'calories_burned': calories,
+        'distance': distance,
+    }
+
+
+class TestActivityRollups(unittest.TestCase):
+
+    def test_daily_and_weekly_totals(self):
+        rollups = ActivityRollups()
+        rollups.apply('user1', [
+            workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00'),
+            workout('w2', '2025-04-21 18:00:00', '2025-04-21 18:15:00', steps=500),
+            workout('w3', '2025-04-24 08:00:00', '2025-04-24 09:00:00'),
+        ])
+
+        days = rollups.get('user1', 'day', date(2025, 4, 21), date(2025, 4, 22))
+        week = rollups.get('user1', 'week', date(2025, 4, 23), date(2025, 4, 23))
+
+        self.assertEqual(days[0]['steps'], 1500)
+        self.assertEqual(days[0]['workouts'], 2)
+        self.assertEqual(days[0]['active_minutes'], 45)
+        self.assertEqual(days[1]['steps'], 0)
+        self.assertEqual(week, [{
+            'period': date(2025, 4, 21), 'steps': 2500, 'calories': 300,
+            'distance': 3.0, 'workouts': 3, 'active_minutes': 105,
+        }])
+
+    def test_fed_incrementally_by_workout_store(self):
+        fetch = MagicMock(side_effect=[
+            [workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00')],
+            [workout('w2', '2025-04-21 09:00:00', '2025-04-21 09:30:00'),
+             workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00')],
+        ])
+        store = WorkoutStore(fetch)
+        rollups = ActivityRollups()
+        store.add_listener(rollups.apply)
+
+        store.sync('user1')
+        store.sync('user1')
+
+        day = rollups.get('user1', 'day', date(2025, 4, 21), date(2025, 4, 21))[0]
+        self.assertEqual(day['workouts'], 2)
+        self.assertEqual(day['steps'], 2000)
+
+    def test_changed_workout_replaces_old_values(self):
+        fetch = MagicMock(side_effect=[
+            [workout('w1', '2025-04-21 08:00:00', None, steps=200)],
+            [workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00', steps=1000)],
+        ])
+        store = WorkoutStore(fetch)
+        rollups = ActivityRollups()
+        store.add_listener(rollups.apply)
+
+        store.sync('user1')
+        store.sync('user1')
+
+        day = rollups.get('user1', 'day', date(2025, 4, 21), date(2025, 4, 21))[0]
+        self.assertEqual(day['workouts'], 1)
+        self.assertEqual(day['steps'], 1000)
+        self.assertEqual(day['active_minutes'], 30)
+
+    def test_reset_rebuilds(self):
+        rollups = ActivityRollups()
+        w = workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00')
+        rollups.apply('user1', [w])
+        rollups.apply('user1', [w], reset=True)
+
+        day = rollups.get('user1', 'day', date(2025, 4, 21), date(2025, 4, 21))[0]
+        self.assertEqual(day['workouts'], 1)
+
+    def test_workout_without_end_counts_as_zero_minutes(self):
+        rollups = ActivityRollups()
+        rollups.apply('user1', [
+            workout('w1', '2025-04-21 08:00:00', '2025-04-21 08:30:00'),
+            workout('w2', '2025-04-21 18:00:00', None),
+        ])
+
+        self.assertTrue(rollups.has_user('user1'))
+        day = rollups.get('user1', 'day', date(2025, 4, 21), date(2025, 4, 21))[0]
+        self.assertEqual(day['workouts'], 2)
+        self.assertEqual(day['steps'], 2000)
+        self.assertEqual(day['active_minutes'], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
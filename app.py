@@ -7,13 +7,14 @@
 
 import streamlit as st
 from modules import display_post
-from data_fetcher import get_user_posts, get_user_profile
+from data_fetcher import get_user_posts, get_user_profile, post_cursor
 from community_page import show_community_page
 from activity_page import activity_page
 from fitness_groups import display_fitness_groups, display_group_page
 from goals_page import show_goals_page
 
 userId = 'user1'
+POSTS_PAGE_SIZE = 10
 
 
 def display_app_page():
@@ -77,7 +78,7 @@ def display_user_posts(user_id):
     
     # User posts section
     st.divider()
-    user_posts = get_user_posts(user_id)
+    user_posts, has_more = load_post_pages(user_id, st.session_state.get('my_posts_pages', 1))
     
     if not user_posts:
         st.info("No posts yet. Share your fitness journey!")
@@ -90,6 +91,26 @@ def display_user_posts(user_id):
                 content=post['content'],
                 post_image=post['image']
             )
+        if has_more and st.button("Load more", key="load_more_my_posts"):
+            st.session_state['my_posts_pages'] = st.session_state.get('my_posts_pages', 1) + 1
+            st.rerun()
+
+
+def load_post_pages(user_id, pages):
+    """Returns (posts, has_more) for the first `pages` pages of a user's posts.
+
+    Each page is a separate keyset-paginated (and cached) read, so a rerun
+    only costs as many queries as pages whose cache entry has expired.
+    """
+    posts = []
+    cursor = None
+    for _ in range(pages):
+        page = get_user_posts(user_id, page_size=POSTS_PAGE_SIZE, cursor=cursor)
+        posts.extend(page)
+        if len(page) < POSTS_PAGE_SIZE:
+            return posts, False
+        cursor = post_cursor(page[-1])
+    return posts, True
 
 if __name__ == '__main__':
     st.set_page_config(
@@ -1,7 +1,11 @@
 import streamlit as st
-from data_fetcher import get_user_profile, get_user_posts, get_genai_advice
+from data_fetcher import get_user_profile, get_genai_advice, post_cursor
+from feed import get_feed, refresh_feed
+from social_graph import suggest_friends
 from modules import display_post, display_genai_advice
 
+FEED_PAGE_SIZE = 10
+
 def show_community_page(user_id):
     """Displays the community page with friends' posts and GenAI advice"""
     
@@ -29,22 +33,23 @@ def show_community_page(user_id):
             st.error("User profile not found")
             return
             
-        all_friends_posts = []
-        for friend_id in user_profile.get('friends', []):
-            try:
-                friend_posts = get_user_posts(friend_id)
-                if friend_posts:
-                    all_friends_posts.extend(friend_posts)
-            except Exception as e:
-                st.warning(f"Couldn't load posts for friend {friend_id}")
-                continue
+        # The first page is read fresh from the user's precomputed inbox.
+        # Pages added with "Load more" are fetched once, after the cursor of
+        # the last post shown, and kept in the session until the feed is
+        # refreshed, so reruns never re-read the whole scrolled feed.
+        try:
+            friends_posts = get_feed(user_id, limit=FEED_PAGE_SIZE)
+        except Exception as e:
+            st.warning("Couldn't load your friends' posts")
+            friends_posts = []
+        more_posts = st.session_state.get('feed_more_posts', [])
+        shown = {post['post_id'] for post in friends_posts}
+        friends_posts = friends_posts + [post for post in more_posts if post['post_id'] not in shown]
+        has_more = st.session_state.get('feed_has_more', len(friends_posts) == FEED_PAGE_SIZE)
         
-        # Sort and display posts
-        if all_friends_posts:
-            # Sort by timestamp (newest first)
-            all_friends_posts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            
-            for post in all_friends_posts[:10]:
+        # Display posts
+        if friends_posts:
+            for post in friends_posts:
                 display_post(
                     username=post.get('username', 'Unknown'),
                     user_image=post.get('user_image', 'https://via.placeholder.com/50'),
@@ -52,12 +57,36 @@ def show_community_page(user_id):
                     content=post.get('content', ''),
                     post_image=post.get('image')
                 )
+            if has_more and st.button("Load more", key="load_more_feed"):
+                next_page = get_feed(user_id, limit=FEED_PAGE_SIZE, cursor=post_cursor(friends_posts[-1]))
+                st.session_state['feed_more_posts'] = more_posts + next_page
+                st.session_state['feed_has_more'] = len(next_page) == FEED_PAGE_SIZE
+                st.rerun()
         else:
             st.info("No posts from friends yet. Be the first to post!")
         
         # Refresh button
         if st.button("🔄 Refresh Feed", key="refresh_feed"):
+            st.session_state.pop('feed_more_posts', None)
+            st.session_state.pop('feed_has_more', None)
+            refresh_feed(user_id)
             st.rerun()
+        
+        # Section 3: Friend suggestions, straight from the social graph
+        try:
+            suggestions = suggest_friends(user_id, k=3)
+        except Exception as e:
+            print(f"Could not load friend suggestions for {user_id}: {e}")
+            suggestions = []
+        if suggestions:
+            st.markdown("---")
+            st.header("🤝 People You May Know")
+            for suggested_id, mutual in suggestions:
+                profile = get_user_profile(suggested_id)
+                if not profile:
+                    continue
+                plural = "s" if mutual != 1 else ""
+                st.markdown(f"**{profile['full_name']}** (@{profile['username']}) · {mutual} mutual friend{plural}")
             
     except Exception as e:
         st.error(f"Error loading community page: {str(e)}")
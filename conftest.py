@@ -0,0 +1,39 @@
+import pytest
+
+from data_gateway import get_gateway
+from read_cache import clear_cache
+from data_fetcher import _workout_store, _activity_rollups
+from feed import _inboxes
+from group_calendar import invalidate_calendar
+from group_recommendations import _recommender
+from schedule_conflicts import invalidate_commitments
+from rsvp_engine import _engine as _rsvp_engine
+from social_graph import _graph
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Each test gets a fresh shared client, an empty read cache and empty
+    in-process stores and indexes, so patched bigquery.Client mocks always
+    apply."""
+    get_gateway().reset()
+    clear_cache()
+    _workout_store.clear()
+    _activity_rollups.clear()
+    _inboxes.clear()
+    invalidate_calendar()
+    _recommender.clear()
+    invalidate_commitments()
+    _rsvp_engine.clear()
+    _graph.clear()
+    yield
+    get_gateway().reset()
+    clear_cache()
+    _workout_store.clear()
+    _activity_rollups.clear()
+    _inboxes.clear()
+    invalidate_calendar()
+    _recommender.clear()
+    invalidate_commitments()
+    _rsvp_engine.clear()
+    _graph.clear()
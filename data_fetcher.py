@@ -13,8 +13,17 @@ from vertexai.generative_models import GenerativeModel, GenerationConfig
 # from vertexai.language_models import ChatModel
 from google.cloud import aiplatform
 from datetime import date, timedelta
+from data_gateway import get_gateway
+from read_cache import ReadCache, cached, invalidate
+from goal_suggestions import SuggestionPool
+from workout_store import WorkoutStore
+from activity_rollups import ActivityRollups
+from social_graph import get_friends
 import vertexai
+import numpy as np
+import pyarrow as pa
 import uuid
+import json
 import os
 import random
 import datetime
@@ -51,7 +60,7 @@ import datetime
 # }
 
 
-def get_user_sensor_data(user_id, workout_id):
+def get_user_sensor_data(user_id, workout_id, columnar=False):
     """
     Returns a list of sensor data from the workout.
     
@@ -60,10 +69,17 @@ def get_user_sensor_data(user_id, workout_id):
     - timestamp: When the sensor recorded the value
     - data: The value recorded
     - units: The unit of measurement (e.g., bpm)
+
+    With columnar=True the samples are instead returned as NumPy arrays,
+    built straight from the Arrow result without a Python object per row:
+    a dictionary keyed by sensor_type, where each value is a dictionary with
+    - timestamps: int64 array of epoch milliseconds, in time order
+    - values: float64 array of the recorded values (NaN where missing)
+    - units: The unit of measurement
     """
     PROJECT_ID = "vivianaramos6techx25"
     DATASET_ID = "ISE"
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_gateway()
 
     query = f"""
         SELECT 
@@ -88,6 +104,8 @@ def get_user_sensor_data(user_id, workout_id):
     )
 
     query_job = client.query(query, job_config=job_config)
+    if columnar:
+        return _sensor_columns(query_job.to_arrow())
     results = query_job.result()
 
     sensor_data_list = []
@@ -101,9 +119,86 @@ def get_user_sensor_data(user_id, workout_id):
 
     return sensor_data_list
 
+
+def get_user_sensor_samples(user_id, workout_ids=None):
+    """Returns the sensor samples of many workouts at once, in long format.
+
+    One query covers every requested workout (all of the user's workouts
+    when workout_ids is omitted), and the result is built from Arrow with
+    categorical ID columns, so there is no Python object per sample.
+
+    Args:
+        user_id (str): The ID of the user.
+        workout_ids (list): Optional; only these workouts are included.
+
+    Returns:
+        DataFrame: Columns workout_id (category), sensor_type (category),
+        timestamp (int64 epoch milliseconds) and value (float64), ordered by
+        workout and time.
+    """
+    client = get_gateway()
+
+    workout_filter = "AND sd.WorkoutID IN UNNEST(@workout_ids)" if workout_ids is not None else ""
+    query = f"""
+        SELECT 
+            sd.WorkoutID AS workout_id,
+            st.Name AS sensor_type,
+            sd.Timestamp AS timestamp,
+            sd.SensorValue AS value
+        FROM {client.table('SensorData')} sd
+        JOIN {client.table('SensorTypes')} st
+          ON sd.SensorId = st.SensorId
+        JOIN {client.table('Workouts')} w
+          ON sd.WorkoutID = w.WorkoutId
+        WHERE w.UserId = @user_id
+        {workout_filter}
+        ORDER BY workout_id, timestamp
+    """
+
+    params = [bigquery.ScalarQueryParameter("user_id", "STRING", user_id)]
+    if workout_ids is not None:
+        params.append(bigquery.ArrayQueryParameter("workout_ids", "STRING", list(workout_ids)))
+
+    table = client.query(query, params=params).to_arrow()
+    return pa.table({
+        "workout_id": table.column("workout_id").dictionary_encode(),
+        "sensor_type": table.column("sensor_type").dictionary_encode(),
+        "timestamp": table.column("timestamp").cast(pa.timestamp("ms"), safe=False).cast(pa.int64()),
+        "value": table.column("value").cast(pa.float64()),
+    }).to_pandas()
+
+
+def _sensor_columns(table):
+    """Splits an Arrow table of sensor samples into per-sensor NumPy arrays."""
+    if table.num_rows == 0:
+        return {}
+
+    sensor_types = table.column("sensor_type").combine_chunks().dictionary_encode()
+    codes = sensor_types.indices.to_numpy(zero_copy_only=False)
+    # Timestamps arrive as microsecond TIMESTAMP/DATETIME values
+    timestamps = table.column("timestamp").cast(pa.timestamp("us")).cast(pa.int64())
+    timestamps = timestamps.to_numpy() // 1000
+    values = table.column("data").cast(pa.float64()).to_numpy()
+    units = table.column("units")
+
+    codes_present, first_rows = np.unique(codes, return_index=True)
+    sensors = {}
+    for code, first_row in zip(codes_present, first_rows):
+        mask = codes == code
+        sensors[sensor_types.dictionary[code].as_py()] = {
+            "timestamps": timestamps[mask],
+            "values": values[mask],
+            "units": units[int(first_row)].as_py(),
+        }
+    return sensors
+
+@cached(ttl=120)
 def get_user_workouts(user_id):
     """
     Fetches a list of workouts for a given user from the BigQuery database.
+
+    Workouts are served from the local workout store, which only asks
+    BigQuery for workouts newer than the ones it already holds.
     
     Args:
         user_id (str): The ID of the user.
@@ -113,12 +208,24 @@ def get_user_workouts(user_id):
             workout_id, start_timestamp, end_timestamp, start_lat_lng, 
             end_lat_lng, distance, steps, and calories_burned.
     """
+    return _workout_store.get(user_id)
+
+
+def _fetch_workouts(user_id, since=None):
+    """Reads a user's workouts from BigQuery, newest first.
+
+    Args:
+        user_id (str): The ID of the user.
+        since (str): Optional '%Y-%m-%d %H:%M:%S' start time; only workouts
+            starting at or after it are returned.
+    """
     # Set your project and dataset
     project_id = "vivianaramos6techx25"       # Replace with your actual project ID
     dataset_id = "ISE"      # Replace with your actual dataset name
 
-    client = bigquery.Client(project=project_id)
+    client = get_gateway()
 
+    since_filter = "AND StartTimestamp >= @since" if since is not None else ""
     query = f"""
         SELECT 
             WorkoutId AS workout_id,
@@ -131,14 +238,14 @@ def get_user_workouts(user_id):
             CaloriesBurned AS calories_burned
         FROM `{project_id}.{dataset_id}.Workouts`
         WHERE UserId = @user_id
+        {since_filter}
         ORDER BY StartTimestamp DESC
     """
 
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("user_id", "STRING", user_id)
-        ]
-    )
+    query_parameters = [bigquery.ScalarQueryParameter("user_id", "STRING", user_id)]
+    if since is not None:
+        query_parameters.append(bigquery.ScalarQueryParameter("since", "DATETIME", since))
+    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
 
     query_job = client.query(query, job_config=job_config)
     results = query_job.result()
@@ -159,6 +266,38 @@ def get_user_workouts(user_id):
     return workouts
 
 
+_workout_store = WorkoutStore(_fetch_workouts)
+_activity_rollups = ActivityRollups()
+_workout_store.add_listener(_activity_rollups.apply)
+
+
+def get_activity_rollup(user_id, granularity="day", start=None, end=None):
+    """Returns a user's activity totals per day or ISO week.
+
+    The totals are maintained incrementally from the workout store, so this
+    never scans the user's full workout history.
+
+    Args:
+        user_id (str): The ID of the user.
+        granularity (str): 'day' or 'week'.
+        start (date): First day of the range; defaults to today.
+        end (date): Last day of the range; defaults to start.
+
+    Returns:
+        list: One dict per period, oldest first, with keys period, steps,
+        calories, distance, workouts and active_minutes.
+    """
+    start = start or date.today()
+    end = end or start
+    # Syncing the workout store (on a cache miss) feeds any new workouts
+    # into the rollups.
+    get_user_workouts(user_id)
+    if not _activity_rollups.has_user(user_id):
+        _workout_store.sync(user_id, full=True)
+    return _activity_rollups.get(user_id, granularity, start, end)
+
+
+@cached(ttl=300)
 def get_user_profile(user_id):
     """Returns profile information for a given user including their friends list.
     
@@ -174,10 +313,8 @@ def get_user_profile(user_id):
               - friends (list of friend user_ids)
     """
 
-    from google.cloud import bigquery
-
-    # Initialize BigQuery client with explicit project ID
-    client = bigquery.Client(project="vivianaramos6techx25")  
+    # Shared BigQuery gateway (exposes the project like a client does)
+    client = get_gateway()
 
     profile_query = f"""
         SELECT 
@@ -191,19 +328,6 @@ def get_user_profile(user_id):
             UserId = '{user_id}'
     """
 
-    # Query to get friends list
-    friends_query = f"""
-        SELECT 
-            CASE
-                WHEN UserId1 = '{user_id}' THEN UserId2
-                ELSE UserId1
-            END as friend_id
-        FROM 
-            `{client.project}.ISE.Friends`
-        WHERE 
-            UserId1 = '{user_id}' OR UserId2 = '{user_id}'
-    """
-    
     # Execute queries...
     profile_job = client.query(profile_query)
     profile_result = list(profile_job.result())
@@ -211,9 +335,9 @@ def get_user_profile(user_id):
     if not profile_result:
         return None  # User not found
     
-    # Execute friends query
-    friends_job = client.query(friends_query)
-    friends_result = list(friends_job.result())
+    # Friends come from the in-memory social graph rather than a query
+    # over Friends on every profile read
+    friends = get_friends(user_id)
     
     # Prepare the result dictionary
     user_profile = {
@@ -221,28 +345,40 @@ def get_user_profile(user_id):
         'username': profile_result[0].username,
         'date_of_birth': profile_result[0].date_of_birth,
         'profile_image': profile_result[0].profile_image,
-        'friends': [row.friend_id for row in friends_result]
+        'friends': friends
     }
     
     return user_profile
 
 
 
-def get_user_posts(user_id):
+@cached(ttl=60)
+def get_user_posts(user_id, page_size=None, cursor=None):
     """Returns a list of a user's posts from the database.
+
+    Posts can be read a page at a time with keyset pagination: pass the
+    cursor of the last post of one page (see post_cursor) to get the next.
     
     Args:
         user_id (str): The ID of the user whose posts we want to retrieve
+        page_size (int): Optional; the maximum number of posts to return.
+            All posts are returned when omitted.
+        cursor (tuple): Optional (timestamp, post_id) of the last post already
+            shown; only posts after it (in newest-first order) are returned
         
     Returns:
         list: A list of dictionaries, where each dictionary represents a post with keys:
               user_id, post_id, timestamp, content, and image
     """
-    from google.cloud import bigquery
-
-
-    # Initialize BigQuery client with explicit project
-    client = bigquery.Client(project="vivianaramos6techx25")
+    # Shared BigQuery gateway
+    client = get_gateway()
+
+    cursor_filter, params = _post_page_filter(cursor)
+    params.append(bigquery.ScalarQueryParameter("user_id", "STRING", user_id))
+    limit_clause = ""
+    if page_size is not None:
+        limit_clause = "LIMIT @page_size"
+        params.append(bigquery.ScalarQueryParameter("page_size", "INT64", page_size))
     
     # Query to get posts for the specified user
     query = f"""
@@ -261,30 +397,112 @@ def get_user_posts(user_id):
         ON
             p.AuthorId = u.UserId
         WHERE 
-            p.AuthorId = '{user_id}'
+            p.AuthorId = @user_id
+            {cursor_filter}
         ORDER BY
-            p.Timestamp DESC
+            p.Timestamp DESC, p.PostId DESC
+        {limit_clause}
     """
     
     # Execute the query with timeout
-    query_job = client.query(query)
+    query_job = client.query(query, params=params)
     results = query_job.result() 
     
     # Convert results to list of dictionaries
-    posts = []
-    for row in results:
-        post = {
-            'user_id': row.user_id,
-            'post_id': row.post_id,
-            'timestamp': str(row.timestamp),
-            'content': row.content if row.content else "",
-            'image': row.image if row.image else None,
-            'username': row.username,
-            'user_image': row.user_image
-        }
-        posts.append(post)
-    
-    return posts
+    return [_post_from_row(row) for row in results]
+
+
+def get_posts_for_users(user_ids, limit, before=None, cursor=None):
+    """Returns the newest posts written by any of the given users.
+
+    All authors are fetched with a single query (the IDs are passed as one
+    ARRAY parameter), so the cost does not grow with the number of authors.
+
+    Args:
+        user_ids (list): The IDs of the authors whose posts we want
+        limit (int): The maximum number of posts to return (the page size)
+        before (str or datetime): Optional; only posts strictly older than this
+            timestamp are returned
+        cursor (tuple): Optional (timestamp, post_id) of the last post of the
+            previous page; only posts after it are returned
+
+    Returns:
+        list: Post dictionaries (same keys as get_user_posts), newest first
+    """
+    user_ids = list(user_ids)
+    if not user_ids or limit <= 0:
+        return []
+
+    client = get_gateway()
+
+    cursor_filter, params = _post_page_filter(cursor)
+    before_filter = "AND p.Timestamp < @before" if before is not None else ""
+    query = f"""
+        SELECT 
+            p.PostId as post_id,
+            p.AuthorId as user_id,
+            p.Timestamp as timestamp,
+            p.Content as content,
+            p.ImageUrl as image,
+            u.ImageUrl as user_image,
+            u.Username as username
+        FROM 
+            {client.table('Posts')} p
+        JOIN
+            {client.table('Users')} u
+        ON
+            p.AuthorId = u.UserId
+        WHERE 
+            p.AuthorId IN UNNEST(@user_ids)
+            {before_filter}
+            {cursor_filter}
+        ORDER BY
+            p.Timestamp DESC, p.PostId DESC
+        LIMIT @limit
+    """
+
+    params += [
+        bigquery.ArrayQueryParameter("user_ids", "STRING", user_ids),
+        bigquery.ScalarQueryParameter("limit", "INT64", limit),
+    ]
+    if before is not None:
+        params.append(bigquery.ScalarQueryParameter("before", "TIMESTAMP", before))
+
+    results = client.query(query, params=params).result()
+    return [_post_from_row(row) for row in results]
+
+
+def post_cursor(post):
+    """Returns the keyset cursor (timestamp, post_id) that follows a post."""
+    return (post['timestamp'], post['post_id'])
+
+
+def _post_page_filter(cursor):
+    """Returns the WHERE fragment and parameters that skip every post up to
+    and including the cursor, in (Timestamp DESC, PostId DESC) order."""
+    if cursor is None:
+        return "", []
+    timestamp, post_id = cursor
+    clause = """AND (p.Timestamp < @cursor_ts
+                 OR (p.Timestamp = @cursor_ts AND p.PostId < @cursor_id))"""
+    params = [
+        bigquery.ScalarQueryParameter("cursor_ts", "TIMESTAMP", timestamp),
+        bigquery.ScalarQueryParameter("cursor_id", "STRING", post_id),
+    ]
+    return clause, params
+
+
+def _post_from_row(row):
+    """Converts a Posts query row into the post dictionary used by the UI."""
+    return {
+        'user_id': row.user_id,
+        'post_id': row.post_id,
+        'timestamp': str(row.timestamp),
+        'content': row.content if row.content else "",
+        'image': row.image if row.image else None,
+        'username': row.username,
+        'user_image': row.user_image
+    }
 
 
 def get_genai_advice(user_id, user_input="Give me fitness advice"):
@@ -293,7 +511,7 @@ def get_genai_advice(user_id, user_input="Give me fitness advice"):
         #Used AI to help debug to get the users info from the query as well as help generate query code
         project_id = "vivianaramos6techx25"
         dataset_id = "ISE"
-        client = bigquery.Client(project=project_id)
+        client = get_gateway()
                 
         query = """
             SELECT Name AS name
@@ -347,14 +565,21 @@ def get_genai_advice(user_id, user_input="Give me fitness advice"):
 
 
 
-def get_suggested_goals(user_id): 
-    
+def get_suggested_goals(user_id):
+    """Returns today's suggested weekly goals for a user as a DataFrame
+    (columns Title and TargetValue).
+
+    Suggestions are generated by Gemini at most once per user per day and
+    served from the suggestion pool afterwards; see goal_suggestions.py.
+    """
+    return _suggestion_pool.get(user_id)
+
+
+def _generate_suggested_goals(user_id):
+    """Asks Gemini for 10 weekly goals and parses them into a DataFrame."""
     vertexai.init(project="vivianaramos6techx25", location="us-central1")
     model = GenerativeModel("gemini-2.0-flash")
     import pandas as pd
-    import streamlit as st
-
-    client = bigquery.Client(project="vivianaramos6techx25")
 
     # Prompt Gemini to generate 10 generic weekly fitness goals
     prompt = (
@@ -382,13 +607,17 @@ def get_suggested_goals(user_id):
                 numeric_value = 1.0  # fallback
             generic_goals.append({"Title": title, "TargetValue": numeric_value})
 
-    return pd.DataFrame(generic_goals)
+    return pd.DataFrame(generic_goals, columns=["Title", "TargetValue"])
+
 
+_suggestion_pool = SuggestionPool(_generate_suggested_goals)
 
+
+@cached(ttl=120)
 def get_weekly_goals(user_id):
     PROJECT_ID = "vivianaramos6techx25"
     DATASET_ID = "ISE"
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_gateway()
     query = f"""
         SELECT Title, TargetValue, CurrentValue
         FROM ISE.PersonalGoals
@@ -397,21 +626,21 @@ def get_weekly_goals(user_id):
     return client.query(query).to_dataframe()
 
 def mark_goal_as_completed(user_id, title):
-    from google.cloud import bigquery
-    client = bigquery.Client(project="vivianaramos6techx25")
+    client = get_gateway()
     
     update_query = f"""
         UPDATE ISE.PersonalGoals
         SET IsCompleted = TRUE
         WHERE UserId = '{user_id}' AND Title = '{title}'
     """
-    client.query(update_query)
+    client.query(update_query).result()
+    invalidate(user_id, get_weekly_goals)
 
 
 def get_completed_goals(user_id):
     PROJECT_ID = "vivianaramos6techx25"
     DATASET_ID = "ISE"
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_gateway()
     query = f"""
         SELECT Title, TargetValue, StartDate, EndDate
         FROM ISE.PersonalGoals
@@ -419,9 +648,9 @@ def get_completed_goals(user_id):
     """
     return client.query(query).to_dataframe()
 
+@cached(ttl=600)
 def get_user_achievements(user_id):
-    from google.cloud import bigquery
-    client = bigquery.Client(project="vivianaramos6techx25")
+    client = get_gateway()
 
     query = f"""
         SELECT a.Name, a.Description, ua.EarnedDate
@@ -437,17 +666,19 @@ def get_user_achievements(user_id):
     return df
 
 
+# Generated group goals, keyed by (GroupId, Category, ISO year, ISO week) so a
+# group only hits Vertex AI once per week no matter how many members load it.
+_group_goal_cache = ReadCache()
+GROUP_GOAL_TTL = 7 * 24 * 60 * 60
+# Groups that got the fallback goal (skipped by the model or a failed
+# request) are retried after this long rather than on every rerun.
+GROUP_GOAL_RETRY_TTL = 30 * 60
+
+
 def get_group_goals(user_id):
-    from google.cloud import bigquery
     import pandas as pd
-    from vertexai.generative_models import GenerativeModel, GenerationConfig
-    import vertexai
 
-    # Initialize Vertex AI if not already done in your project setup
-    vertexai.init(project="vivianaramos6techx25", location="us-central1")
-    model = GenerativeModel("gemini-2.0-flash")
-    
-    client = bigquery.Client(project="vivianaramos6techx25")
+    client = get_gateway()
 
     # Step 1: Get all groups where the user is a member
     group_query = f"""
@@ -462,49 +693,96 @@ def get_group_goals(user_id):
         # Return an empty DataFrame if the user is not in any group
         return pd.DataFrame(columns=["Description", "Contribution", "TargetValue", "RewardClaimed", "GroupId", "GroupName"])
 
+    # Step 2: Reuse this week's goal for every group that already has one
+    year, week, _ = date.today().isocalendar()
+    descriptions = {}
+    missing = []
+    for _, row in groups.iterrows():
+        key = ("group_goal", (row["GroupId"], row["Category"], year, week), ())
+        found, description = _group_goal_cache.get(key)
+        if found:
+            descriptions[row["GroupId"]] = description
+        else:
+            missing.append(row)
+
+    # Step 3: Generate goals for all remaining groups with a single prompt
+    if missing:
+        try:
+            generated = _generate_group_goals(pd.DataFrame(missing))
+        except Exception as e:
+            print(f"Error generating group goals: {e}")
+            generated = {}
+        for row in missing:
+            key = ("group_goal", (row["GroupId"], row["Category"], year, week), ())
+            description = generated.get(str(row["GroupId"]))
+            if description:
+                _group_goal_cache.set(key, description, GROUP_GOAL_TTL)
+            else:
+                # If no result is returned, use a fallback message
+                description = f"Participate actively in {row['Name']} activities this week."
+                _group_goal_cache.set(key, description, GROUP_GOAL_RETRY_TTL)
+            descriptions[row["GroupId"]] = description
+
     group_goals = []
-    # Step 2: For each group, generate a specific weekly goal using Gemini
     for _, row in groups.iterrows():
         group_name = row["Name"]
-        category = row["Category"]
-        group_id = row["GroupId"]
-
-        # Construct a detailed prompt to get a measurable goal for the group
-        prompt = (
-            f"You are a fitness coach. Create a short, weekly fitness goal "
-            f"for someone in a {category} group called '{group_name}'. "
-            "The goal should be specific, measurable, and no more than 10 words. "
-            "Example: 'Run 3 miles, 3 times this week.' "
-            "Now, generate a goal for this group:"
-        )
-
-        
-        # Generate the goal from the model
-        response = model.generate_content(prompt)
-        description = response.text.strip()
-
-        # If no result is returned, use a fallback message
-        if not description:
-            description = f"Participate actively in {group_name} activities this week."
+        description = descriptions[row["GroupId"]]
 
         group_goals.append({
             "Description": description,
             "Contribution": 0,   # Default value; this could later be updated with actual progress data
             "TargetValue": 1.0,  # Placeholder target value for display; update as needed
             "RewardClaimed": False,
-            "GroupId": group_id,
+            "GroupId": row["GroupId"],
             "GroupName": group_name
         })
 
     return pd.DataFrame(group_goals)
 
 
+def _generate_group_goals(groups):
+    """Asks Gemini for one weekly goal per group in a single request.
+
+    Args:
+        groups (DataFrame): Rows with GroupId, Name and Category.
+
+    Returns:
+        dict: GroupId -> goal description. Groups the model skipped (or an
+        unparseable response) are simply missing from the dict.
+    """
+    vertexai.init(project="vivianaramos6techx25", location="us-central1")
+    model = GenerativeModel("gemini-2.0-flash")
+
+    group_lines = "\n".join(
+        f"- {row['GroupId']}: a {row['Category']} group called '{row['Name']}'"
+        for _, row in groups.iterrows()
+    )
+    prompt = (
+        "You are a fitness coach. Create a short, weekly fitness goal for someone "
+        "in each of the following groups. Each goal should be specific, measurable, "
+        "and no more than 10 words. Example: 'Run 3 miles, 3 times this week.'\n\n"
+        f"{group_lines}\n\n"
+        "Respond with a JSON object mapping each group ID to its goal."
+    )
+
+    response = model.generate_content(
+        prompt,
+        generation_config=GenerationConfig(response_mime_type="application/json"),
+    )
+    try:
+        goals = json.loads(response.text)
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(goals, dict):
+        return {}
+    return {str(group_id): str(goal).strip() for group_id, goal in goals.items()}
+
+
 
 def check_and_award_goal_achievements(user_id):
-    from google.cloud import bigquery
     from datetime import date
 
-    client = bigquery.Client(project="vivianaramos6techx25")
+    client = get_gateway()
 
     # Count completed personal goals
     count_query = f"""
@@ -534,11 +812,12 @@ def check_and_award_goal_achievements(user_id):
                 INSERT INTO ISE.UserAchievements (UserId, AchievementId, EarnedDate)
                 VALUES ('{user_id}', '{ach['id']}', CURRENT_DATE())
             """
-            client.query(insert_query)
+            client.query(insert_query).result()
+            invalidate(user_id, get_user_achievements)
 
 
 def add_suggested_goal_to_weekly(user_id, title, target_value):
-    client = bigquery.Client()
+    client = get_gateway()
     goal_id = f"pg_{uuid.uuid4().hex[:6]}"
     today = date.today()
     end_date = today + timedelta(days=7)
@@ -560,9 +839,11 @@ def add_suggested_goal_to_weekly(user_id, title, target_value):
         )
     """
     client.query(query).result()
+    invalidate(user_id, get_weekly_goals)
+    _suggestion_pool.discard(user_id, title)
 
 def add_group_goal_to_weekly(user_id, title, target_value):
-    client = bigquery.Client()
+    client = get_gateway()
     goal_id = f"pg_{uuid.uuid4().hex[:6]}"
     today = date.today()
     end_date = today + timedelta(days=7)
@@ -584,3 +865,4 @@ def add_group_goal_to_weekly(user_id, title, target_value):
         )
     """
     client.query(query).result()
+    invalidate(user_id, get_weekly_goals)
@@ -24,7 +24,7 @@ import pandas as pd
 # sys.modules['vertexai'] = MagicMock()
 # sys.modules['vertexai.generative_models'] = MagicMock()
 
-from data_fetcher import get_user_profile, get_user_posts, get_user_sensor_data, get_user_workouts, get_genai_advice
+from data_fetcher import get_user_profile, get_user_posts, get_user_sensor_data, get_user_workouts, get_genai_advice, get_posts_for_users
 
 class TestGetUserProfile(unittest.TestCase):
 
@@ -39,13 +39,13 @@ class TestGetUserProfile(unittest.TestCase):
             mock_profile_row.profile_image = 'http://example.com/alice.jpg'
             mock_profile_job.result.return_value = [mock_profile_row]
 
-            # Mock friends query
+            # Mock social graph query (friendships in either direction)
             mock_friends_job = MagicMock()
-            mock_friend1 = MagicMock()
-            mock_friend1.friend_id = 'user2'
-            mock_friend2 = MagicMock()
-            mock_friend2.friend_id = 'user3'
-            mock_friends_job.result.return_value = [mock_friend1, mock_friend2]
+            mock_friends_job.result.return_value = [
+                MagicMock(Kind='friend', Source='user1', Target='user2'),
+                MagicMock(Kind='friend', Source='user3', Target='user1'),
+                MagicMock(Kind='member', Source='user1', Target='group1'),
+            ]
 
             # Configure side effect for different queries
             mock_client.return_value.query.side_effect = [
@@ -170,6 +170,127 @@ class TestGetUserPosts(unittest.TestCase):
         mock_client_instance.query.assert_called_once()
 
 
+class TestPostPagination(unittest.TestCase):
+    @patch('data_fetcher.bigquery.Client')
+    def test_page_after_cursor(self, mock_client):
+        """A page request is limited and keyed on (timestamp, post_id)"""
+        from data_fetcher import post_cursor
+        mock_client.return_value.query.return_value.result.return_value = []
+        cursor = post_cursor({'timestamp': '2024-01-02 12:00:00', 'post_id': 'post7'})
+
+        get_user_posts('user1', page_size=5, cursor=cursor)
+
+        sql, kwargs = mock_client.return_value.query.call_args
+        self.assertIn('LIMIT @page_size', sql[0])
+        self.assertIn('p.PostId < @cursor_id', sql[0])
+        params = {p.name: p.value for p in kwargs['job_config'].query_parameters}
+        self.assertEqual(params['page_size'], 5)
+        self.assertTrue(str(params['cursor_ts']).startswith('2024-01-02 12:00:00'))
+        self.assertEqual(params['cursor_id'], 'post7')
+
+
+class TestGetPostsForUsers(unittest.TestCase):
+    @patch('data_fetcher.bigquery.Client')
+    def test_single_query_for_all_authors(self, mock_client):
+        """All friends' posts come back from one parameterized query"""
+        mock_row = MagicMock()
+        mock_row.post_id = 'post9'
+        mock_row.user_id = 'user3'
+        mock_row.timestamp = '2024-02-01 09:00:00'
+        mock_row.content = None
+        mock_row.image = None
+        mock_row.username = 'jordan'
+        mock_row.user_image = 'http://example.com/jordan.jpg'
+        mock_client.return_value.query.return_value.result.return_value = [mock_row]
+
+        result = get_posts_for_users(['user2', 'user3', 'user4'], limit=10, before='2024-03-01 00:00:00')
+
+        mock_client.return_value.query.assert_called_once()
+        sql, kwargs = mock_client.return_value.query.call_args
+        self.assertIn('UNNEST(@user_ids)', sql[0])
+        params = {p.name: p for p in kwargs['job_config'].query_parameters}
+        self.assertEqual(params['user_ids'].values, ['user2', 'user3', 'user4'])
+        self.assertEqual(params['limit'].value, 10)
+        self.assertIn('before', params)
+        self.assertEqual(result[0]['post_id'], 'post9')
+        self.assertEqual(result[0]['content'], '')
+
+    @patch('data_fetcher.bigquery.Client')
+    def test_no_authors_skips_query(self, mock_client):
+        self.assertEqual(get_posts_for_users([], limit=10), [])
+        mock_client.return_value.query.assert_not_called()
+
+
+class TestReadCacheInvalidation(unittest.TestCase):
+    @patch('data_fetcher.bigquery.Client')
+    def test_adding_goal_refreshes_weekly_goals(self, mock_client):
+        """Cached weekly goals are re-queried after the user adds a goal"""
+        from data_fetcher import get_weekly_goals, add_suggested_goal_to_weekly
+        mock_client.return_value.query.return_value.to_dataframe.return_value = pd.DataFrame()
+
+        get_weekly_goals('user1')
+        get_weekly_goals('user1')
+        self.assertEqual(mock_client.return_value.query.call_count, 1)
+
+        add_suggested_goal_to_weekly('user1', 'Run 5 miles', 5)
+        get_weekly_goals('user1')
+        self.assertEqual(mock_client.return_value.query.call_count, 3)
+
+
+class TestGetGroupGoals(unittest.TestCase):
+    def setUp(self):
+        from data_fetcher import _group_goal_cache
+        _group_goal_cache.clear()
+
+    @patch('data_fetcher.bigquery.Client')
+    @patch('data_fetcher.vertexai.init')
+    @patch('data_fetcher.GenerativeModel')
+    def test_one_prompt_for_all_groups_then_cached(self, mock_gen_model, mock_vertex_init, mock_client):
+        from data_fetcher import get_group_goals
+        groups = pd.DataFrame({
+            "GroupId": ["g1", "g2", "g3"],
+            "Name": ["Run Club", "Yoga Flow", "Spin"],
+            "Category": ["Running", "Yoga", "Cycling"],
+        })
+        mock_client.return_value.query.return_value.to_dataframe.return_value = groups
+        mock_response = MagicMock()
+        mock_response.text = '{"g1": "Run 10 miles", "g2": "Do yoga 3 times"}'
+        mock_gen_model.return_value.generate_content.return_value = mock_response
+
+        first = get_group_goals("user1")
+        second = get_group_goals("user1")
+
+        # g3 was skipped by the model; its fallback is cached too
+        self.assertEqual(mock_gen_model.return_value.generate_content.call_count, 1)
+        self.assertEqual(list(first["Description"][:2]), ["Run 10 miles", "Do yoga 3 times"])
+        self.assertIn("Spin", first["Description"][2])
+        self.assertEqual(list(second["Description"]), list(first["Description"]))
+
+    @patch('data_fetcher.GROUP_GOAL_RETRY_TTL', -1)
+    @patch('data_fetcher.bigquery.Client')
+    @patch('data_fetcher.vertexai.init')
+    @patch('data_fetcher.GenerativeModel')
+    def test_fallback_goals_are_retried_after_their_ttl(self, mock_gen_model, mock_vertex_init, mock_client):
+        from data_fetcher import get_group_goals
+        groups = pd.DataFrame({"GroupId": ["g1", "g2"], "Name": ["Run Club", "Spin"], "Category": ["Running", "Cycling"]})
+        mock_client.return_value.query.return_value.to_dataframe.return_value = groups
+        mock_gen_model.return_value.generate_content.side_effect = [
+            MagicMock(text='{"g1": "Run 10 miles"}'),
+            Exception("quota exceeded"),
+        ]
+
+        get_group_goals("user1")
+        second = get_group_goals("user1")
+
+        # Only the group that got the fallback is asked for again
+        self.assertEqual(mock_gen_model.return_value.generate_content.call_count, 2)
+        retry_prompt = mock_gen_model.return_value.generate_content.call_args[0][0]
+        self.assertIn("g2", retry_prompt)
+        self.assertNotIn("g1", retry_prompt)
+        self.assertEqual(second["Description"][0], "Run 10 miles")
+        self.assertIn("Spin", second["Description"][1])
+
+
 class TestGetUserSensorData(unittest.TestCase):
     def test_get_user_sensor_data(self):
         with patch('data_fetcher.bigquery.Client') as mock_client:
@@ -194,6 +315,31 @@ class TestGetUserSensorData(unittest.TestCase):
             self.assertEqual(result[0]['units'], 'bpm')
 
 
+    def test_get_user_sensor_data_columnar(self):
+        import datetime as dt
+        import numpy as np
+        import pyarrow as pa
+        with patch('data_fetcher.bigquery.Client') as mock_client:
+            start = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+            mock_client.return_value.query.return_value.to_arrow.return_value = pa.table({
+                'sensor_type': ['Heart Rate', 'Speed', 'Heart Rate'],
+                'timestamp': [start, start + dt.timedelta(seconds=1), start + dt.timedelta(seconds=2)],
+                'data': [70, 3, 72],
+                'units': ['bpm', 'm/s', 'bpm'],
+            })
+
+            result = get_user_sensor_data('user_123', 'workout_456', columnar=True)
+
+            heart_rate = result['Heart Rate']
+            self.assertEqual(heart_rate['units'], 'bpm')
+            self.assertEqual(heart_rate['timestamps'].dtype, np.int64)
+            self.assertEqual(heart_rate['values'].dtype, np.float64)
+            self.assertListEqual(heart_rate['timestamps'].tolist(), [1704067200000, 1704067202000])
+            self.assertListEqual(heart_rate['values'].tolist(), [70.0, 72.0])
+            self.assertListEqual(result['Speed']['values'].tolist(), [3.0])
+            mock_client.return_value.query.return_value.result.assert_not_called()
+
+
 class TestGetUserWorkouts(unittest.TestCase):
     def test_get_user_workouts(self):
         with patch('data_fetcher.bigquery.Client') as mock_client:
@@ -0,0 +1,92 @@
+#############################################################################
+# data_gateway.py
+#
+# This file contains the shared BigQuery gateway. Every function that talks
+# to BigQuery (data_fetcher, fitness_groups, activity_page) goes through the
+# single gateway returned by get_gateway(), so the client, its credentials
+# and its HTTP connections are set up once per process instead of once per
+# query.
+#############################################################################
+
+import threading
+
+from google.cloud import bigquery
+from requests.adapters import HTTPAdapter
+
+PROJECT_ID = "vivianaramos6techx25"
+DATASET_ID = "ISE"
+
+# Streamlit runs every session on its own thread, so the default urllib3
+# pool of 10 connections would throw connections away under load.
+HTTP_POOL_SIZE = 32
+
+
+class BigQueryGateway:
+    """Owns one long-lived BigQuery client and its pooled HTTP session.
+
+    The client is built lazily on the first query and then reused by every
+    caller. query() has the same call shape as bigquery.Client.query, so
+    existing code can hold a gateway wherever it used to hold a client.
+    """
+
+    def __init__(self, project=PROJECT_ID, dataset=DATASET_ID, pool_size=HTTP_POOL_SIZE):
+        self.project = project
+        self.dataset = dataset
+        self.pool_size = pool_size
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The shared bigquery.Client, created on first access."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def _build_client(self):
+        client = bigquery.Client(project=self.project)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        # _http is the client's AuthorizedSession; mounting a wider adapter
+        # keeps connections alive across concurrent Streamlit sessions.
+        client._http.mount("https://", adapter)
+        return client
+
+    def table(self, name):
+        """Returns the fully qualified, backtick-quoted name of a table."""
+        return f"`{self.project}.{self.dataset}.{name}`"
+
+    def query(self, sql, job_config=None, params=None):
+        """Starts a query job on the shared client.
+
+        Args:
+            sql (str): The SQL to run.
+            job_config (bigquery.QueryJobConfig): Optional job configuration.
+            params (list): Optional query parameters; shorthand for a
+                QueryJobConfig with only query_parameters set.
+
+        Returns:
+            bigquery.QueryJob: The started job (call .result() or
+            .to_dataframe() on it).
+        """
+        if params is not None:
+            job_config = bigquery.QueryJobConfig(query_parameters=params)
+        return self.client.query(sql, job_config=job_config)
+
+    def insert_rows_json(self, table_name, rows):
+        """Streams rows into a table of the dataset and returns any errors."""
+        return self.client.insert_rows_json(f"{self.project}.{self.dataset}.{table_name}", rows)
+
+    def reset(self):
+        """Drops the shared client so the next query builds a fresh one."""
+        with self._lock:
+            self._client = None
+
+
+_gateway = BigQueryGateway()
+
+
+def get_gateway():
+    """Returns the process-wide BigQueryGateway."""
+    return _gateway
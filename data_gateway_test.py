@@ -0,0 +1,55 @@
+#############################################################################
+# data_gateway_test.py
+#
+# This file contains tests for data_gateway.py.
+#############################################################################
+import unittest
+from unittest.mock import patch
+
+from data_gateway import BigQueryGateway, get_gateway
+
+
+class TestBigQueryGateway(unittest.TestCase):
+
+    @patch('data_gateway.bigquery.Client')
+    def test_client_is_built_once(self, mock_client):
+        gateway = BigQueryGateway()
+
+        gateway.query("SELECT 1")
+        gateway.query("SELECT 2")
+
+        mock_client.assert_called_once_with(project='vivianaramos6techx25')
+        self.assertEqual(mock_client.return_value.query.call_count, 2)
+        mock_client.return_value._http.mount.assert_called_once()
+
+    @patch('data_gateway.bigquery.Client')
+    def test_query_params_build_job_config(self, mock_client):
+        gateway = BigQueryGateway()
+        params = [gateway_param('user_id', 'user1')]
+
+        gateway.query("SELECT @user_id", params=params)
+
+        _, kwargs = mock_client.return_value.query.call_args
+        self.assertEqual(kwargs['job_config'].query_parameters, params)
+
+    @patch('data_gateway.bigquery.Client')
+    def test_reset_rebuilds_client(self, mock_client):
+        gateway = BigQueryGateway()
+        gateway.query("SELECT 1")
+        gateway.reset()
+        gateway.query("SELECT 1")
+
+        self.assertEqual(mock_client.call_count, 2)
+
+    def test_table_and_shared_instance(self):
+        self.assertEqual(BigQueryGateway().table('Posts'), '`vivianaramos6techx25.ISE.Posts`')
+        self.assertIs(get_gateway(), get_gateway())
+
+
+def gateway_param(name, value):
+    from google.cloud import bigquery
+    return bigquery.ScalarQueryParameter(name, "STRING", value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#############################################################################
+# downsampling.py
+#
+# This file contains the downsampling stage that turns a workout's raw
+# sensor streams into chart-ready series. A marathon recorded at 1 Hz has
+# tens of thousands of samples per sensor, far more than a chart can show,
+# so series are reduced to a target number of points before they are sent
+# to the browser:
+#
+# - Largest-Triangle-Three-Buckets (LTTB) keeps the visual shape of smooth
+#   signals such as speed or cadence.
+# - Min/max buckets keep every peak and trough, which matters for heart
+#   rate where the extremes are the interesting part.
+#
+# Downsampled series are cached per (user_id, workout_id, sensor_type,
+# resolution) in the shared read cache, so read_cache.invalidate(user_id)
+# and clear_cache() drop them along with the user's other cached reads.
+#############################################################################
+
+import numpy as np
+
+from data_fetcher import get_user_sensor_data
+from read_cache import shared_cache
+
+DEFAULT_RESOLUTION = 500
+
+# Sensor data is immutable once a workout is recorded, so cached series can
+# live for a long time; the LRU bound keeps memory in check.
+CHART_SERIES_TTL = 6 * 60 * 60
+
+# Sensors downsampled with min/max buckets; everything else uses LTTB.
+MINMAX_SENSORS = {"Heart Rate"}
+
+_series_cache = shared_cache()
+
+
+def lttb(x, y, threshold):
+    """Downsamples (x, y) to `threshold` points with Largest-Triangle-Three-Buckets.
+
+    Args:
+        x (np.ndarray): Sample positions (e.g. timestamps), increasing.
+        y (np.ndarray): Sample values.
+        threshold (int): Number of points to keep.
+
+    Returns:
+        tuple: (x, y) arrays of the kept points. The first and last points
+        are always kept. Series already at or under the threshold are
+        returned unchanged.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    xf = x.astype(np.float64)
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # The third triangle point is the average of the next bucket
+        avg_start = end
+        avg_end = max(min(int((i + 2) * every) + 1, n), avg_start + 1)
+        avg_x = xf[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        ax, ay = xf[a], y[a]
+        areas = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - xf[start:end]) * (avg_y - ay))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+
+    return x[kept], y[kept]
+
+
+def minmax(x, y, threshold):
+    """Downsamples (x, y) to at most `threshold` points by keeping the minimum
+    and maximum of each bucket, in time order.
+
+    Returns the series unchanged when it is already small enough.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 2:
+        return x, y
+
+    buckets = threshold // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        low = start + int(np.argmin(y[start:end]))
+        high = start + int(np.argmax(y[start:end]))
+        kept.extend(sorted({low, high}))
+
+    kept = np.asarray(kept, dtype=np.int64)
+    return x[kept], y[kept]
+
+
+def downsample(sensor_type, timestamps, values, resolution=DEFAULT_RESOLUTION):
+    """Downsamples one sensor series with the mode that suits the sensor.
+
+    Missing (NaN) values are dropped first.
+    """
+    timestamps = np.asarray(timestamps)
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    timestamps, values = timestamps[present], values[present]
+    if sensor_type in MINMAX_SENSORS:
+        return minmax(timestamps, values, resolution)
+    return lttb(timestamps, values, resolution)
+
+
+def get_chart_series(user_id, workout_id, sensor_type, resolution=DEFAULT_RESOLUTION):
+    """Returns a chart-ready, downsampled series for one sensor of a workout.
+
+    On a cache miss every sensor of the workout is fetched once (in columnar
+    form) and downsampled, so charting several sensors of the same workout
+    costs a single query.
+
+    Returns:
+        dict: timestamps (int64 epoch ms), values (float64) and units, or
+        None if the workout has no data for that sensor. The arrays are
+        shared with the cache and should be treated as read-only.
+
+    Series are cached per user, since get_user_sensor_data only returns a
+    workout's data to its owner. A missing series is not cached, so it shows
+    up as soon as the samples are uploaded.
+    """
+    key = ("chart_series", (user_id, workout_id, sensor_type, resolution), ())
+    found, series = _series_cache.get(key)
+    if found:
+        return series
+
+    sensors = get_user_sensor_data(user_id, workout_id, columnar=True)
+    result = None
+    for name, sensor in sensors.items():
+        timestamps, values = downsample(name, sensor["timestamps"], sensor["values"], resolution)
+        series = {"timestamps": timestamps, "values": values, "units": sensor["units"]}
+        _series_cache.set(("chart_series", (user_id, workout_id, name, resolution), ()), series, CHART_SERIES_TTL)
+        if name == sensor_type:
+            result = series
+    return result
@@ -0,0 +1,112 @@
+#############################################################################
+# downsampling_test.py
+#
+# This file contains tests for downsampling.py.
+#############################################################################
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from downsampling import lttb, minmax, downsample, get_chart_series
+from read_cache import invalidate
+
+
+class TestLTTB(unittest.TestCase):
+
+    def test_reduces_to_threshold_and_keeps_endpoints(self):
+        x = np.arange(15000, dtype=np.int64)
+        y = np.sin(x / 500.0)
+
+        dx, dy = lttb(x, y, 300)
+
+        self.assertEqual(len(dx), 300)
+        self.assertEqual(dx[0], 0)
+        self.assertEqual(dx[-1], 14999)
+        self.assertTrue(np.all(np.diff(dx) > 0))
+
+    def test_keeps_a_spike(self):
+        x = np.arange(1000)
+        y = np.zeros(1000)
+        y[437] = 50.0
+
+        _, dy = lttb(x, y, 20)
+
+        self.assertIn(50.0, dy)
+
+    def test_small_series_unchanged(self):
+        dx, dy = lttb([1, 2, 3], [4, 5, 6], 10)
+        self.assertListEqual(dx.tolist(), [1, 2, 3])
+
+
+class TestMinMax(unittest.TestCase):
+
+    def test_keeps_extremes_in_order(self):
+        x = np.arange(10000)
+        y = np.full(10000, 120.0)
+        y[1234] = 190.0
+        y[8765] = 60.0
+
+        dx, dy = minmax(x, y, 200)
+
+        self.assertLessEqual(len(dx), 200)
+        self.assertIn(190.0, dy)
+        self.assertIn(60.0, dy)
+        self.assertTrue(np.all(np.diff(dx) > 0))
+
+    def test_heart_rate_uses_minmax_and_drops_nan(self):
+        values = np.array([100.0, np.nan, 150.0, 90.0])
+        dx, dy = downsample("Heart Rate", np.arange(4), values, resolution=500)
+        self.assertListEqual(dy.tolist(), [100.0, 150.0, 90.0])
+
+
+class TestGetChartSeries(unittest.TestCase):
+
+    @patch('downsampling.get_user_sensor_data')
+    def test_one_fetch_serves_every_sensor(self, mock_sensor_data):
+        mock_sensor_data.return_value = {
+            'Heart Rate': {'timestamps': np.arange(2000), 'values': np.full(2000, 130.0), 'units': 'bpm'},
+            'Speed': {'timestamps': np.arange(2000), 'values': np.linspace(0, 5, 2000), 'units': 'm/s'},
+        }
+
+        heart_rate = get_chart_series('user1', 'workout1', 'Heart Rate', resolution=100)
+        speed = get_chart_series('user1', 'workout1', 'Speed', resolution=100)
+        again = get_chart_series('user1', 'workout1', 'Heart Rate', resolution=100)
+
+        mock_sensor_data.assert_called_once_with('user1', 'workout1', columnar=True)
+        self.assertLessEqual(len(heart_rate['values']), 100)
+        self.assertEqual(len(speed['values']), 100)
+        self.assertEqual(speed['units'], 'm/s')
+        self.assertIs(again, heart_rate)
+
+    @patch('downsampling.get_user_sensor_data', return_value={})
+    def test_missing_sensor_is_not_cached(self, mock_sensor_data):
+        self.assertIsNone(get_chart_series('user1', 'workout1', 'Cadence'))
+        self.assertIsNone(get_chart_series('user1', 'workout1', 'Cadence'))
+        self.assertEqual(mock_sensor_data.call_count, 2)
+
+    @patch('downsampling.get_user_sensor_data')
+    def test_series_are_cached_per_user(self, mock_sensor_data):
+        mock_sensor_data.side_effect = lambda user_id, workout_id, columnar: {
+            'Speed': {'timestamps': np.arange(10), 'values': np.ones(10), 'units': 'm/s'},
+        } if user_id == 'owner' else {}
+
+        self.assertIsNotNone(get_chart_series('owner', 'workout1', 'Speed'))
+        self.assertIsNone(get_chart_series('stranger', 'workout1', 'Speed'))
+        self.assertEqual(mock_sensor_data.call_count, 2)
+
+    @patch('downsampling.get_user_sensor_data')
+    def test_invalidating_the_user_drops_their_series(self, mock_sensor_data):
+        mock_sensor_data.return_value = {
+            'Speed': {'timestamps': np.arange(10), 'values': np.ones(10), 'units': 'm/s'},
+        }
+
+        get_chart_series('user1', 'workout1', 'Speed')
+        invalidate('user1')
+        get_chart_series('user1', 'workout1', 'Speed')
+
+        self.assertEqual(mock_sensor_data.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+#############################################################################
+# feed.py
+#
+# This file contains the materialized friend feed shown on the Community
+# tab. Each user has a bounded inbox of their friends' newest posts. When a
+# post is written, insert_post fans it out into the inboxes of the author's
+# friends, so opening the Community tab is a read of precomputed entries
+# rather than a query over every friend's posts.
+#
+# - Inboxes are built on first read (or after they expire) from a single
+#   batched query, and are trimmed to FEED_LENGTH entries. Reading past the
+#   end of an inbox falls back to the batched query.
+# - Authors with more than FANOUT_LIMIT friends are not fanned out; their
+#   posts are merged in at read time instead.
+# - Inboxes live in this process only, so they expire after FEED_TTL to pick
+#   up posts fanned out by other app instances.
+#
+# Pages that need posts from more than one source (the inbox, the query
+# fallback, high-fanout authors) are put together with merge_streams, a lazy
+# k-way merge that stops reading as soon as the page is full.
+#############################################################################
+
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from data_fetcher import get_user_profile, get_posts_for_users
+
+FEED_LENGTH = 100
+FANOUT_LIMIT = 1000
+FEED_TTL = 5 * 60
+MAX_INBOXES = 1024
+
+
+def _sort_key(post):
+    """Feed order is (timestamp, post_id), newest first."""
+    return (post['timestamp'], post['post_id'])
+
+
+class FeedInboxes:
+    """Bounded, newest-first inboxes of post dictionaries, one per user."""
+
+    def __init__(self, length=FEED_LENGTH, ttl=FEED_TTL, max_inboxes=MAX_INBOXES):
+        self.length = length
+        self.ttl = ttl
+        self.max_inboxes = max_inboxes
+        # user_id -> {'keys': [...], 'posts': [...], 'complete': bool, 'expires_at': float}
+        # keys/posts are kept in ascending order so new posts are appended.
+        self._inboxes = OrderedDict()
+        self._high_fanout_authors = set()
+        self._lock = threading.Lock()
+
+    def warm(self, user_id, posts, complete):
+        """Replaces a user's inbox with posts (any order).
+
+        complete says whether posts are all of the user's feed, i.e. reading
+        past the end of the inbox needs no fallback query.
+        """
+        ordered = sorted(posts, key=_sort_key)[-self.length:]
+        with self._lock:
+            self._inboxes[user_id] = {
+                'keys': [_sort_key(p) for p in ordered],
+                'posts': ordered,
+                'complete': complete and len(posts) <= self.length,
+                'expires_at': time.monotonic() + self.ttl,
+            }
+            self._inboxes.move_to_end(user_id)
+            while len(self._inboxes) > self.max_inboxes:
+                self._inboxes.popitem(last=False)
+
+    def fan_out(self, post, follower_ids):
+        """Adds a new post to the warm inboxes of the given followers.
+
+        Returns:
+            bool: False if the author has too many followers to fan out to;
+            their posts are then merged in at read time.
+        """
+        follower_ids = list(follower_ids)
+        with self._lock:
+            if len(follower_ids) > FANOUT_LIMIT:
+                self._high_fanout_authors.add(post['user_id'])
+                return False
+            key = _sort_key(post)
+            for follower_id in follower_ids:
+                inbox = self._inboxes.get(follower_id)
+                if inbox is None:
+                    continue  # cold inboxes are built on their next read
+                position = bisect.bisect(inbox['keys'], key)
+                inbox['keys'].insert(position, key)
+                inbox['posts'].insert(position, post)
+                if len(inbox['posts']) > self.length:
+                    del inbox['keys'][0]
+                    del inbox['posts'][0]
+                    inbox['complete'] = False
+            return True
+
+    def read(self, user_id, limit, cursor=None):
+        """Returns (posts, exhausted) from a warm inbox, or None if it is cold.
+
+        posts are newest first and strictly after cursor. exhausted is True
+        when the inbox ran out before `limit` posts and may not hold the
+        user's whole feed.
+        """
+        with self._lock:
+            inbox = self._inboxes.get(user_id)
+            if inbox is None or inbox['expires_at'] <= time.monotonic():
+                return None
+            end = len(inbox['keys']) if cursor is None else bisect.bisect_left(inbox['keys'], tuple(cursor))
+            posts = inbox['posts'][max(end - limit, 0):end][::-1]
+            exhausted = len(posts) < limit and not inbox['complete']
+            return posts, exhausted
+
+    def high_fanout_authors(self, author_ids):
+        """Returns the authors among author_ids whose posts are not fanned out."""
+        with self._lock:
+            return [a for a in author_ids if a in self._high_fanout_authors]
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._inboxes.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._inboxes.clear()
+            self._high_fanout_authors.clear()
+
+
+_inboxes = FeedInboxes()
+
+
+def fan_out_post(post, follower_ids):
+    """Delivers a newly written post to its author's friends' inboxes."""
+    return _inboxes.fan_out(post, follower_ids)
+
+
+def refresh_feed(user_id):
+    """Drops a user's inbox so the next read rebuilds it from BigQuery."""
+    _inboxes.invalidate(user_id)
+
+
+def get_feed(user_id, limit, cursor=None):
+    """Returns a page of a user's friend feed, newest first.
+
+    Args:
+        user_id (str): The ID of the user whose feed we want
+        limit (int): The maximum number of posts to return
+        cursor (tuple): Optional (timestamp, post_id) of the last post already
+            shown (see data_fetcher.post_cursor)
+
+    Returns:
+        list: Post dictionaries (same keys as get_user_posts)
+    """
+    profile = get_user_profile(user_id)
+    friends = profile.get('friends', []) if profile else []
+    if not friends:
+        return []
+
+    page = _inboxes.read(user_id, limit, cursor)
+    if page is None:
+        posts = get_posts_for_users(friends, limit=FEED_LENGTH)
+        _inboxes.warm(user_id, posts, complete=len(posts) < FEED_LENGTH)
+        page = _inboxes.read(user_id, limit, cursor)
+    posts, exhausted = page
+
+    high_fanout = _inboxes.high_fanout_authors(friends)
+    if not exhausted and not high_fanout:
+        return posts
+
+    inbox = iter(posts)
+    if exhausted:
+        # Past the end of the inbox: continue straight from BigQuery
+        after = _sort_key(posts[-1]) if posts else cursor
+        fallback = paged_stream(
+            lambda size, page_cursor: get_posts_for_users(friends, limit=size, cursor=page_cursor),
+            page_size=limit - len(posts), cursor=after,
+        )
+        inbox = itertools.chain(inbox, fallback)
+    streams = [inbox]
+    if high_fanout:
+        streams.append(paged_stream(
+            lambda size, page_cursor: get_posts_for_users(high_fanout, limit=size, cursor=page_cursor),
+            page_size=limit, cursor=cursor,
+        ))
+    return merge_streams(streams, limit)
+
+
+def paged_stream(read_page, page_size, cursor=None):
+    """Yields posts newest first from a keyset-paginated reader.
+
+    Args:
+        read_page: Callable read_page(page_size, cursor) returning one page of
+            posts, newest first (e.g. get_posts_for_users or get_user_posts).
+        page_size (int): Number of posts requested per page.
+        cursor (tuple): Optional (timestamp, post_id) to start after.
+
+    The next page is only read once the previous one has been consumed, so a
+    consumer that stops early never triggers the extra queries.
+    """
+    while True:
+        page = read_page(page_size, cursor)
+        yield from page
+        if len(page) < page_size:
+            return
+        cursor = _sort_key(page[-1])
+
+
+def merge_streams(streams, limit):
+    """Merges newest-first post streams into one page of at most `limit` posts.
+
+    Args:
+        streams (list): Iterables of post dictionaries, each already ordered
+            newest first. Lists and generators (such as paged_stream) both
+            work.
+        limit (int): The page size.
+
+    The merge keeps one pending post per stream in a heap and stops as soon
+    as the page is full, so memory and reads are proportional to the page
+    size rather than to the streams' full length. Posts that appear in more
+    than one stream are only returned once.
+    """
+    page = []
+    if limit <= 0:
+        return page
+    seen = set()
+    for post in heapq.merge(*streams, key=_sort_key, reverse=True):
+        if post['post_id'] in seen:
+            continue
+        seen.add(post['post_id'])
+        page.append(post)
+        if len(page) >= limit:
+            break
+    return page
@@ -0,0 +1,132 @@
+#############################################################################
+# feed_test.py
+#
+# This file contains tests for feed.py.
+#############################################################################
+import unittest
+from unittest.mock import MagicMock, patch
+
+from feed import FeedInboxes, get_feed, fan_out_post, merge_streams, paged_stream, _inboxes
+
+
+def post(post_id, timestamp, user_id='friend1'):
+    return {'post_id': post_id, 'timestamp': timestamp, 'user_id': user_id}
+
+
+class TestFeedInboxes(unittest.TestCase):
+
+    def test_cold_inbox_reads_as_none(self):
+        self.assertIsNone(FeedInboxes().read('user1', 10))
+
+    def test_fan_out_inserts_in_order_and_trims(self):
+        inboxes = FeedInboxes(length=3)
+        inboxes.warm('user1', [post('p1', '2024-01-01'), post('p3', '2024-01-03')], complete=True)
+
+        inboxes.fan_out(post('p2', '2024-01-02'), ['user1', 'cold_user'])
+        inboxes.fan_out(post('p4', '2024-01-04'), ['user1'])
+
+        posts, exhausted = inboxes.read('user1', 10)
+        self.assertEqual([p['post_id'] for p in posts], ['p4', 'p3', 'p2'])
+        # p1 was trimmed, so the inbox no longer holds the whole feed
+        self.assertTrue(exhausted)
+        self.assertIsNone(inboxes.read('cold_user', 10))
+
+    def test_read_after_cursor(self):
+        inboxes = FeedInboxes()
+        inboxes.warm('user1', [post(f'p{i}', f'2024-01-0{i}') for i in range(1, 6)], complete=True)
+
+        posts, exhausted = inboxes.read('user1', 2, cursor=('2024-01-04', 'p4'))
+
+        self.assertEqual([p['post_id'] for p in posts], ['p3', 'p2'])
+        self.assertFalse(exhausted)
+
+    @patch('feed.FANOUT_LIMIT', 2)
+    def test_high_fanout_authors_are_not_fanned_out(self):
+        inboxes = FeedInboxes()
+        inboxes.warm('user1', [], complete=True)
+
+        delivered = inboxes.fan_out(post('p1', '2024-01-01', 'celebrity'), ['user1', 'user2', 'user3'])
+
+        self.assertFalse(delivered)
+        self.assertEqual(inboxes.read('user1', 10), ([], False))
+        self.assertEqual(inboxes.high_fanout_authors(['celebrity', 'friend1']), ['celebrity'])
+
+
+class TestGetFeed(unittest.TestCase):
+
+    @patch('feed.get_posts_for_users')
+    @patch('feed.get_user_profile')
+    def test_builds_inbox_once_then_serves_fan_out(self, mock_profile, mock_posts):
+        mock_profile.return_value = {'friends': ['friend1', 'friend2']}
+        mock_posts.return_value = [post('p1', '2024-01-01')]
+
+        self.assertEqual([p['post_id'] for p in get_feed('user1', 10)], ['p1'])
+        fan_out_post(post('p2', '2024-01-02', 'friend2'), ['user1'])
+        result = get_feed('user1', 10)
+
+        mock_posts.assert_called_once_with(['friend1', 'friend2'], limit=100)
+        self.assertEqual([p['post_id'] for p in result], ['p2', 'p1'])
+
+    @patch('feed.get_posts_for_users')
+    @patch('feed.get_user_profile')
+    def test_reading_past_inbox_falls_back_to_query(self, mock_profile, mock_posts):
+        mock_profile.return_value = {'friends': ['friend1']}
+        _inboxes.warm('user1', [post('p2', '2024-01-02')], complete=False)
+        mock_posts.return_value = [post('p1', '2024-01-01')]
+
+        result = get_feed('user1', 2)
+
+        mock_posts.assert_called_once_with(['friend1'], limit=1, cursor=('2024-01-02', 'p2'))
+        self.assertEqual([p['post_id'] for p in result], ['p2', 'p1'])
+
+    @patch('feed.get_posts_for_users')
+    @patch('feed.get_user_profile')
+    def test_no_friends_means_no_query(self, mock_profile, mock_posts):
+        mock_profile.return_value = {'friends': []}
+
+        self.assertEqual(get_feed('user1', 10), [])
+        mock_posts.assert_not_called()
+
+
+class TestMergeStreams(unittest.TestCase):
+
+    def test_merges_sorted_lists_newest_first(self):
+        a = [post('a3', '2024-01-06'), post('a2', '2024-01-03'), post('a1', '2024-01-01')]
+        b = [post('b2', '2024-01-05'), post('b1', '2024-01-02')]
+
+        result = merge_streams([a, b], limit=4)
+
+        self.assertEqual([p['post_id'] for p in result], ['a3', 'b2', 'a2', 'b1'])
+
+    def test_duplicates_are_returned_once(self):
+        shared = post('p1', '2024-01-01')
+
+        result = merge_streams([[shared], [shared]], limit=10)
+
+        self.assertEqual(result, [shared])
+
+    def test_stops_reading_pages_once_full(self):
+        pages = {
+            None: [post('a4', '2024-01-04'), post('a3', '2024-01-03')],
+            ('2024-01-03', 'a3'): [post('a2', '2024-01-02'), post('a1', '2024-01-01')],
+        }
+        read_page = MagicMock(side_effect=lambda size, cursor: pages[cursor])
+        other = [post('b1', '2024-01-05')]
+
+        result = merge_streams([paged_stream(read_page, page_size=2), other], limit=3)
+
+        self.assertEqual([p['post_id'] for p in result], ['b1', 'a4', 'a3'])
+        # The second page is never needed
+        read_page.assert_called_once_with(2, None)
+
+    def test_paged_stream_reads_until_short_page(self):
+        read_page = MagicMock(side_effect=[[post('p2', '2024-01-02')], []])
+
+        result = list(paged_stream(read_page, page_size=1))
+
+        self.assertEqual([p['post_id'] for p in result], ['p2'])
+        read_page.assert_called_with(1, ('2024-01-02', 'p2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
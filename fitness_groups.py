@@ -4,6 +4,17 @@ import pandas as pd
 from datetime import datetime, time as dtime, timezone, timedelta
 import uuid
 import calendar
+from data_gateway import get_gateway
+from read_cache import cached, invalidate
+from group_calendar import get_day_events, invalidate_calendar
+from group_search import get_search_index, catalog_version
+from group_recommendations import get_recommended_groups, record_membership_change
+from schedule_conflicts import find_conflicts, invalidate_commitments, describe_conflicts
+from rsvp_engine import rsvp, get_event_states, invalidate_events, ALREADY_ATTENDING, ALREADY_WAITLISTED, WAITLISTED
+from recurring_events import (
+    expand_occurrences, fetch_group_rules, create_recurring_event, cancel_occurrence, parse_occurrence_id
+)
+from social_graph import get_co_members, record_membership
 
 # Free stock image URLs for different categories
 GROUP_IMAGES = {
@@ -18,21 +29,52 @@ def get_group_image(category):
     """Returns appropriate free-to-use image based on group category"""
     return GROUP_IMAGES.get(category, GROUP_IMAGES["Default"])
 
-def get_member_count(client, group_id):
-    """Helper function to get member count for a group"""
-    query = f"""
-        SELECT COUNT(*) as member_count
+# Repeat choices in the scheduling forms -> recurrence frequency
+REPEAT_OPTIONS = {
+    "Does not repeat": None,
+    "Daily": "DAILY",
+    "Weekly": "WEEKLY",
+    "Monthly": "MONTHLY",
+}
+
+# How far ahead the group page looks for recurring workout occurrences
+UPCOMING_WINDOW = timedelta(days=90)
+
+# Member counts for every group in one aggregate, joined onto the group
+# catalog so the hub needs no per-group COUNT(*) queries.
+MEMBER_COUNTS_CTE = """
+    member_counts AS (
+        SELECT GroupId, COUNT(*) AS member_count
         FROM `vivianaramos6techx25.ISE.GroupMemberships`
-        WHERE GroupId = '{group_id}'
-    """
-    result = client.query(query).to_dataframe()
-    return result.iloc[0]['member_count']
+        GROUP BY GroupId
+    )
+"""
 
 PROJECT_ID = "vivianaramos6techx25"
 DATASET_ID = "ISE"
+
+# How long the group catalog is served from the read cache; groups are
+# created outside the app, and joins/leaves drop it right away
+CATALOG_TTL = 5 * 60
+
 def get_client():
-    client = bigquery.Client(project=PROJECT_ID)
-    return bigquery.Client(project=PROJECT_ID)
+    """Returns the shared BigQuery gateway (used in place of a client)"""
+    return get_gateway()
+
+@cached(ttl=CATALOG_TTL)
+def get_group_catalog():
+    """Returns every group with its member count, together with the
+    catalog's search version (computed once per read, not per rerun)"""
+    query = f"""
+        WITH {MEMBER_COUNTS_CTE}
+        SELECT g.GroupId, g.Name, g.Description, g.Category,
+               IFNULL(mc.member_count, 0) AS member_count
+        FROM `vivianaramos6techx25.ISE.FitnessGroups` g
+        LEFT JOIN member_counts mc
+        ON g.GroupId = mc.GroupId
+    """
+    groups = get_client().query(query).to_dataframe()
+    return {"groups": groups, "version": catalog_version(groups)}
 
 def get_user_name(user_id):
     try:
@@ -53,21 +95,22 @@ def get_user_name(user_id):
         return "Unknown User"
 
 def get_group_users(user_id):
+    """Returns (UserId, Name) for everyone sharing a group with the user.
+
+    Co-members come from the in-memory social graph; only their names are
+    read from BigQuery.
+    """
     try:
+        member_ids = get_co_members(user_id)
+        if not member_ids:
+            return []
         query = f"""
-            SELECT DISTINCT U.UserId, U.Name
-            FROM `{PROJECT_ID}.{DATASET_ID}.Users` U
-            JOIN `{PROJECT_ID}.{DATASET_ID}.GroupMemberships` GM 
-            ON U.UserId = GM.UserId
-            WHERE GM.GroupId IN (
-                SELECT GroupId
-                FROM `{PROJECT_ID}.{DATASET_ID}.GroupMemberships`
-                WHERE LOWER(UserId) = LOWER(@user_id)
-            )
-            AND LOWER(U.UserId) != LOWER(@user_id)
+            SELECT UserId, Name
+            FROM `{PROJECT_ID}.{DATASET_ID}.Users`
+            WHERE UserId IN UNNEST(@member_ids)
         """
         job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("user_id", "STRING", user_id)]
+            query_parameters=[bigquery.ArrayQueryParameter("member_ids", "STRING", member_ids)]
         )
         client = get_client()
         results = client.query(query, job_config=job_config).result()
@@ -92,46 +135,66 @@ def get_group_events():
         st.error(f"Error retrieving events: {e}")
         return pd.DataFrame([], columns=['EventId', 'Title', 'EventDate'])
 
+# Per-invitee results reported by create_event_with_report
+INVITED = "invited"
+INVITE_FAILED = "failed"
+
 def create_event(title, event_datetime, duration, user_id, invitees):
+    """Creates an event, invites users to it and returns its EventId (None
+    if it could not be created). See create_event_with_report."""
+    event_id, _ = create_event_with_report(title, event_datetime, duration, user_id, invitees)
+    return event_id
+
+def create_event_with_report(title, event_datetime, duration, user_id, invitees):
+    """Creates an event and invites users to it with a single write.
+
+    The event row and every invitee row are inserted by one transaction
+    (one BigQuery job however many users are invited), so either all of
+    them are saved or none are.
+
+    Returns:
+        tuple: (event_id, report) where report maps each distinct invitee
+        to INVITED, or to INVITE_FAILED if the write failed (event_id is
+        then None). Repeated invitees are invited once.
+    """
+    invitee_ids = list(dict.fromkeys(invitees))
+
     try:
         event_id = str(uuid.uuid4())
+        warn_about_conflicts(
+            [user_id] + invitee_ids,
+            event_datetime,
+            event_datetime + timedelta(minutes=duration) if duration else None
+        )
 
         query = f"""
+            BEGIN TRANSACTION;
             INSERT INTO `{PROJECT_ID}.{DATASET_ID}.GroupEvents` 
-            (EventId, Title, EventDate) 
-            VALUES (@event_id, @title, @event_date)
+            (EventId, Title, EventDate, CreatorId) 
+            VALUES (@event_id, @title, @event_date, @user_id);
+            INSERT INTO `{PROJECT_ID}.{DATASET_ID}.GroupEventInvitees` 
+            (EventId, UserId) 
+            SELECT @event_id, invitee_id
+            FROM UNNEST(@invitee_ids) AS invitee_id;
+            COMMIT TRANSACTION;
         """
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
                 bigquery.ScalarQueryParameter("event_id", "STRING", event_id),
                 bigquery.ScalarQueryParameter("title", "STRING", title),
                 bigquery.ScalarQueryParameter("event_date", "DATETIME", event_datetime),
+                bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
+                bigquery.ArrayQueryParameter("invitee_ids", "STRING", invitee_ids),
             ]
         )
         client = get_client()
         client.query(query, job_config=job_config).result()
 
-        try:
-            for invitee_id in invitees:
-                join_query = f"""
-                    INSERT INTO `{PROJECT_ID}.{DATASET_ID}.GroupEventInvitees` 
-                    (EventId, UserId) 
-                    VALUES (@event_id, @invitee_id)
-                """
-                join_config = bigquery.QueryJobConfig(
-                    query_parameters=[
-                        bigquery.ScalarQueryParameter("event_id", "STRING", event_id),
-                        bigquery.ScalarQueryParameter("invitee_id", "STRING", invitee_id),
-                    ]
-                )       
-                client.query(join_query, join_config).result()
-        except Exception:
-            pass
-
-        return event_id
+        invalidate_commitments([user_id])
+        return event_id, dict.fromkeys(invitee_ids, INVITED)
     except Exception as e:
         st.error(f"Error creating event: {e}")
-        return None
+        return None, dict.fromkeys(invitee_ids, INVITE_FAILED)
 
 def is_user_group_admin(user_id, group_id):
     try:
@@ -153,38 +216,68 @@ def is_user_group_admin(user_id, group_id):
         st.error(f"Error checking admin status: {e}")
         return False
 
+def get_group_member_ids(group_id):
+    """Returns the IDs of every member of a group"""
+    try:
+        query = f"""
+            SELECT UserId
+            FROM `{PROJECT_ID}.{DATASET_ID}.GroupMemberships`
+            WHERE GroupId = @group_id
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("group_id", "STRING", group_id)]
+        )
+        client = get_client()
+        return [row.UserId for row in client.query(query, job_config=job_config).result()]
+    except Exception as e:
+        st.error(f"Error retrieving group members: {e}")
+        return []
+
+def warn_about_conflicts(user_ids, start, end=None, names=None):
+    """Shows a warning for every user already busy at the proposed time.
+
+    Returns True if anyone is busy. A failed check is logged and treated as
+    no conflicts so it never blocks scheduling.
+    """
+    try:
+        conflicts = find_conflicts(user_ids, start, end)
+    except Exception as e:
+        print(f"Conflict check failed: {e}")
+        return False
+    for line in describe_conflicts(conflicts, names):
+        st.warning(f"⚠️ {line}")
+    return bool(conflicts)
+
 def display_fitness_groups(user_id):
     """Display a centralized group management hub with clear visual differentiation"""
     client = get_client()
     # Initialize BigQuery client
     
     # --- DATABASE QUERIES ---
-    # Get all available groups
-    all_groups_query = f"""
-        SELECT GroupId, Name, Description, Category
-        FROM `vivianaramos6techx25.ISE.FitnessGroups`
-    """
-    
-    # Get user's joined groups
+    # Get user's joined groups with their member counts
     joined_groups_query = f"""
+        WITH {MEMBER_COUNTS_CTE}
         SELECT g.GroupId, g.Name, g.Description, g.Category, 
-               gm.JoinedDate, gm.IsAdmin
+               gm.JoinedDate, gm.IsAdmin,
+               IFNULL(mc.member_count, 0) AS member_count
         FROM `vivianaramos6techx25.ISE.FitnessGroups` g
         JOIN `vivianaramos6techx25.ISE.GroupMemberships` gm
         ON g.GroupId = gm.GroupId
-        WHERE gm.UserId = '{user_id}'
+        LEFT JOIN member_counts mc
+        ON g.GroupId = mc.GroupId
+        WHERE gm.UserId = @user_id
         ORDER BY gm.JoinedDate DESC
     """
+    joined_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("user_id", "STRING", user_id)]
+    )
 
     try:
-        all_groups = client.query(all_groups_query).to_dataframe()
-        joined_groups = client.query(joined_groups_query).to_dataframe()
-        
-        # Add member_count to all_groups
-        all_groups['member_count'] = all_groups['GroupId'].apply(lambda x: get_member_count(client, x))
-        
-        # Add member_count to joined_groups
-        joined_groups['member_count'] = joined_groups['GroupId'].apply(lambda x: get_member_count(client, x))
+        # The catalog comes from the read cache; only the user's own groups
+        # are queried on every render
+        catalog = get_group_catalog()
+        all_groups = catalog["groups"]
+        joined_groups = client.query(joined_groups_query, job_config=joined_config).to_dataframe()
         
     except Exception as e:
         st.error(f"Error loading groups: {str(e)}")
@@ -244,26 +337,55 @@ def display_fitness_groups(user_id):
         st.header("Discover Fitness Communities")
         st.caption("Find groups that match your interests")
         
+        # Recommendations from co-membership; users who haven't joined
+        # anything yet get the most popular groups instead
+        if not joined_groups.empty:
+            recommended_ids = [group_id for group_id, _ in get_recommended_groups(user_id, k=3)]
+        elif not all_groups.empty:
+            recommended_ids = all_groups.nlargest(3, 'member_count')['GroupId'].tolist()
+        else:
+            recommended_ids = []
+        catalog_ids = set(all_groups['GroupId']) if not all_groups.empty else set()
+        recommended_ids = [group_id for group_id in recommended_ids if group_id in catalog_ids]
+        if recommended_ids:
+            st.subheader("⭐ Recommended for you")
+            cols = st.columns(3)
+            for col, group_id in zip(cols, recommended_ids):
+                group = all_groups[all_groups['GroupId'] == group_id].iloc[0]
+                with col:
+                    with st.container(border=True):
+                        st.markdown(f"**{group['Name']}**")
+                        st.caption(f"{group['Category']} • 👥 {group['member_count']} members")
+                        if st.button("➕ Join", key=f"recommended_join_{group_id}", use_container_width=True):
+                            join_group(user_id, group_id)
+                            st.rerun()
+            st.divider()
+        
+        # Built once per catalog version and shared across sessions
+        search_index = get_search_index(all_groups, version=catalog["version"])
+        
         col1, col2 = st.columns(2)
         with col1:
             category_filter = st.selectbox(
                 "Filter by category",
-                ["All"] + list(all_groups['Category'].unique()))
+                ["All"] + search_index.facets())
         with col2:
             search_term = st.text_input("Search groups")
         
-        filtered_groups = all_groups.copy()
-        if category_filter != "All":
-            filtered_groups = filtered_groups[filtered_groups['Category'] == category_filter]
-        if search_term:
-            filtered_groups = filtered_groups[
-                filtered_groups['Name'].str.contains(search_term, case=False) |
-                filtered_groups['Description'].str.contains(search_term, case=False)
-            ]
+        matches = search_index.search(
+            search_term,
+            category=None if category_filter == "All" else category_filter
+        )
+        if matches:
+            # Keep the ranked order of the search results
+            filtered_groups = all_groups.set_index('GroupId', drop=False).loc[matches]
+        else:
+            filtered_groups = all_groups.iloc[0:0]
         
         if not filtered_groups.empty:
             # Group by category for better organization
-            for category, group in filtered_groups.groupby('Category'):
+            # Best matches' categories first when searching
+            for category, group in filtered_groups.groupby('Category', sort=not search_term):
                 st.subheader(f"{category} Groups")
                 group_chunks = [group[i:i+3] for i in range(0, len(group), 3)]
                 
@@ -306,39 +428,15 @@ def display_fitness_groups(user_id):
                     key="calendar_date"
                 )
                 
-                # Get events for the selected date only (more efficient query)
-                events_query = f"""
-                    SELECT 
-                        e.EventId, 
-                        e.Title, 
-                        e.EventDate, 
-                        e.Location, 
-                        e.Description, 
-                        g.Name as GroupName, 
-                        g.GroupId,
-                        g.Category,
-                        COUNT(gm.UserId) as MemberCount
-                    FROM `vivianaramos6techx25.ISE.GroupEvents` e
-                    JOIN `vivianaramos6techx25.ISE.FitnessGroups` g
-                        ON e.GroupId = g.GroupId
-                    JOIN `vivianaramos6techx25.ISE.GroupMemberships` gm
-                        ON g.GroupId = gm.GroupId
-                    WHERE g.GroupId IN (
-                        SELECT GroupId 
-                        FROM `vivianaramos6techx25.ISE.GroupMemberships` 
-                        WHERE UserId = '{user_id}'
-                    )
-                    AND DATE(e.EventDate) = DATE('{selected_date}')
-                    GROUP BY e.EventId, e.Title, e.EventDate, e.Location, e.Description, g.Name, g.GroupId, g.Category
-                    ORDER BY e.EventDate
-                """
-                
-                events_df = client.query(events_query).to_dataframe()
+                # Served from this session's month index; only the first view
+                # of a month (or of a prefetched month gone stale) queries.
+                session_index = st.session_state.setdefault('calendar_index', {})
+                events = get_day_events(user_id, selected_date, session_index)
                 
-                if not events_df.empty:
+                if events:
                     st.subheader(f"Events on {selected_date.strftime('%A, %B %d, %Y')}")
                     
-                    for _, event in events_df.iterrows():
+                    for event in events:
                         # Convert to datetime if not already
                         event_date = pd.to_datetime(event['EventDate'])
                         
@@ -381,22 +479,32 @@ def display_fitness_groups(user_id):
                         workout_time = st.time_input("Time*")
                         location = st.text_input("Location", placeholder="Central Park, Beachfront, etc.")
                         description = st.text_area("Description", placeholder="Describe the workout session...")
+                        repeat = st.selectbox("Repeats", list(REPEAT_OPTIONS))
+                        until = st.date_input("Repeat until (optional)", value=None, min_value=datetime.today())
                         
                         if st.form_submit_button("Schedule Workout"):
                             if not title:
                                 st.error("Title is required")
                             else:
                                 workout_datetime = datetime.combine(workout_date, workout_time)
-                                if schedule_group_workout(
+                                # Group-wide check; warnings stay on screen
+                                # instead of being cleared by a rerun
+                                has_conflicts = warn_about_conflicts(
+                                    [user_id] + get_group_member_ids(group_id),
+                                    workout_datetime
+                                )
+                                if schedule_workout_series(
                                     group_id,
                                     user_id,
                                     workout_datetime,
+                                    repeat,
+                                    until,
                                     location,
                                     title,
                                     description
                                 ):
-                                    st.success("Workout scheduled successfully!")
-                                    st.rerun()
+                                    if not has_conflicts:
+                                        st.rerun()
             
 
             except Exception as e:
@@ -447,7 +555,13 @@ def handle_group_membership(user_id, group_id, action):
                 (GroupId, UserId, JoinedDate, IsAdmin)
                 VALUES ('{group_id}', '{user_id}', CURRENT_DATE(), FALSE)
             """
-            client.query(join_query)
+            client.query(join_query).result()
+            invalidate(user_id)
+            # Member counts in the catalog changed
+            invalidate(None, get_group_catalog)
+            invalidate_calendar(user_id=user_id, session_index=st.session_state.get('calendar_index'))
+            record_membership_change(user_id, group_id, joined=True)
+            record_membership(user_id, group_id, joined=True)
             
             st.success(f"🎉 Welcome to {group_name}! You've joined successfully.")
             return True
@@ -478,7 +592,13 @@ def handle_group_membership(user_id, group_id, action):
                 DELETE FROM `vivianaramos6techx25.ISE.GroupMemberships`
                 WHERE UserId = '{user_id}' AND GroupId = '{group_id}'
             """
-            client.query(leave_query)
+            client.query(leave_query).result()
+            invalidate(user_id)
+            # Member counts in the catalog changed
+            invalidate(None, get_group_catalog)
+            invalidate_calendar(user_id=user_id, session_index=st.session_state.get('calendar_index'))
+            record_membership_change(user_id, group_id, joined=False)
+            record_membership(user_id, group_id, joined=False)
             
             st.success(f"👋 You've left {group_name}. Hope to see you again soon!")
             return True
@@ -499,6 +619,53 @@ def join_group(user_id, group_id):
     """Handle joining a group"""
     return handle_group_membership(user_id, group_id, 'join')
 
+def schedule_workout_series(group_id, user_id, workout_datetime, repeat, until=None,
+                            location=None, title="Group Workout", description=""):
+    """Schedules a one-off workout, or a recurring one when repeat is one of
+    REPEAT_OPTIONS other than "Does not repeat" (stored as a single rule)"""
+    frequency = REPEAT_OPTIONS.get(repeat)
+    if frequency is None:
+        return schedule_group_workout(group_id, user_id, workout_datetime, location, title, description)
+    
+    try:
+        create_recurring_event(
+            group_id,
+            user_id,
+            workout_datetime,
+            frequency,
+            until=datetime.combine(until, dtime.max) if until else None,
+            title=title,
+            description=description,
+            location=location or None
+        )
+        invalidate_calendar(session_index=st.session_state.get('calendar_index'))
+        invalidate_commitments([user_id])
+        st.success(f"✅ {repeat} workout scheduled successfully!")
+        return True
+    except Exception as e:
+        st.error(f"❌ Failed to schedule workout: {str(e)}")
+        return False
+
+def cancel_workout_occurrence(event_id):
+    """Cancels one occurrence of a recurring workout (its rule is kept)"""
+    parsed = parse_occurrence_id(event_id)
+    if parsed is None:
+        st.error("Only single occurrences of recurring workouts can be cancelled")
+        return False
+    
+    try:
+        rule_id, start = parsed
+        cancel_occurrence(rule_id, start)
+        invalidate_calendar(session_index=st.session_state.get('calendar_index'))
+        # Anyone may have RSVP'd to the occurrence
+        invalidate_commitments()
+        invalidate_events([event_id])
+        st.success(f"🚫 Cancelled the {start.strftime('%b %d')} workout")
+        return True
+    except Exception as e:
+        st.error(f"❌ Failed to cancel workout: {str(e)}")
+        return False
+
 def schedule_group_workout(group_id, user_id, workout_datetime, location=None, title="Group Workout", description=""):
     """Handle scheduling of joint workouts for fitness groups"""
     
@@ -530,6 +697,9 @@ def schedule_group_workout(group_id, user_id, workout_datetime, location=None, t
         
         job = client.query(insert_query)
         job.result()
+        # The event shows up in every member's calendar
+        invalidate_calendar(session_index=st.session_state.get('calendar_index'))
+        invalidate_commitments([user_id])
         st.success("✅ Workout scheduled successfully!")
         return True
         
@@ -539,55 +709,56 @@ def schedule_group_workout(group_id, user_id, workout_datetime, location=None, t
 
 
 def rsvp_to_workout(user_id, event_id):
-    """Handle RSVP to a workout event"""
-    client = get_client()
-    
+    """Handle RSVP to a workout event (joins the waitlist when it is full)"""
     try:
-        # Check if already RSVP'd
-        check_query = f"""
-            SELECT COUNT(*) as count
-            FROM `vivianaramos6techx25.ISE.EventAttendees`
-            WHERE UserId = '{user_id}' AND EventId = '{event_id}'
-        """
-        result = client.query(check_query).to_dataframe()
+        status, position = rsvp(user_id, event_id)
         
-        if result.iloc[0]['count'] > 0:
+        if status == ALREADY_ATTENDING:
             st.warning("You're already signed up for this workout")
             return False
+        if status == ALREADY_WAITLISTED:
+            st.warning(f"You're already on the waitlist (#{position})")
+            return False
             
-        # Add RSVP
-        insert_query = f"""
-            INSERT INTO `vivianaramos6techx25.ISE.EventAttendees`
-            (EventId, UserId, RSVPDate)
-            VALUES ('{event_id}', '{user_id}', CURRENT_TIMESTAMP())
-        """
-        client.query(insert_query)
+        invalidate_commitments([user_id])
+        if status == WAITLISTED:
+            st.info(f"This workout is full - you're #{position} on the waitlist")
         return True
         
     except Exception as e:
         st.error(f"Failed to RSVP: {str(e)}")
         return False
 
-def is_event_creator(client, user_id, event_id):
-    """Check if user created this event"""
-    query = f"""
-        SELECT COUNT(*) as is_creator
-        FROM `vivianaramos6techx25.ISE.GroupEvents`
-        WHERE EventId = '{event_id}'
-        AND CreatorId = '{user_id}'
-    """
-    result = client.query(query).to_dataframe()
-    return result.iloc[0]['is_creator'] > 0
+def get_event_statuses(user_id, event_ids):
+    """Returns the user's status for many events.
 
-def has_rsvped(client, user_id, event_id):
-    """Check if user already RSVP'd"""
-    query = f"""
-        SELECT COUNT(*) as has_rsvp
-        FROM `vivianaramos6techx25.ISE.EventAttendees`
-        WHERE UserId = '{user_id}' AND EventId = '{event_id}'
+    Event states are cached by the RSVP engine, so this costs at most one
+    query for all the events that are not loaded yet.
+
+    Args:
+        user_id (str): The ID of the user viewing the events
+        event_ids (list): The IDs of the events
+
+    Returns:
+        dict: EventId -> {'is_creator': bool, 'attending': bool,
+        'waitlisted': bool, 'attendee_count': int, 'capacity': int}.
+        Events that do not exist are left out.
     """
-    result = client.query(query).to_dataframe()
-    return result.iloc[0]['has_rsvp'] > 0
+    try:
+        states = get_event_states(list(event_ids))
+    except Exception as e:
+        st.error(f"Error loading event statuses: {e}")
+        return {}
+    return {
+        event_id: {
+            'is_creator': state.creator_id == user_id,
+            'attending': user_id in state.attendees,
+            'waitlisted': user_id in state.waitlist,
+            'attendee_count': len(state.attendees),
+            'capacity': state.capacity,
+        }
+        for event_id, state in states.items()
+    }
 
 def display_group_page(group_id, user_id):
     """Display an individual group page with members, workout scheduling, and management"""
@@ -647,6 +818,21 @@ def display_group_page(group_id, user_id):
         st.error(f"Error loading group data: {str(e)}")
         return
     
+    # Next occurrences of the group's recurring workouts, expanded from their
+    # rules and merged with the one-off events
+    try:
+        now = datetime.now()
+        occurrences = expand_occurrences(fetch_group_rules([group_id], now), now, now + UPCOMING_WINDOW)
+        if occurrences:
+            workouts_df = (
+                pd.concat([workouts_df, pd.DataFrame(occurrences).reindex(columns=workouts_df.columns)])
+                .sort_values('EventDate')
+                .head(3)
+                .reset_index(drop=True)
+            )
+    except Exception as e:
+        print(f"Could not load recurring workouts for {group_id}: {e}")
+    
     # --- UI IMPLEMENTATION ---
     st.title(f"🏋️ {group['Name']}")
     st.caption(f"{group['Category']} Group • 👥 {member_count} members")
@@ -706,7 +892,8 @@ def display_group_page(group_id, user_id):
         st.subheader("🏃 Upcoming Workouts")
         
         if not workouts_df.empty:
-            client = bigquery.Client(project="vivianaramos6techx25")
+            # Creator/RSVP status for every card in one round trip
+            statuses = get_event_statuses(user_id, workouts_df['EventId'].tolist()) if is_member else {}
             for _, workout in workouts_df.iterrows():
                 with st.container(border=True):
                     st.write(f"**{workout['Title']}**")
@@ -715,15 +902,22 @@ def display_group_page(group_id, user_id):
                     st.write(workout['Description'])
                     
                     if is_member:
-                        creator_status = is_event_creator(client, user_id, workout['EventId'])
-                        rsvp_status = has_rsvped(client, user_id, workout['EventId'])
+                        status = statuses.get(workout['EventId'], {})
+                        st.caption(f"👥 {status.get('attendee_count', 0)}/{status.get('capacity', workout['MaxParticipants'])} attending")
                         
-                        if creator_status:
+                        if status.get('is_creator'):
                             st.info("👑 You created this event")
-                        elif rsvp_status:
+                            if parse_occurrence_id(workout['EventId']) is not None:
+                                if st.button("🚫 Cancel this occurrence", key=f"cancel_{workout['EventId']}"):
+                                    if cancel_workout_occurrence(workout['EventId']):
+                                        st.rerun()
+                        elif status.get('attending'):
                             st.success("✅ You're attending this event")
+                        elif status.get('waitlisted'):
+                            st.info("⏳ You're on the waitlist for this event")
                         else:
-                            if st.button("✋ I'll Attend", key=f"rsvp_{workout['EventId']}"):
+                            label = "✋ I'll Attend" if status.get('attendee_count', 0) < status.get('capacity', 1) else "⏳ Join Waitlist"
+                            if st.button(label, key=f"rsvp_{workout['EventId']}"):
                                 if rsvp_to_workout(user_id, workout['EventId']):
                                     st.rerun()
         
@@ -738,20 +932,32 @@ def display_group_page(group_id, user_id):
                     location = st.text_input("Location")
                     description = st.text_area("Description", 
                                              value="Join your fellow group members for a workout session!")
+                    repeat = st.selectbox("Repeats", list(REPEAT_OPTIONS))
+                    until = st.date_input("Repeat until (optional)", value=None, min_value=datetime.now().date())
                     
                     if st.form_submit_button("Schedule Workout"):
                         if not title:
                             st.error("Title is required")
                         else:
                             workout_datetime = datetime.combine(date, time)
-                            if schedule_group_workout(
+                            # Group-wide check; warnings stay on screen
+                            # instead of being cleared by a rerun
+                            member_names = dict(zip(members_df['UserId'], members_df['Name'])) if not members_df.empty else {}
+                            has_conflicts = warn_about_conflicts(
+                                [user_id] + list(member_names),
+                                workout_datetime,
+                                names=member_names
+                            )
+                            if schedule_workout_series(
                                 group_id,
                                 user_id,
                                 workout_datetime,
+                                repeat,
+                                until,
                                 location,
                                 title,
                                 description
-                            ):
+                            ) and not has_conflicts:
                                 st.rerun()
         else:
             st.info("Join the group to see and schedule workouts")
@@ -0,0 +1,202 @@
+#############################################################################
+# goal_suggestions.py
+#
+# This file contains the suggested-goal pool behind
+# data_fetcher.get_suggested_goals. Generating suggestions with Gemini takes
+# seconds, so each user's suggestions are generated once per period (a day
+# by default), kept in memory, persisted to BigQuery and refreshed in the
+# background once they go stale. The Goals page is then served from memory.
+#
+# Persisted pools live in ISE.SuggestedGoals, created with:
+#
+#     CREATE TABLE IF NOT EXISTS ISE.SuggestedGoals (
+#         UserId STRING NOT NULL,
+#         PoolDate DATE NOT NULL,  -- period_start of the generated pool
+#         Title STRING NOT NULL,
+#         TargetValue FLOAT64,     -- NULL on discard markers
+#         Discarded BOOL           -- TRUE on discard markers
+#     )
+#
+# Rows are streamed in, so a discarded suggestion is recorded as an extra
+# row with Discarded = TRUE (streamed rows cannot be deleted right away).
+# A marker hides its title from the latest pool dated on or before it, so a
+# discard made before the pool was loaded into memory still sticks.
+# Persistence is best effort: if the table is unavailable the pool still
+# works in memory, but every new instance has to generate it again.
+#############################################################################
+
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+from google.cloud import bigquery
+
+from data_gateway import get_gateway
+
+SUGGESTIONS_TABLE = "SuggestedGoals"
+SUGGESTION_COLUMNS = ["Title", "TargetValue"]
+
+
+class SuggestionPool:
+    """Per-user suggested goals, generated at most once per period.
+
+    Args:
+        generate: Callable taking a user ID and returning a DataFrame with
+            Title and TargetValue columns (the slow Gemini call).
+        period: 'day' or 'week'; how long a generated pool stays fresh.
+    """
+
+    def __init__(self, generate, period="day"):
+        self._generate = generate
+        self.period = period
+        self._pools = {}  # user_id -> (period_start, DataFrame)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def period_start(self, today=None):
+        """Returns the first day of the period containing today."""
+        today = today or date.today()
+        if self.period == "week":
+            return today - timedelta(days=today.weekday())
+        return today
+
+    def get(self, user_id):
+        """Returns the user's current suggestions as a DataFrame.
+
+        A fresh pool is returned straight from memory. A stale pool is
+        returned as-is while a replacement is generated in the background.
+        Only a user with no pool at all (in memory or in BigQuery) waits on
+        the model.
+        """
+        current = self.period_start()
+        with self._lock:
+            entry = self._pools.get(user_id)
+
+        if entry is None:
+            entry = self._load(user_id)
+            if entry is not None:
+                with self._lock:
+                    self._pools.setdefault(user_id, entry)
+
+        if entry is None:
+            return self.refresh(user_id, current)
+        if entry[0] != current:
+            self._refresh_in_background(user_id, current)
+        return entry[1]
+
+    def refresh(self, user_id, period_start=None):
+        """Generates, stores and persists a new pool for the user."""
+        period_start = period_start or self.period_start()
+        suggestions = self._generate(user_id)
+        with self._lock:
+            self._pools[user_id] = (period_start, suggestions)
+        self._save(user_id, period_start, suggestions)
+        return suggestions
+
+    def discard(self, user_id, title):
+        """Removes a suggestion (e.g. once the user has added it as a goal),
+        also from the persisted pool."""
+        with self._lock:
+            entry = self._pools.get(user_id)
+            if entry is None:
+                # Not loaded on this instance; the marker still hides the
+                # title from the persisted pool
+                period_start = self.period_start()
+            else:
+                period_start, suggestions = entry
+                kept = suggestions[suggestions["Title"] != title].reset_index(drop=True)
+                self._pools[user_id] = (period_start, kept)
+        self._insert([{
+            "UserId": user_id,
+            "PoolDate": period_start.isoformat(),
+            "Title": title,
+            "TargetValue": None,
+            "Discarded": True,
+        }])
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+    def _refresh_in_background(self, user_id, period_start):
+        with self._lock:
+            if user_id in self._refreshing:
+                return
+            self._refreshing.add(user_id)
+
+        def run():
+            try:
+                self.refresh(user_id, period_start)
+            except Exception as e:
+                print(f"Failed to refresh suggested goals for {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user_id)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _load(self, user_id):
+        """Returns the user's most recent persisted (period_start, DataFrame),
+        without the suggestions the user discarded."""
+        client = get_gateway()
+        query = f"""
+            WITH rows AS (
+                SELECT PoolDate, Title, TargetValue, IFNULL(Discarded, FALSE) AS Discarded
+                FROM {client.table(SUGGESTIONS_TABLE)}
+                WHERE UserId = @user_id
+            ),
+            latest AS (
+                SELECT PoolDate, Title, TargetValue
+                FROM rows
+                WHERE NOT Discarded
+                QUALIFY PoolDate = MAX(PoolDate) OVER ()
+            ),
+            discarded AS (
+                SELECT DISTINCT Title
+                FROM rows
+                WHERE Discarded AND PoolDate >= (SELECT MAX(PoolDate) FROM latest)
+            )
+            SELECT
+                latest.PoolDate,
+                latest.Title,
+                MAX(latest.TargetValue) AS TargetValue,
+                LOGICAL_OR(discarded.Title IS NOT NULL) AS Discarded
+            FROM latest
+            LEFT JOIN discarded USING (Title)
+            GROUP BY latest.PoolDate, latest.Title
+        """
+        params = [bigquery.ScalarQueryParameter("user_id", "STRING", user_id)]
+        try:
+            rows = client.query(query, params=params).to_dataframe()
+        except Exception as e:
+            print(f"Could not load suggested goals for {user_id}: {e}")
+            return None
+        if rows.empty:
+            return None
+        pool_date = pd.to_datetime(rows["PoolDate"].iloc[0]).date()
+        if "Discarded" in rows:
+            # A fully discarded pool is still the current pool (just empty)
+            rows = rows[~rows["Discarded"].fillna(False).astype(bool)]
+        return pool_date, rows[SUGGESTION_COLUMNS].reset_index(drop=True)
+
+    def _save(self, user_id, period_start, suggestions):
+        rows = [
+            {
+                "UserId": user_id,
+                "PoolDate": period_start.isoformat(),
+                "Title": row["Title"],
+                "TargetValue": float(row["TargetValue"]),
+            }
+            for _, row in suggestions.iterrows()
+        ]
+        self._insert(rows)
+
+    def _insert(self, rows):
+        if not rows:
+            return
+        try:
+            errors = get_gateway().insert_rows_json(SUGGESTIONS_TABLE, rows)
+            if errors:
+                print(f"Failed to persist suggested goals: {errors}")
+        except Exception as e:
+            print(f"Failed to persist suggested goals: {e}")
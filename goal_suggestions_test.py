@@ -0,0 +1,116 @@
+#############################################################################
+# goal_suggestions_test.py
+#
+# This file contains tests for goal_suggestions.py.
+#############################################################################
+import unittest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+
+from goal_suggestions import SuggestionPool
+
+
+def make_goals(*titles):
+    return pd.DataFrame({"Title": list(titles), "TargetValue": [1.0] * len(titles)})
+
+
+class ImmediateThread:
+    """Stand-in for threading.Thread that runs its target on start()."""
+
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@patch('goal_suggestions.get_gateway')
+class TestSuggestionPool(unittest.TestCase):
+
+    def test_cold_pool_generates_once(self, mock_gateway):
+        mock_gateway.return_value.query.return_value.to_dataframe.return_value = pd.DataFrame()
+        generate = MagicMock(return_value=make_goals("Run 10 miles"))
+        pool = SuggestionPool(generate)
+
+        first = pool.get("user1")
+        second = pool.get("user1")
+
+        generate.assert_called_once_with("user1")
+        self.assertIs(first, second)
+        mock_gateway.return_value.insert_rows_json.assert_called_once()
+
+    def test_persisted_pool_is_served_without_generating(self, mock_gateway):
+        stored = make_goals("Drink 8 cups of water")
+        stored["PoolDate"] = [date.today()]
+        mock_gateway.return_value.query.return_value.to_dataframe.return_value = stored
+        generate = MagicMock()
+        pool = SuggestionPool(generate)
+
+        result = pool.get("user1")
+
+        generate.assert_not_called()
+        self.assertEqual(list(result["Title"]), ["Drink 8 cups of water"])
+
+    @patch('goal_suggestions.threading.Thread', ImmediateThread)
+    def test_stale_pool_is_served_then_refreshed(self, mock_gateway):
+        stored = make_goals("Old goal")
+        stored["PoolDate"] = [date(2020, 1, 1)]
+        mock_gateway.return_value.query.return_value.to_dataframe.return_value = stored
+        generate = MagicMock(return_value=make_goals("New goal"))
+        pool = SuggestionPool(generate)
+
+        stale = pool.get("user1")
+        fresh = pool.get("user1")
+
+        self.assertEqual(list(stale["Title"]), ["Old goal"])
+        self.assertEqual(list(fresh["Title"]), ["New goal"])
+        generate.assert_called_once_with("user1")
+
+    def test_discard_removes_added_goal(self, mock_gateway):
+        mock_gateway.return_value.query.return_value.to_dataframe.return_value = pd.DataFrame()
+        pool = SuggestionPool(MagicMock(return_value=make_goals("Run", "Swim")))
+        pool.get("user1")
+
+        pool.discard("user1", "Run")
+
+        self.assertEqual(list(pool.get("user1")["Title"]), ["Swim"])
+        marker = mock_gateway.return_value.insert_rows_json.call_args.args[1]
+        self.assertEqual(marker, [{
+            "UserId": "user1", "PoolDate": date.today().isoformat(),
+            "Title": "Run", "TargetValue": None, "Discarded": True,
+        }])
+
+    def test_discard_is_persisted_when_pool_not_loaded(self, mock_gateway):
+        generate = MagicMock()
+        pool = SuggestionPool(generate)
+
+        pool.discard("user1", "Run")
+
+        marker = mock_gateway.return_value.insert_rows_json.call_args.args[1]
+        self.assertEqual(marker, [{
+            "UserId": "user1", "PoolDate": date.today().isoformat(),
+            "Title": "Run", "TargetValue": None, "Discarded": True,
+        }])
+        mock_gateway.return_value.query.assert_not_called()
+        generate.assert_not_called()
+
+    def test_discarded_goals_stay_gone_after_reload(self, mock_gateway):
+        stored = make_goals("Run", "Swim")
+        stored["PoolDate"] = [date.today()] * 2
+        stored["Discarded"] = [True, False]
+        mock_gateway.return_value.query.return_value.to_dataframe.return_value = stored
+        generate = MagicMock()
+        pool = SuggestionPool(generate)
+
+        self.assertEqual(list(pool.get("user1")["Title"]), ["Swim"])
+        generate.assert_not_called()
+
+    def test_weekly_period_starts_on_monday(self, mock_gateway):
+        pool = SuggestionPool(MagicMock(), period="week")
+        self.assertEqual(pool.period_start(date(2025, 4, 24)), date(2025, 4, 21))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+#############################################################################
+# group_calendar.py
+#
+# This file contains the event index behind the Group Calendar tab. Events
+# for all of a user's groups are read a whole month at a time with a single
+# query and indexed by date, so picking another day in the calendar is a
+# dictionary lookup rather than a BigQuery job. The neighbouring month is
+# prefetched in the background so moving across a month boundary is
+# usually instant as well.
+#############################################################################
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from google.cloud import bigquery
+
+from data_gateway import get_gateway
+from recurring_events import expand_occurrences, fetch_user_rules
+
+# How long a fetched month is served before it is read again (picks up
+# events scheduled by other members).
+CALENDAR_TTL = 5 * 60
+# How many (user, month) indexes are kept before the least recently used
+# one is dropped
+MAX_MONTHS = 512
+
+EVENT_COLUMNS = [
+    "EventId", "Title", "EventDate", "Location", "Description",
+    "GroupName", "GroupId", "Category", "MemberCount",
+]
+
+
+def month_start(day):
+    """Returns the first day of the month containing `day`."""
+    return date(day.year, day.month, 1)
+
+
+def next_month(first):
+    """Returns the first day of the month after the one starting at `first`."""
+    return (first + timedelta(days=32)).replace(day=1)
+
+
+def previous_month(first):
+    """Returns the first day of the month before the one starting at `first`."""
+    return (first - timedelta(days=1)).replace(day=1)
+
+
+def fetch_month_events(user_id, first):
+    """Returns the events of all the user's groups in one month, oldest first,
+    including the occurrences of recurring workouts.
+
+    Args:
+        user_id (str): The ID of the user whose groups we want
+        first (date): The first day of the month
+
+    Returns:
+        list: Event dictionaries with the keys in EVENT_COLUMNS
+    """
+    client = get_gateway()
+    query = f"""
+        WITH member_counts AS (
+            SELECT GroupId, COUNT(*) AS member_count
+            FROM {client.table('GroupMemberships')}
+            GROUP BY GroupId
+        )
+        SELECT
+            e.EventId,
+            e.Title,
+            e.EventDate,
+            e.Location,
+            e.Description,
+            g.Name AS GroupName,
+            g.GroupId,
+            g.Category,
+            IFNULL(mc.member_count, 0) AS MemberCount
+        FROM {client.table('GroupEvents')} e
+        JOIN {client.table('FitnessGroups')} g
+            ON e.GroupId = g.GroupId
+        LEFT JOIN member_counts mc
+            ON g.GroupId = mc.GroupId
+        WHERE g.GroupId IN (
+            SELECT GroupId
+            FROM {client.table('GroupMemberships')}
+            WHERE UserId = @user_id
+        )
+        AND e.EventDate >= @month_start
+        AND e.EventDate < @month_end
+        ORDER BY e.EventDate
+    """
+    window_start = datetime.combine(first, datetime.min.time())
+    window_end = datetime.combine(next_month(first), datetime.min.time())
+    params = [
+        bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
+        bigquery.ScalarQueryParameter("month_start", "DATETIME", window_start),
+        bigquery.ScalarQueryParameter("month_end", "DATETIME", window_end),
+    ]
+    results = client.query(query, params=params).result()
+    events = [{column: getattr(row, column) for column in EVENT_COLUMNS} for row in results]
+
+    # Recurring workouts: a handful of rules, expanded for this month only
+    occurrences = expand_occurrences(fetch_user_rules(user_id, window_start), window_start, window_end)
+    events += [{column: occurrence.get(column) for column in EVENT_COLUMNS} for occurrence in occurrences]
+    events.sort(key=lambda event: event["EventDate"])
+    return events
+
+
+def index_by_date(events):
+    """Groups event dictionaries by the calendar date of their EventDate."""
+    index = {}
+    for event in events:
+        event_date = event["EventDate"]
+        day = event_date.date() if isinstance(event_date, datetime) else event_date
+        index.setdefault(day, []).append(event)
+    return index
+
+
+class MonthEventIndex:
+    """Per-user, per-month date indexes of group events.
+
+    Args:
+        fetch: Callable fetch(user_id, month_start) returning the month's
+            event dictionaries (the BigQuery read).
+        ttl: Seconds a fetched month stays fresh.
+        max_months: Number of (user, month) indexes kept in memory.
+    """
+
+    def __init__(self, fetch, ttl=CALENDAR_TTL, max_months=MAX_MONTHS):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_months = max_months
+        # (user_id, month_start) -> (expires_at, {date: [events]}), least
+        # recently used first
+        self._months = OrderedDict()
+        self._prefetching = set()
+        self._lock = threading.Lock()
+
+    def get_month(self, user_id, first):
+        """Returns the {date: [events]} index of one month, fetching it if needed."""
+        key = (user_id, first)
+        with self._lock:
+            entry = self._months.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._months.move_to_end(key)
+                return entry[1]
+        index = index_by_date(self._fetch(user_id, first))
+        with self._lock:
+            self._months[key] = (time.monotonic() + self.ttl, index)
+            self._months.move_to_end(key)
+            while len(self._months) > self.max_months:
+                self._months.popitem(last=False)
+        return index
+
+    def prefetch(self, user_id, first):
+        """Loads a month in the background unless it is fresh or already loading."""
+        key = (user_id, first)
+        with self._lock:
+            entry = self._months.get(key)
+            if key in self._prefetching or (entry is not None and entry[0] > time.monotonic()):
+                return
+            self._prefetching.add(key)
+
+        def run():
+            try:
+                self.get_month(user_id, first)
+            except Exception as e:
+                print(f"Failed to prefetch events for {user_id} ({first:%Y-%m}): {e}")
+            finally:
+                with self._lock:
+                    self._prefetching.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def invalidate(self, user_id=None):
+        """Drops cached months for one user (or for everyone)."""
+        with self._lock:
+            for key in [k for k in self._months if user_id is None or k[0] == user_id]:
+                del self._months[key]
+
+    def clear(self):
+        self.invalidate()
+
+
+_month_index = MonthEventIndex(fetch_month_events)
+
+
+def get_day_events(user_id, day, session_index=None):
+    """Returns the events of the user's groups on one day, oldest first.
+
+    The day's whole month is loaded on first use and the adjacent month (the
+    one nearer to `day`) is prefetched in the background.
+
+    Args:
+        user_id (str): The ID of the user whose groups we want
+        day (date): The selected day
+        session_index (dict): Optional per-session store (e.g. a dict kept in
+            st.session_state) that holds the month indexes this session has
+            already loaded, so reruns do not touch the shared cache at all.
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    first = month_start(day)
+    key = (user_id, first)
+    if session_index is not None and key in session_index:
+        loaded_at, index = session_index[key]
+        if time.monotonic() - loaded_at < CALENDAR_TTL:
+            return index.get(day, [])
+
+    index = _month_index.get_month(user_id, first)
+    if session_index is not None:
+        session_index[key] = (time.monotonic(), index)
+    prefetch_month(user_id, next_month(first) if day.day > 15 else previous_month(first))
+    return index.get(day, [])
+
+
+def prefetch_month(user_id, first):
+    """Starts loading one month of the user's events in the background."""
+    _month_index.prefetch(user_id, first)
+
+
+def invalidate_calendar(user_id=None, session_index=None):
+    """Forgets cached months, e.g. after a new event has been scheduled or
+    the user joined or left a group."""
+    _month_index.invalidate(user_id)
+    if session_index is not None:
+        session_index.clear()
@@ -0,0 +1,106 @@
+#############################################################################
+# group_calendar_test.py
+#
+# This file contains tests for group_calendar.py.
+#############################################################################
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+from group_calendar import (
+    MonthEventIndex, get_day_events, index_by_date, next_month, previous_month,
+)
+
+
+class ImmediateThread:
+    """Stand-in for threading.Thread that runs its target on start()."""
+
+    def __init__(self, target, daemon=None):
+        self._target = target
+
+    def start(self):
+        self._target()
+
+
+def event(event_id, when):
+    return {'EventId': event_id, 'EventDate': when}
+
+
+class TestMonthEventIndex(unittest.TestCase):
+
+    def test_index_by_date_groups_events(self):
+        index = index_by_date([
+            event('e1', datetime(2025, 6, 3, 8, 0)),
+            event('e2', datetime(2025, 6, 3, 18, 0)),
+            event('e3', datetime(2025, 6, 9, 7, 0)),
+        ])
+
+        self.assertEqual([e['EventId'] for e in index[date(2025, 6, 3)]], ['e1', 'e2'])
+        self.assertEqual([e['EventId'] for e in index[date(2025, 6, 9)]], ['e3'])
+
+    def test_month_is_fetched_once(self):
+        fetch = MagicMock(return_value=[event('e1', datetime(2025, 6, 3, 8, 0))])
+        months = MonthEventIndex(fetch)
+
+        months.get_month('user1', date(2025, 6, 1))
+        index = months.get_month('user1', date(2025, 6, 1))
+
+        fetch.assert_called_once_with('user1', date(2025, 6, 1))
+        self.assertIn(date(2025, 6, 3), index)
+
+    def test_least_recently_used_month_is_evicted(self):
+        fetch = MagicMock(return_value=[])
+        months = MonthEventIndex(fetch, max_months=2)
+
+        months.get_month('user1', date(2025, 6, 1))
+        months.get_month('user1', date(2025, 7, 1))
+        months.get_month('user1', date(2025, 6, 1))
+        months.get_month('user1', date(2025, 8, 1))
+        months.get_month('user1', date(2025, 6, 1))
+        months.get_month('user1', date(2025, 7, 1))
+
+        self.assertEqual(fetch.call_count, 4)
+        self.assertEqual(fetch.call_args.args, ('user1', date(2025, 7, 1)))
+
+    @patch('group_calendar.threading.Thread', ImmediateThread)
+    def test_prefetch_loads_month_in_background(self):
+        fetch = MagicMock(return_value=[])
+        months = MonthEventIndex(fetch)
+
+        months.prefetch('user1', date(2025, 7, 1))
+        months.prefetch('user1', date(2025, 7, 1))
+        months.get_month('user1', date(2025, 7, 1))
+
+        fetch.assert_called_once_with('user1', date(2025, 7, 1))
+
+    def test_month_arithmetic_wraps_years(self):
+        self.assertEqual(next_month(date(2025, 12, 1)), date(2026, 1, 1))
+        self.assertEqual(previous_month(date(2025, 1, 1)), date(2024, 12, 1))
+
+
+class TestGetDayEvents(unittest.TestCase):
+
+    @patch('group_calendar.prefetch_month')
+    @patch('group_calendar.fetch_month_events')
+    def test_day_changes_are_served_from_session_index(self, mock_fetch, mock_prefetch):
+        mock_fetch.return_value = [
+            event('e1', datetime(2025, 6, 3, 8, 0)),
+            event('e2', datetime(2025, 6, 20, 8, 0)),
+        ]
+        session_index = {}
+
+        with patch('group_calendar._month_index', MonthEventIndex(mock_fetch)):
+            first_day = get_day_events('user1', date(2025, 6, 3), session_index)
+            other_day = get_day_events('user1', date(2025, 6, 20), session_index)
+            empty_day = get_day_events('user1', date(2025, 6, 21), session_index)
+
+        mock_fetch.assert_called_once_with('user1', date(2025, 6, 1))
+        self.assertEqual([e['EventId'] for e in first_day], ['e1'])
+        self.assertEqual([e['EventId'] for e in other_day], ['e2'])
+        self.assertEqual(empty_day, [])
+        # Early in the month the previous month is the one prefetched
+        mock_prefetch.assert_called_once_with('user1', date(2025, 5, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
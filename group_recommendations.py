@@ -0,0 +1,174 @@
+#############################################################################
+# group_recommendations.py
+#
+# This file contains the "Recommended for you" engine on the Discover
+# Groups tab. It recommends groups that are often joined together with the
+# groups a user is already in (item-item collaborative filtering):
+#
+#     score(g) = sum over joined groups j of  co(j, g) / sqrt(n_j * n_g)
+#
+# where co(j, g) is the number of users in both groups and n_j the size of
+# group j (cosine similarity on the user x group membership matrix).
+#
+# The membership matrix is kept sparse: group -> members and a
+# group -> {group: co-membership count} table holding only non-zero pairs,
+# so memory grows with the memberships rather than with users x groups.
+# The table is read once from GroupMemberships and then updated in place on
+# every join/leave; each user's top-K list is computed on demand and kept
+# until a membership change touches one of their groups.
+#############################################################################
+
+import heapq
+import math
+import threading
+import time
+
+from data_gateway import get_gateway
+
+DEFAULT_TOP_K = 5
+# The table is re-read from BigQuery after this long, to pick up joins and
+# leaves made through other app instances.
+MEMBERSHIP_TTL = 30 * 60
+
+
+def fetch_memberships():
+    """Returns every (UserId, GroupId) pair in GroupMemberships."""
+    client = get_gateway()
+    query = f"""
+        SELECT UserId, GroupId
+        FROM {client.table('GroupMemberships')}
+    """
+    return [(row.UserId, row.GroupId) for row in client.query(query).result()]
+
+
+class GroupRecommender:
+    """Sparse co-membership table with per-user top-K recommendations.
+
+    Args:
+        fetch: Callable returning all (user_id, group_id) memberships.
+        ttl: Seconds before the table is rebuilt from fetch.
+    """
+
+    def __init__(self, fetch, ttl=MEMBERSHIP_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._loaded_until = 0.0
+        self._groups_of = {}  # user_id -> set of group_ids
+        self._members = {}  # group_id -> set of user_ids
+        self._co = {}  # group_id -> {group_id: co-membership count}
+        self._top_k = {}  # (user_id, k) -> [(group_id, score), ...]
+        self._lock = threading.Lock()
+
+    def load(self, memberships):
+        """Rebuilds the table from an iterable of (user_id, group_id) pairs."""
+        groups_of, members, co = {}, {}, {}
+        for user_id, group_id in memberships:
+            groups_of.setdefault(user_id, set()).add(group_id)
+            members.setdefault(group_id, set()).add(user_id)
+        for groups in groups_of.values():
+            for group_id in groups:
+                row = co.setdefault(group_id, {})
+                for other in groups:
+                    if other != group_id:
+                        row[other] = row.get(other, 0) + 1
+        with self._lock:
+            self._groups_of, self._members, self._co = groups_of, members, co
+            self._top_k.clear()
+            self._loaded_until = time.monotonic() + self.ttl
+
+    def _ensure_loaded(self):
+        with self._lock:
+            fresh = self._loaded_until > time.monotonic()
+        if not fresh:
+            self.load(self._fetch())
+
+    def join(self, user_id, group_id):
+        """Records a new membership without rebuilding the table."""
+        with self._lock:
+            groups = self._groups_of.setdefault(user_id, set())
+            if group_id in groups:
+                return
+            self._change_pairs(group_id, groups, +1)
+            groups.add(group_id)
+            self._members.setdefault(group_id, set()).add(user_id)
+            self._forget_affected(group_id, groups)
+
+    def leave(self, user_id, group_id):
+        """Removes a membership without rebuilding the table."""
+        with self._lock:
+            groups = self._groups_of.get(user_id, set())
+            if group_id not in groups:
+                return
+            groups.discard(group_id)
+            self._members.get(group_id, set()).discard(user_id)
+            self._change_pairs(group_id, groups, -1)
+            self._forget_affected(group_id, groups)
+
+    def _change_pairs(self, group_id, others, delta):
+        row = self._co.setdefault(group_id, {})
+        for other in others:
+            for a, b in ((group_id, other), (other, group_id)):
+                pairs = self._co.setdefault(a, {})
+                count = pairs.get(b, 0) + delta
+                if count > 0:
+                    pairs[b] = count
+                else:
+                    pairs.pop(b, None)
+        if not row:
+            self._co.pop(group_id, None)
+
+    def _forget_affected(self, group_id, groups):
+        """Drops the cached top-K lists a membership change in group_id can
+        alter: those of its members and of the changing user's other groups'
+        members, and those of everyone with group_id as a candidate (members
+        of groups sharing members with it), whose score for it depends on
+        its size."""
+        affected = set()
+        for group in {group_id} | set(groups) | set(self._co.get(group_id, ())):
+            affected |= self._members.get(group, set())
+        for key in [key for key in self._top_k if key[0] in affected]:
+            del self._top_k[key]
+
+    def recommend(self, user_id, k=DEFAULT_TOP_K):
+        """Returns up to k (group_id, score) pairs for groups the user has not
+        joined, best first. Users without groups get an empty list."""
+        self._ensure_loaded()
+        with self._lock:
+            cached = self._top_k.get((user_id, k))
+            if cached is not None:
+                return list(cached)
+
+            joined = self._groups_of.get(user_id, set())
+            scores = {}
+            for group_id in joined:
+                size = len(self._members.get(group_id, ()))
+                for other, count in self._co.get(group_id, {}).items():
+                    if other in joined:
+                        continue
+                    other_size = len(self._members.get(other, ()))
+                    scores[other] = scores.get(other, 0.0) + count / math.sqrt(size * other_size)
+            top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+            self._top_k[(user_id, k)] = top
+            return list(top)
+
+    def clear(self):
+        with self._lock:
+            self._groups_of, self._members, self._co = {}, {}, {}
+            self._top_k.clear()
+            self._loaded_until = 0.0
+
+
+_recommender = GroupRecommender(fetch_memberships)
+
+
+def get_recommended_groups(user_id, k=DEFAULT_TOP_K):
+    """Returns up to k (GroupId, score) recommendations for a user."""
+    return _recommender.recommend(user_id, k)
+
+
+def record_membership_change(user_id, group_id, joined):
+    """Updates the co-membership table after a join (joined=True) or leave."""
+    if joined:
+        _recommender.join(user_id, group_id)
+    else:
+        _recommender.leave(user_id, group_id)
@@ -0,0 +1,74 @@
+#############################################################################
+# group_recommendations_test.py
+#
+# This file contains tests for group_recommendations.py.
+#############################################################################
+import math
+import unittest
+from unittest.mock import MagicMock
+
+from group_recommendations import GroupRecommender
+
+MEMBERSHIPS = [
+    ('alice', 'cycling'), ('alice', 'running'),
+    ('bob', 'cycling'), ('bob', 'running'), ('bob', 'yoga'),
+    ('carol', 'cycling'), ('carol', 'swimming'),
+    ('dave', 'yoga'),
+]
+
+
+class TestGroupRecommender(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = MagicMock(return_value=MEMBERSHIPS)
+        self.recommender = GroupRecommender(self.fetch)
+
+    def test_recommends_co_joined_groups_by_cosine(self):
+        result = self.recommender.recommend('alice', k=5)
+
+        # yoga: via cycling (bob) and running (bob); swimming: via cycling (carol)
+        yoga = 1 / math.sqrt(3 * 2) + 1 / math.sqrt(2 * 2)
+        swimming = 1 / math.sqrt(3 * 1)
+        self.assertEqual([group for group, _ in result], ['yoga', 'swimming'])
+        self.assertAlmostEqual(result[0][1], yoga)
+        self.assertAlmostEqual(result[1][1], swimming)
+
+    def test_never_recommends_joined_groups_and_respects_k(self):
+        result = self.recommender.recommend('bob', k=1)
+        self.assertEqual([group for group, _ in result], ['swimming'])
+
+    def test_user_without_groups_gets_nothing(self):
+        self.assertEqual(self.recommender.recommend('erin'), [])
+
+    def test_table_is_loaded_once(self):
+        self.recommender.recommend('alice')
+        self.recommender.recommend('bob')
+        self.fetch.assert_called_once()
+
+    def test_join_and_leave_update_incrementally(self):
+        self.recommender.recommend('dave')  # load and cache
+        self.recommender.join('dave', 'running')
+
+        # running is now co-joined with cycling (alice, bob) and yoga (bob, dave)
+        result = [group for group, _ in self.recommender.recommend('dave')]
+        self.assertIn('cycling', result)
+
+        self.recommender.leave('dave', 'running')
+        self.assertEqual(
+            self.recommender.recommend('dave'),
+            GroupRecommender(MagicMock(return_value=MEMBERSHIPS)).recommend('dave'),
+        )
+        self.fetch.assert_called_once()
+
+    def test_join_refreshes_users_with_the_group_as_candidate(self):
+        self.recommender.recommend('alice', k=5)
+
+        # alice is not in swimming or yoga, but scores swimming via cycling
+        self.recommender.join('dave', 'swimming')
+
+        fresh = GroupRecommender(MagicMock(return_value=MEMBERSHIPS + [('dave', 'swimming')]))
+        self.assertEqual(self.recommender.recommend('alice', k=5), fresh.recommend('alice', k=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
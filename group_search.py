@@ -0,0 +1,214 @@
+#############################################################################
+# group_search.py
+#
+# This file contains the search index behind the Discover Groups tab.
+# Instead of running str.contains over every group's name and description
+# on each rerun, the FitnessGroups catalog is tokenized once into an
+# inverted index (token -> groups) with category facets:
+#
+# - Every query term must match. A term matches a token exactly, as a
+#   prefix (so results show up while the user is still typing), or, when
+#   neither finds anything, through shared trigrams (small typos).
+# - Matches are ranked by idf-weighted score, with name matches counting
+#   more than description matches.
+#
+# The index is built once per catalog version (a fingerprint of the
+# catalog's text columns) and shared by every session in the process. The
+# Groups hub reads the catalog through the read cache and fingerprints it
+# once per read, so a rerun neither queries nor hashes it.
+#############################################################################
+
+import hashlib
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+import pandas as pd
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CATALOG_COLUMNS = ["GroupId", "Name", "Description", "Category"]
+
+# How much a token counts depending on where it appears
+FIELD_WEIGHTS = {"Name": 3.0, "Category": 2.0, "Description": 1.0}
+# Score multipliers for looser matches
+PREFIX_WEIGHT = 0.8
+TRIGRAM_WEIGHT = 0.5
+# Lowest trigram (Jaccard) similarity accepted for a fuzzy match
+MIN_TRIGRAM_SIMILARITY = 0.4
+# Upper bound on the tokens a single prefix expands to
+MAX_PREFIX_EXPANSIONS = 64
+# Number of catalog versions whose indexes are kept in memory
+MAX_INDEXES = 4
+
+
+def tokenize(text):
+    """Splits text into lowercase alphanumeric tokens."""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token):
+    """Returns the set of trigrams of a token, padded so short tokens have some."""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GroupSearchIndex:
+    """Inverted index over a list of groups.
+
+    Args:
+        groups: Iterable of dicts (or DataFrame rows) with the keys in
+            CATALOG_COLUMNS.
+    """
+
+    def __init__(self, groups):
+        self.group_ids = []
+        self._names = []
+        self._postings = {}  # token -> {doc: weight}
+        self._facets = {}  # category -> set of docs
+        for doc, group in enumerate(groups):
+            self.group_ids.append(group["GroupId"])
+            self._names.append(str(group["Name"] or "").lower())
+            self._facets.setdefault(group["Category"], set()).add(doc)
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(group[field]):
+                    postings = self._postings.setdefault(token, {})
+                    postings[doc] = postings.get(doc, 0.0) + weight
+
+        self._vocabulary = sorted(self._postings)
+        self._trigrams = {}  # trigram -> set of tokens
+        for token in self._vocabulary:
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+
+    def __len__(self):
+        return len(self.group_ids)
+
+    def facets(self):
+        """Returns the categories in the catalog, sorted."""
+        return sorted(self._facets, key=str)
+
+    def _idf(self, token):
+        return math.log(1 + len(self.group_ids) / len(self._postings[token]))
+
+    def _expand(self, term):
+        """Returns {token: multiplier} for the index tokens a query term matches."""
+        matches = {}
+        if term in self._postings:
+            matches[term] = 1.0
+        start = bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches.setdefault(token, PREFIX_WEIGHT)
+        if matches or len(term) < 3:
+            return matches
+
+        # No exact or prefix match: fall back to tokens sharing trigrams
+        grams = trigrams(term)
+        shared = {}
+        for gram in grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        for token, count in shared.items():
+            similarity = count / len(grams | trigrams(token))
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                matches[token] = TRIGRAM_WEIGHT * similarity
+        return matches
+
+    def _matching_docs(self, query, category=None):
+        """Returns {doc: score} for the groups matching every query term."""
+        if category is not None:
+            allowed = self._facets.get(category, set())
+        else:
+            allowed = None
+
+        terms = tokenize(query)
+        if not terms:
+            docs = allowed if allowed is not None else range(len(self.group_ids))
+            return {doc: 0.0 for doc in docs}
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, multiplier in self._expand(term).items():
+                idf = self._idf(token)
+                for doc, weight in self._postings[token].items():
+                    score = multiplier * idf * weight
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: scores[doc] + s for doc, s in term_scores.items() if doc in scores}
+            if not scores:
+                return {}
+        if allowed is not None:
+            scores = {doc: s for doc, s in scores.items() if doc in allowed}
+        return scores
+
+    def search(self, query, category=None, limit=None):
+        """Returns the GroupIds matching a query, best match first.
+
+        Args:
+            query (str): Free-text search; an empty query matches everything.
+            category (str): Optional category facet to restrict results to.
+            limit (int): Optional maximum number of results.
+        """
+        scores = self._matching_docs(query, category)
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], self._names[doc], doc))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.group_ids[doc] for doc in ranked]
+
+    def facet_counts(self, query):
+        """Returns {category: number of matching groups} for a query."""
+        matching = self._matching_docs(query).keys()
+        counts = {}
+        for category, docs in self._facets.items():
+            matched = len(docs & matching)
+            if matched:
+                counts[category] = matched
+        return counts
+
+
+_indexes = OrderedDict()  # catalog version -> GroupSearchIndex
+_lock = threading.Lock()
+
+
+def catalog_version(groups):
+    """Returns a fingerprint of the catalog's searchable columns."""
+    catalog = groups.reindex(columns=CATALOG_COLUMNS)
+    hashes = pd.util.hash_pandas_object(catalog, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def get_search_index(groups, version=None):
+    """Returns the search index for a catalog DataFrame, building it only
+    when this version of the catalog has not been indexed yet.
+
+    Callers that keep the catalog cached can pass its catalog_version so it
+    is not recomputed on every call."""
+    if version is None:
+        version = catalog_version(groups)
+    with _lock:
+        index = _indexes.get(version)
+        if index is not None:
+            _indexes.move_to_end(version)
+            return index
+
+    catalog = groups.reindex(columns=CATALOG_COLUMNS)
+    index = GroupSearchIndex(catalog.to_dict("records"))
+    with _lock:
+        _indexes[version] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear_search_indexes():
+    with _lock:
+        _indexes.clear()
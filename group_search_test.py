@@ -0,0 +1,76 @@
+#############################################################################
+# group_search_test.py
+#
+# This file contains tests for group_search.py.
+#############################################################################
+import unittest
+
+import pandas as pd
+
+from group_search import GroupSearchIndex, get_search_index, tokenize
+
+
+CATALOG = pd.DataFrame({
+    'GroupId': ['g1', 'g2', 'g3', 'g4'],
+    'Name': ['Cycling Club', 'Yoga Warriors', 'Trail Runners', 'Sunrise Yoga'],
+    'Description': ['Road cycling group', 'Morning yoga', 'Weekend trail running', 'Yoga and stretching at dawn'],
+    'Category': ['Cycling', 'Yoga', 'Running', 'Yoga'],
+    'member_count': [15, 8, 4, 2],
+})
+
+
+class TestGroupSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = GroupSearchIndex(CATALOG.to_dict('records'))
+
+    def test_tokenize_lowercases_and_splits(self):
+        self.assertEqual(tokenize("Morning-Yoga, 5K!"), ['morning', 'yoga', '5k'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_empty_query_matches_everything(self):
+        self.assertEqual(sorted(self.index.search('')), ['g1', 'g2', 'g3', 'g4'])
+
+    def test_name_matches_rank_above_description_matches(self):
+        index = GroupSearchIndex([
+            {'GroupId': 'a', 'Name': 'Evening Crew', 'Description': 'We meet in the morning too', 'Category': 'Running'},
+            {'GroupId': 'b', 'Name': 'Morning Crew', 'Description': 'Early runs', 'Category': 'Running'},
+        ])
+        self.assertEqual(index.search('morning'), ['b', 'a'])
+
+    def test_prefix_matches_while_typing(self):
+        self.assertEqual(self.index.search('cycl'), ['g1'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.index.search('trail run'), ['g3'])
+        self.assertEqual(self.index.search('trail yoga'), [])
+
+    def test_trigram_fallback_tolerates_typos(self):
+        self.assertEqual(self.index.search('runers'), ['g3'])
+
+    def test_category_facet_filters_and_counts(self):
+        self.assertEqual(self.index.search('', category='Yoga'), ['g4', 'g2'])
+        self.assertEqual(self.index.facet_counts('yoga'), {'Yoga': 2})
+        self.assertEqual(self.index.facets(), ['Cycling', 'Running', 'Yoga'])
+
+
+class TestGetSearchIndex(unittest.TestCase):
+
+    def test_index_is_reused_until_catalog_changes(self):
+        first = get_search_index(CATALOG)
+        # Member counts are not part of the catalog version
+        recounted = CATALOG.assign(member_count=[16, 8, 4, 2])
+        self.assertIs(get_search_index(recounted), first)
+
+        renamed = CATALOG.copy()
+        renamed.loc[0, 'Name'] = 'Bike Club'
+        self.assertIsNot(get_search_index(renamed), first)
+
+    def test_empty_catalog(self):
+        index = get_search_index(pd.DataFrame())
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.search('yoga'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,23 @@
 # This file contains internals for component templating. You do not need
 # to understand this file, but are welcome to read through it if you want.
 #
+# Each component file is read and split into literal text and {{KEY}}
+# placeholders once, then kept in memory until the file changes on disk, so
+# rendering a card is a single join instead of a file read and one
+# str.replace pass per key.
 #############################################################################
 
+import os
+import re
+import threading
+
 import streamlit.components.v1 as components
 
+COMPONENTS_DIR = 'custom_components'
+PLACEHOLDER_RE = re.compile(r"\{\{(.+?)\}\}")
+# Quotes and backslashes are escaped in templated values
+_ESCAPES = str.maketrans({"'": "\\'", '"': '\\"', '\\': '\\\\'})
+
 
 def load_html_file(file_path):
     # Read an html file
@@ -17,18 +30,84 @@ def load_html_file(file_path):
 
 def safe_string(string):
     # Make the string "safe" by escaping quotes and a backslash character
-    return ''.join(['\\' + c if c in ["'", '"', '\\'] else c for c in string])
+    return string.translate(_ESCAPES)
+
+
+class CompiledTemplate:
+    # A template split into literal segments and placeholder slots
+
+    def __init__(self, source):
+        self.parts = []  # literal text, with the raw {{KEY}} text in each slot
+        self.slots = []  # (position in parts, key)
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.parts.append(source[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(source[position:])
+
+    def render(self, data):
+        # Fill every placeholder found in data; unknown placeholders are left
+        # as they are. Keys are matched as strings, so e.g. a 1 key fills
+        # {{1}} like it did with str.replace
+        values = {str(key): value for key, value in data.items()}
+        parts = self.parts.copy()
+        for position, key in self.slots:
+            if key in values:
+                parts[position] = safe_string(str(values[key]))
+        return ''.join(parts)
+
+    def render_many(self, rows):
+        # Render the template once per data dict
+        return [self.render(data) for data in rows]
+
+
+class TemplateCache:
+    # Compiled templates by file path, recompiled when the file's
+    # modification time or size changes
+
+    def __init__(self):
+        self._templates = {}  # path -> (mtime_ns, size, CompiledTemplate)
+        self._lock = threading.Lock()
+
+    def get(self, file_path):
+        stat = os.stat(file_path)
+        with self._lock:
+            cached = self._templates.get(file_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        template = CompiledTemplate(load_html_file(file_path))
+        with self._lock:
+            self._templates[file_path] = (stat.st_mtime_ns, stat.st_size, template)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+_templates = TemplateCache()
+
+
+def get_template(component_name):
+    # Compiled template of custom_components/<component_name>.html
+    return _templates.get(os.path.join(COMPONENTS_DIR, f'{component_name}.html'))
+
+
+def render_component(data, component_name):
+    # Returns the component's HTML with the specified data filled in
+    return get_template(component_name).render(data)
+
+
+def render_components(rows, component_name):
+    # Returns the component's HTML once per data dict in rows
+    return get_template(component_name).render_many(rows)
 
 
 def create_component(data, component_name, height=None, width=None, scrolling=False):
-    # Read the HTML content from the file
-    component_html = load_html_file(f'custom_components/{component_name}.html')
-
-    # Replace the templates with the specified data
-    for key in data:
-        data_placeholder = "{{" + str(key) + "}}"
-        component_html = component_html.replace(
-            data_placeholder, safe_string(str(data[key])))
+    # Fill the component's template with the specified data
+    component_html = render_component(data, component_name)
 
     # Have streamlit render the component
     components.html(component_html, width, height, scrolling)
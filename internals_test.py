@@ -0,0 +1,76 @@
+#############################################################################
+# internals_test.py
+#
+# This file contains tests for internals.py.
+#############################################################################
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from internals import CompiledTemplate, TemplateCache, safe_string, create_component
+
+
+class TestCompiledTemplate(unittest.TestCase):
+
+    def test_render_fills_placeholders_and_escapes(self):
+        template = CompiledTemplate("<p>{{NAME}} says {{QUOTE}}</p>{{NAME}}")
+        html = template.render({'NAME': 'Remi', 'QUOTE': 'it\'s "fine" \\o/'})
+        self.assertEqual(html, '<p>Remi says it\\\'s \\"fine\\" \\\\o/</p>Remi')
+
+    def test_unknown_placeholders_are_left_alone(self):
+        template = CompiledTemplate("{{A}}-{{B}}")
+        self.assertEqual(template.render({'A': 1}), "1-{{B}}")
+
+    def test_non_string_keys_fill_placeholders(self):
+        template = CompiledTemplate("{{1}}-{{2.5}}")
+        self.assertEqual(template.render({1: 'one', 2.5: 'half'}), "one-half")
+
+    def test_values_are_not_rescanned_for_placeholders(self):
+        template = CompiledTemplate("{{A}}{{B}}")
+        self.assertEqual(template.render({'A': '{{B}}', 'B': 'x'}), "{{B}}x")
+
+    def test_render_many(self):
+        template = CompiledTemplate("<li>{{N}}</li>")
+        self.assertEqual(template.render_many([{'N': 1}, {'N': 2}]), ["<li>1</li>", "<li>2</li>"])
+
+    def test_safe_string(self):
+        self.assertEqual(safe_string('a"b\'c\\'), 'a\\"b\\\'c\\\\')
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "card.html")
+        with open(self.path, "w") as file:
+            file.write("<b>{{X}}</b>")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_is_read_once_until_it_changes(self):
+        cache = TemplateCache()
+        with patch('internals.load_html_file', wraps=lambda path: open(path).read()) as mock_load:
+            first = cache.get(self.path)
+            self.assertIs(cache.get(self.path), first)
+            self.assertEqual(mock_load.call_count, 1)
+
+            with open(self.path, "w") as file:
+                file.write("<i>{{X}}</i>!")
+            self.assertEqual(cache.get(self.path).render({'X': 1}), "<i>1</i>!")
+            self.assertEqual(mock_load.call_count, 2)
+
+
+class TestCreateComponent(unittest.TestCase):
+
+    @patch('internals.components.html')
+    def test_create_component_renders_template(self, mock_html):
+        create_component({'NAME': 'Remi'}, 'my_custom_component', height=100)
+        html = mock_html.call_args.args[0]
+        self.assertIn("Your name is: Remi", html)
+        self.assertEqual(mock_html.call_args.args[2], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,11 +70,15 @@ def display_activity_summary(workouts_list):
     """
     import streamlit as st
     import pandas as pd
+    from workout_metrics import compute_workout_metrics, format_duration
 
     if not workouts_list:
         st.write("No workout data available.")
         return
 
+    # Durations for every workout in one vectorized pass
+    durations = compute_workout_metrics(workouts_list)["duration_s"].to_numpy()
+
     st.markdown("<h2 style='text-align: center; color: white;'>OVERVIEW</h2>", unsafe_allow_html=True)
     st.markdown("<hr style='border: 1px solid #e0e0e0;'>", unsafe_allow_html=True)
 
@@ -89,91 +93,128 @@ def display_activity_summary(workouts_list):
 
         with col2:
             st.markdown(f"*Distance (km)*<br>{workout['distance']}", unsafe_allow_html=True)
-            st.markdown(f"*Time Spent*<br>60 min 0 sec", unsafe_allow_html=True)  # Assuming 60 minutes for now
+            st.markdown(f"*Time Spent*<br>{format_duration(durations[i])}", unsafe_allow_html=True)
             st.markdown(f"*End Coordinates*<br>({workout['end_lat_lng'][0]}, {workout['end_lat_lng'][1]})", unsafe_allow_html=True)
 
         st.markdown("<hr style='border: 1px solid #e0e0e0;'>", unsafe_allow_html=True)
 
-def display_recent_workouts(workouts_list):
+# Number of workout cards shown per page in Recent Workouts
+WORKOUTS_PAGE_SIZE = 9
+SELECTED_CARD_BORDER = "2px solid #0066ff"
+CARD_BORDER = "1px solid #ccc"
+ADD_WORKOUT_CARD = (
+    '<div style="border: 1px dashed #ccc; border-radius: 10px; padding: 15px; '
+    'text-align: center; cursor: pointer;"><h1>+</h1><p>Add Workout</p></div>'
+)
+
+
+def _page_durations(workouts):
+    """Returns the display duration of each workout on a page, computed in
+    one pass by the workout metrics engine. Workouts without an end time
+    are still in progress."""
+    from workout_metrics import compute_workout_metrics, format_duration
+
+    durations = compute_workout_metrics(workouts)["duration_s"].to_numpy()
+    return [
+        "In progress" if workout.get('end_timestamp') is None else format_duration(duration)
+        for workout, duration in zip(workouts, durations)
+    ]
+
+
+def read_workout_page(workouts, offset, limit):
+    """Returns (page, has_more) for a list of workouts or a paginated reader.
+
+    A reader is called as read_page(offset, limit) and returns at most
+    `limit` workouts; one extra workout is asked for to learn whether
+    another page follows.
+    """
+    if callable(workouts):
+        page = list(workouts(offset, limit + 1))
+        return page[:limit], len(page) > limit
+    return list(workouts[offset:offset + limit]), offset + limit < len(workouts)
+
+
+def display_recent_workouts(workouts_list, page_size=None, key="recent_workouts"):
     """Displays a 'recent workouts' component that showcases a user's recent workout history.
 
-    workouts_list: A list of dictionaries where each dictionary contains:
+    workouts_list: A list of dictionaries (or a paginated reader
+        read_page(offset, limit) returning such lists) where each dictionary contains:
         - start_timestamp: The start time of the workout in '%Y-%m-%d %H:%M:%S' format
         - end_timestamp: The end time of the workout in '%Y-%m-%d %H:%M:%S' format
-        - duration: The total time spent during the workout (e.g., '45 min')
         - distance: The distance covered during the workout (e.g., '3.5 miles')
         - steps: The number of steps taken during the workout (e.g., '7,200 steps')
-        - calories: The number of calories burned during the workout (e.g., '4,500 kcal')
-        - start_location: The GPS coordinates or address where the workout started
-        - stop_location: The GPS coordinates or address where the workout ended
+        - calories_burned: The number of calories burned during the workout (e.g., '4,500 kcal')
+        - start_lat_lng: The GPS coordinates or address where the workout started
+        - end_lat_lng: The GPS coordinates or address where the workout ended
 
     This component renders each workout as a card with a summary of the workout's 
     details. It also displays an 'Add Workout' button in the form of a card that 
     allows users to add new workout data.
+
+    Only one page of page_size cards (WORKOUTS_PAGE_SIZE by default) is
+    rendered, as a single HTML block, so a long history costs no more than a
+    short one. Durations are computed for the visible cards only (workouts
+    without an end time show as "In progress") and the workouts are not
+    modified.
     """
     import streamlit as st
-    from datetime import datetime
+    from internals import render_components
+    from modules import (
+        WORKOUTS_PAGE_SIZE, SELECTED_CARD_BORDER, CARD_BORDER, ADD_WORKOUT_CARD,
+        read_workout_page, _page_durations,
+    )
+
+    page_size = page_size or WORKOUTS_PAGE_SIZE
 
     st.header("Recent Workouts")
-    if not workouts_list:
+    page_key = f"{key}_page"
+    page_number = st.session_state.get(page_key, 0)
+    workouts, has_more = read_workout_page(workouts_list, page_number * page_size, page_size)
+    if not workouts and page_number > 0:
+        # The history shrank below the remembered page; start over
+        page_number = st.session_state[page_key] = 0
+        workouts, has_more = read_workout_page(workouts_list, 0, page_size)
+    if not workouts:
         st.write("No recent workouts available.")
         return
 
-    for workout in workouts_list:
-        # Calculate the duration of the workout
-        start_time = datetime.strptime(workout['start_timestamp'], '%Y-%m-%d %H:%M:%S')
-        end_time = datetime.strptime(workout['end_timestamp'], '%Y-%m-%d %H:%M:%S')
-        duration = end_time - start_time
-        workout['duration'] = str(duration)  # Store the duration in the 'duration' key
-
-    # Create a 3-column grid layout
-    cols = st.columns(3)
-    for i, workout in enumerate(workouts_list):
-        with cols[i % 3]:
-            # Add a blue border for the selected workout (you can change this condition)
-            if i == len(workouts_list) - 1:  
-                st.markdown(
-                    f"""
-                    <div style="border: 2px solid #0066ff; border-radius: 10px; padding: 15px;">
-                        <h5><b>DATE/TIME</b></h5>
-                        <p><b>DURATION:</b> {workout['duration']}</p>
-                        <p><b>DISTANCE:</b> {workout['distance']}</p>
-                        <p><b>STEPS:</b> {workout['steps']}</p>
-                        <p><b>CALORIES:</b> {workout['calories_burned']}</p>
-                        <p><b>START:</b> {workout['start_lat_lng']}</p>
-                        <p><b>STOP:</b> {workout['end_lat_lng']}</p>
-                    </div>
-                    """, 
-                    unsafe_allow_html=True
-                )
-            else:
-                # Normal card for other workouts
-                st.markdown(
-                    f"""
-                    <div style="border: 1px solid #ccc; border-radius: 10px; padding: 15px;">
-                        <h5><b>DATE/TIME</b></h5>
-                        <p><b>DURATION:</b> {workout['duration']}</p>
-                        <p><b>DISTANCE:</b> {workout['distance']}</p>
-                        <p><b>STEPS:</b> {workout['steps']}</p>
-                        <p><b>CALORIES:</b> {workout['calories_burned']}</p>
-                        <p><b>START:</b> {workout['start_lat_lng']}</p>
-                        <p><b>STOP:</b> {workout['end_lat_lng']}</p>
-                    </div>
-                    """, 
-                    unsafe_allow_html=True
-                )
-    
-    # Add the "+" card to add a new workout
-    with cols[len(workouts_list) % 3]:
-        st.markdown(
-            """
-            <div style="border: 1px dashed #ccc; border-radius: 10px; padding: 15px; text-align: center; cursor: pointer;">
-                <h1>+</h1>
-                <p>Add Workout</p>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
+    durations = _page_durations(workouts)
+    cards = render_components(
+        [
+            {
+                'BORDER': SELECTED_CARD_BORDER if (i == len(workouts) - 1 and not has_more) else CARD_BORDER,
+                'DURATION': durations[i],
+                'DISTANCE': workout['distance'],
+                'STEPS': workout['steps'],
+                'CALORIES': workout['calories_burned'],
+                'START': workout['start_lat_lng'],
+                'STOP': workout['end_lat_lng'],
+            }
+            for i, workout in enumerate(workouts)
+        ],
+        "workout_card",
+    )
+    # The "+" card to add a new workout closes the grid
+    cards.append(ADD_WORKOUT_CARD)
+    st.markdown(
+        '<div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 15px;">'
+        + "".join(card.strip() for card in cards)
+        + "</div>",
+        unsafe_allow_html=True
+    )
+
+    if page_number > 0 or has_more:
+        previous_col, label_col, next_col = st.columns([1, 2, 1])
+        with previous_col:
+            if page_number > 0 and st.button("← Newer", key=f"{key}_newer"):
+                st.session_state[page_key] = page_number - 1
+                st.rerun()
+        with label_col:
+            st.caption(f"Page {page_number + 1}")
+        with next_col:
+            if has_more and st.button("Older →", key=f"{key}_older"):
+                st.session_state[page_key] = page_number + 1
+                st.rerun()
 
 
 
@@ -197,5 +197,63 @@ class TestDisplayRecentWorkouts(unittest.TestCase):
         at.header[0].value == 'Recent Workouts'
         at.markdown == ""
 
+    def make_workouts(self, count):
+        return [
+            {
+                'workout_id': f'w{i}',
+                'start_timestamp': '2024-01-01 08:00:00',
+                'end_timestamp': '2024-01-01 08:45:00',
+                'distance': i, 'steps': 1000, 'calories_burned': 200,
+                'start_lat_lng': [1.0, 2.0], 'end_lat_lng': [1.5, 2.5],
+            }
+            for i in range(count)
+        ]
+
+    def test_only_one_page_is_rendered_as_one_block(self):
+        workouts = self.make_workouts(5000)
+        at = AppTest.from_function(display_recent_workouts, args=(workouts,))
+        at.run()
+
+        self.assertFalse(at.exception)
+        self.assertEqual(len(at.markdown), 1)
+        html = at.markdown[0].value
+        self.assertEqual(html.count('DURATION:</b> 45 min 0 sec'), 9)
+        self.assertIn('Add Workout', html)
+        self.assertEqual(at.button[0].label, 'Older →')
+        self.assertNotIn('duration', workouts[0])
+
+    def test_workout_in_progress(self):
+        workouts = self.make_workouts(2)
+        workouts[1]['end_timestamp'] = None
+        at = AppTest.from_function(display_recent_workouts, args=(workouts,))
+        at.run()
+
+        self.assertFalse(at.exception)
+        html = at.markdown[0].value
+        self.assertIn('DURATION:</b> 45 min 0 sec', html)
+        self.assertIn('DURATION:</b> In progress', html)
+
+    def test_next_page_from_paginated_reader(self):
+        workouts = self.make_workouts(12)
+        reads = []
+
+        def read_page(offset, limit):
+            reads.append((offset, limit))
+            return workouts[offset:offset + limit]
+
+        at = AppTest.from_function(display_recent_workouts, args=(read_page,))
+        at.run()
+        at.button[0].click().run()
+
+        self.assertFalse(at.exception)
+        # Every read asks for one page (plus one workout to detect the next)
+        self.assertEqual(reads[-1], (9, 10))
+        self.assertTrue(all(limit == 10 for _, limit in reads))
+        html = at.markdown[0].value
+        self.assertEqual(html.count('DURATION:'), 3)
+        # The very last workout is highlighted
+        self.assertEqual(html.count('2px solid #0066ff'), 1)
+        self.assertEqual(at.button[0].label, '← Newer')
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,144 @@
+#############################################################################
+# read_cache.py
+#
+# This file contains the read-through cache used by the data_fetcher
+# readers. Streamlit reruns the whole script on every click, so without it
+# the same profile, posts, workouts and goals are re-queried over and over.
+#
+# Readers opt in with the @cached(ttl=...) decorator. Writers call
+# invalidate(user_id, ...) after they change a user's data so that the user
+# always sees their own writes on the next rerun.
+#############################################################################
+
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+# Upper bound on the number of cached results kept in memory. When it is
+# reached the least recently used entry is evicted.
+MAX_ENTRIES = 1024
+
+
+class ReadCache:
+    """A thread-safe LRU cache whose entries each carry their own expiry.
+
+    Keys are (reader_name, args, kwargs) tuples; the first positional
+    argument of every cached reader is the user ID, which is what
+    invalidate() matches on.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id=None, readers=None):
+        """Drops entries for a user and/or a set of reader names.
+
+        Args:
+            user_id: Only drop entries whose first argument is this user.
+                None matches every user.
+            readers: Names of the readers to drop. None matches every reader.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                name, args, _ = key
+                if readers is not None and name not in readers:
+                    continue
+                if user_id is not None and args[:1] != (user_id,):
+                    continue
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns a dict with the hit/miss counters and current size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+_cache = ReadCache()
+
+
+def cached(ttl):
+    """Decorator that serves a reader's results from the shared cache.
+
+    Results are deep-copied on the way out so callers can mutate what they
+    get back without corrupting the cached copy. Calls whose arguments are
+    not hashable bypass the cache.
+
+    Args:
+        ttl (float): Seconds a cached result stays fresh.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                found, value = _cache.get(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            if not found:
+                value = func(*args, **kwargs)
+                _cache.set(key, value, ttl)
+            return copy.deepcopy(value)
+
+        wrapper.ttl = ttl
+        return wrapper
+    return decorator
+
+
+def invalidate(user_id, *readers):
+    """Drops a user's cached results for the given readers (all if none given).
+
+    Readers can be passed as the decorated functions or as their names.
+    """
+    names = {r if isinstance(r, str) else r.__name__ for r in readers} or None
+    _cache.invalidate(user_id=user_id, readers=names)
+
+
+def shared_cache():
+    """Returns the ReadCache behind @cached, for readers that build their own
+    keys (same (reader_name, args, kwargs) shape, user ID first) and should
+    still be dropped by invalidate() and clear_cache()."""
+    return _cache
+
+
+def cache_stats():
+    """Returns the shared cache's hit/miss counters and size."""
+    return _cache.stats()
+
+
+def clear_cache():
+    """Empties the shared cache and resets its counters."""
+    _cache.clear()
@@ -0,0 +1,80 @@
+#############################################################################
+# read_cache_test.py
+#
+# This file contains tests for read_cache.py.
+#############################################################################
+import unittest
+from unittest.mock import MagicMock, patch
+
+from read_cache import ReadCache, cached, invalidate, cache_stats
+
+
+class TestReadCache(unittest.TestCase):
+
+    def test_hit_after_miss(self):
+        loader = MagicMock(return_value=[{'post_id': 'post1'}])
+        reader = cached(ttl=60)(lambda user_id: loader(user_id))
+
+        first = reader('user1')
+        second = reader('user1')
+
+        loader.assert_called_once_with('user1')
+        self.assertEqual(first, second)
+        self.assertEqual(cache_stats()['hits'], 1)
+        self.assertEqual(cache_stats()['misses'], 1)
+
+    def test_results_are_copies(self):
+        reader = cached(ttl=60)(lambda user_id: [{'steps': 100}])
+
+        reader('user1')[0]['steps'] = 0
+
+        self.assertEqual(reader('user1')[0]['steps'], 100)
+
+    def test_entries_expire(self):
+        loader = MagicMock(return_value='profile')
+        reader = cached(ttl=10)(lambda user_id: loader(user_id))
+
+        with patch('read_cache.time.monotonic', return_value=100.0):
+            reader('user1')
+        with patch('read_cache.time.monotonic', return_value=111.0):
+            reader('user1')
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_lru_eviction(self):
+        cache = ReadCache(max_entries=2)
+        cache.set(('r', ('a',), ()), 1, ttl=60)
+        cache.set(('r', ('b',), ()), 2, ttl=60)
+        cache.get(('r', ('a',), ()))
+        cache.set(('r', ('c',), ()), 3, ttl=60)
+
+        self.assertTrue(cache.get(('r', ('a',), ()))[0])
+        self.assertFalse(cache.get(('r', ('b',), ()))[0])
+
+    def test_invalidate_only_touches_one_user_and_reader(self):
+        loader = MagicMock(side_effect=lambda user_id: user_id)
+
+        def get_thing(user_id):
+            return loader(user_id)
+        reader = cached(ttl=60)(get_thing)
+
+        reader('user1')
+        reader('user2')
+        invalidate('user1', get_thing)
+        reader('user1')
+        reader('user2')
+
+        self.assertEqual(loader.call_count, 3)
+
+    def test_unhashable_arguments_bypass_cache(self):
+        loader = MagicMock(return_value=[])
+        reader = cached(ttl=60)(lambda user_ids: loader(user_ids))
+
+        reader(['user1'])
+        reader(['user1'])
+
+        self.assertEqual(loader.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,353 @@
+#############################################################################
+# recurring_events.py
+#
+# This file contains recurring group workouts. A weekly run club is stored
+# once as a rule in ISE.RecurringEvents instead of one GroupEvents row per
+# week, and its occurrences are generated lazily for whatever window a view
+# is showing. The table's schema is RULES_TABLE_DDL:
+#
+#     RuleId STRING, GroupId STRING, Title STRING, Description STRING,
+#     Location STRING, MaxParticipants INT64, CreatorId STRING,
+#     StartDate DATETIME,          -- first occurrence
+#     Frequency STRING,            -- DAILY, WEEKLY or MONTHLY
+#     RepeatInterval INT64,        -- every N days/weeks/months
+#     Weekdays STRING,             -- WEEKLY only, e.g. "MO,WE,FR"
+#     Until DATETIME, Count INT64, -- optional end (inclusive / total count)
+#     Exceptions ARRAY<DATETIME>   -- cancelled occurrences
+#
+# The table is created by the first create_recurring_event if it does not
+# exist yet. Until then every reader (here, in rsvp_engine and in
+# schedule_conflicts) treats the missing table as "no recurring workouts",
+# so the app keeps working with one-off events only.
+#
+# Every occurrence has its own EventId (see occurrence_id), so RSVPs are
+# stored in EventAttendees against individual occurrences just like one-off
+# events.
+#############################################################################
+
+import uuid
+from datetime import datetime, timedelta
+
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+from data_gateway import get_gateway
+
+RULES_TABLE = "RecurringEvents"
+RULES_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        RuleId STRING NOT NULL,
+        GroupId STRING NOT NULL,
+        Title STRING,
+        Description STRING,
+        Location STRING,
+        MaxParticipants INT64,
+        CreatorId STRING,
+        StartDate DATETIME NOT NULL,
+        Frequency STRING NOT NULL,
+        RepeatInterval INT64,
+        Weekdays STRING,
+        Until DATETIME,
+        Count INT64,
+        Exceptions ARRAY<DATETIME>
+    )
+"""
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+OCCURRENCE_SEPARATOR = "@"
+OCCURRENCE_FORMAT = "%Y%m%dT%H%M"
+
+
+def create_rules_table():
+    """Creates the RecurringEvents table unless it already exists."""
+    client = get_gateway()
+    client.query(RULES_TABLE_DDL.format(table=client.table(RULES_TABLE))).result()
+
+
+def rules_table_missing(error):
+    """Returns True if a query failed because RecurringEvents does not exist."""
+    return isinstance(error, NotFound) and RULES_TABLE in str(error)
+
+
+def occurrence_id(rule_id, start):
+    """Returns the EventId of the occurrence of a rule starting at `start`."""
+    return f"{rule_id}{OCCURRENCE_SEPARATOR}{start.strftime(OCCURRENCE_FORMAT)}"
+
+
+def parse_occurrence_id(event_id):
+    """Returns (rule_id, start) for an occurrence EventId, or None for a
+    one-off event."""
+    rule_id, separator, stamp = event_id.rpartition(OCCURRENCE_SEPARATOR)
+    if not separator:
+        return None
+    try:
+        return rule_id, datetime.strptime(stamp, OCCURRENCE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _add_months(moment, months):
+    """Returns moment shifted by whole months, or None if the day does not
+    exist in the target month (e.g. the 31st)."""
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    try:
+        return moment.replace(year=year, month=month)
+    except ValueError:
+        return None
+
+
+def _candidates(rule, window_start):
+    """Yields the rule's occurrence times in order, ignoring Until, Count and
+    Exceptions. Without a Count, whole periods before window_start are
+    skipped arithmetically instead of being generated."""
+    start = rule['StartDate']
+    interval = max(int(rule.get('RepeatInterval') or 1), 1)
+    frequency = rule['Frequency']
+    skip = rule.get('Count') is None and window_start is not None and window_start > start
+
+    if frequency == "DAILY":
+        step = 0
+        if skip:
+            step = (window_start - start).days // interval
+        while True:
+            yield start + timedelta(days=step * interval)
+            step += 1
+
+    elif frequency == "WEEKLY":
+        codes = [c.strip().upper() for c in (rule.get('Weekdays') or "").split(",") if c.strip()]
+        weekdays = sorted({WEEKDAY_CODES.index(c) for c in codes}) or [start.weekday()]
+        week_start = start - timedelta(days=start.weekday())
+        week = 0
+        if skip:
+            week = (window_start - week_start).days // 7 // interval
+        while True:
+            monday = week_start + timedelta(weeks=week * interval)
+            for weekday in weekdays:
+                moment = monday + timedelta(days=weekday)
+                if moment >= start:
+                    yield moment
+            week += 1
+
+    elif frequency == "MONTHLY":
+        step = 0
+        if skip:
+            months = (window_start.year - start.year) * 12 + window_start.month - start.month
+            step = max(months // interval - 1, 0)
+        while True:
+            moment = _add_months(start, step * interval)
+            if moment is not None:
+                yield moment
+            step += 1
+
+    else:
+        raise ValueError(f"Unknown frequency: {frequency}")
+
+
+def expand(rule, window_start, window_end):
+    """Yields the rule's occurrence times in [window_start, window_end).
+
+    Generation stops at window_end, Until or Count, whichever comes first;
+    occurrences listed in Exceptions are skipped (they still count towards
+    Count).
+    """
+    until = rule.get('Until')
+    count = rule.get('Count')
+    exceptions = set(rule.get('Exceptions') or [])
+    for number, moment in enumerate(_candidates(rule, window_start), start=1):
+        if moment >= window_end or (until is not None and moment > until):
+            return
+        if count is not None and number > count:
+            return
+        if moment >= window_start and moment not in exceptions:
+            yield moment
+
+
+# Rule columns that describe the recurrence rather than the workout itself
+RECURRENCE_COLUMNS = {
+    "StartDate", "Frequency", "RepeatInterval", "Weekdays", "Until", "Count", "Exceptions",
+}
+
+
+def expand_occurrences(rules, window_start, window_end):
+    """Returns event dictionaries for every occurrence of the rules in the
+    window, oldest first.
+
+    Each occurrence carries the rule's non-recurrence columns (GroupId,
+    Title, Description, Location, MaxParticipants, CreatorId and any extra
+    columns the rule was read with) plus its own EventId and EventDate.
+    """
+    occurrences = []
+    for rule in rules:
+        base = {key: value for key, value in rule.items() if key not in RECURRENCE_COLUMNS}
+        for moment in expand(rule, window_start, window_end):
+            occurrences.append({
+                **base,
+                'EventId': occurrence_id(rule['RuleId'], moment),
+                'EventDate': moment,
+            })
+    occurrences.sort(key=lambda occurrence: occurrence['EventDate'])
+    return occurrences
+
+
+RULE_COLUMNS = [
+    "RuleId", "GroupId", "Title", "Description", "Location", "MaxParticipants",
+    "CreatorId", "StartDate", "Frequency", "RepeatInterval", "Weekdays",
+    "Until", "Count", "Exceptions",
+]
+
+
+def _rules_from_results(results, columns=RULE_COLUMNS):
+    return [{column: getattr(row, column) for column in columns} for row in results]
+
+
+def _query_rules(client, query, params, columns=RULE_COLUMNS):
+    """Runs a rules query; a missing rules table means there are no rules."""
+    try:
+        results = client.query(query, params=params).result()
+    except Exception as e:
+        if not rules_table_missing(e):
+            raise
+        print(f"{RULES_TABLE} does not exist yet; no recurring workouts to show")
+        return []
+    return _rules_from_results(results, columns)
+
+
+def fetch_group_rules(group_ids, window_start=None):
+    """Returns the rules of the given groups that can still have occurrences
+    on or after window_start."""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return []
+    client = get_gateway()
+    query = f"""
+        SELECT {", ".join(RULE_COLUMNS)}
+        FROM {client.table(RULES_TABLE)}
+        WHERE GroupId IN UNNEST(@group_ids)
+        AND (@window_start IS NULL OR Until IS NULL OR Until >= @window_start)
+    """
+    params = [
+        bigquery.ArrayQueryParameter("group_ids", "STRING", group_ids),
+        bigquery.ScalarQueryParameter("window_start", "DATETIME", window_start),
+    ]
+    return _query_rules(client, query, params)
+
+
+def fetch_created_rules(user_ids, window_start=None):
+    """Returns the rules created by any of the given users that can still
+    have occurrences on or after window_start."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    client = get_gateway()
+    query = f"""
+        SELECT {", ".join(RULE_COLUMNS)}
+        FROM {client.table(RULES_TABLE)}
+        WHERE CreatorId IN UNNEST(@user_ids)
+        AND (@window_start IS NULL OR Until IS NULL OR Until >= @window_start)
+    """
+    params = [
+        bigquery.ArrayQueryParameter("user_ids", "STRING", user_ids),
+        bigquery.ScalarQueryParameter("window_start", "DATETIME", window_start),
+    ]
+    return _query_rules(client, query, params)
+
+
+# Group details returned with each rule by fetch_user_rules (calendar cards)
+GROUP_COLUMNS = ["GroupName", "Category", "MemberCount"]
+
+
+def fetch_user_rules(user_id, window_start=None):
+    """Returns the rules of every group the user belongs to, each with the
+    group's name, category and member count (GROUP_COLUMNS)."""
+    client = get_gateway()
+    query = f"""
+        WITH member_counts AS (
+            SELECT GroupId, COUNT(*) AS member_count
+            FROM {client.table('GroupMemberships')}
+            GROUP BY GroupId
+        )
+        SELECT {", ".join("r." + column for column in RULE_COLUMNS)},
+               g.Name AS GroupName,
+               g.Category,
+               IFNULL(mc.member_count, 0) AS MemberCount
+        FROM {client.table(RULES_TABLE)} r
+        JOIN {client.table('FitnessGroups')} g
+        ON r.GroupId = g.GroupId
+        LEFT JOIN member_counts mc
+        ON r.GroupId = mc.GroupId
+        WHERE r.GroupId IN (
+            SELECT GroupId
+            FROM {client.table('GroupMemberships')}
+            WHERE UserId = @user_id
+        )
+        AND (@window_start IS NULL OR r.Until IS NULL OR r.Until >= @window_start)
+    """
+    params = [
+        bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
+        bigquery.ScalarQueryParameter("window_start", "DATETIME", window_start),
+    ]
+    return _query_rules(client, query, params, RULE_COLUMNS + GROUP_COLUMNS)
+
+
+def create_recurring_event(group_id, user_id, start, frequency, interval=1, weekdays=None,
+                           until=None, count=None, title="Group Workout", description="",
+                           location=None, max_participants=20):
+    """Stores a new recurrence rule and returns its RuleId.
+
+    Raises:
+        ValueError: If the frequency or weekdays are not valid.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    codes = [code.upper() for code in (weekdays or [])]
+    if any(code not in WEEKDAY_CODES for code in codes):
+        raise ValueError(f"Unknown weekdays: {weekdays}")
+
+    rule_id = f"rule_{uuid.uuid4().hex}"
+    client = get_gateway()
+    query = f"""
+        INSERT INTO {client.table(RULES_TABLE)}
+        ({", ".join(RULE_COLUMNS)})
+        VALUES (@rule_id, @group_id, @title, @description, @location, @max_participants,
+                @creator_id, @start, @frequency, @interval, @weekdays, @until, @count, [])
+    """
+    params = [
+        bigquery.ScalarQueryParameter("rule_id", "STRING", rule_id),
+        bigquery.ScalarQueryParameter("group_id", "STRING", group_id),
+        bigquery.ScalarQueryParameter("title", "STRING", title),
+        bigquery.ScalarQueryParameter("description", "STRING", description),
+        bigquery.ScalarQueryParameter("location", "STRING", location),
+        bigquery.ScalarQueryParameter("max_participants", "INT64", max_participants),
+        bigquery.ScalarQueryParameter("creator_id", "STRING", user_id),
+        bigquery.ScalarQueryParameter("start", "DATETIME", start),
+        bigquery.ScalarQueryParameter("frequency", "STRING", frequency),
+        bigquery.ScalarQueryParameter("interval", "INT64", interval),
+        bigquery.ScalarQueryParameter("weekdays", "STRING", ",".join(codes) or None),
+        bigquery.ScalarQueryParameter("until", "DATETIME", until),
+        bigquery.ScalarQueryParameter("count", "INT64", count),
+    ]
+    try:
+        client.query(query, params=params).result()
+    except Exception as e:
+        if not rules_table_missing(e):
+            raise
+        # First recurring workout of this deployment
+        create_rules_table()
+        client.query(query, params=params).result()
+    return rule_id
+
+
+def cancel_occurrence(rule_id, start):
+    """Adds one occurrence of a rule to its Exceptions."""
+    client = get_gateway()
+    query = f"""
+        UPDATE {client.table(RULES_TABLE)}
+        SET Exceptions = ARRAY_CONCAT(IFNULL(Exceptions, []), [@start])
+        WHERE RuleId = @rule_id
+    """
+    params = [
+        bigquery.ScalarQueryParameter("rule_id", "STRING", rule_id),
+        bigquery.ScalarQueryParameter("start", "DATETIME", start),
+    ]
+    client.query(query, params=params).result()
@@ -0,0 +1,106 @@
+#############################################################################
+# recurring_events_test.py
+#
+# This file contains tests for recurring_events.py.
+#############################################################################
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import NotFound
+
+from recurring_events import (
+    expand, expand_occurrences, occurrence_id, parse_occurrence_id, fetch_group_rules, create_recurring_event,
+)
+
+MISSING_RULES = NotFound("Not found: Table p:ISE.RecurringEvents was not found in location US")
+
+
+def rule(**overrides):
+    base = {
+        'RuleId': 'rule1', 'GroupId': 'group1', 'Title': 'Run Club',
+        'StartDate': datetime(2025, 6, 2, 7, 0),  # a Monday
+        'Frequency': 'WEEKLY', 'RepeatInterval': 1, 'Weekdays': None,
+        'Until': None, 'Count': None, 'Exceptions': [],
+    }
+    base.update(overrides)
+    return base
+
+
+class TestExpand(unittest.TestCase):
+
+    def test_weekly_on_several_weekdays(self):
+        result = list(expand(rule(Weekdays="MO,TH"), datetime(2025, 6, 1), datetime(2025, 6, 15)))
+        self.assertEqual([d.day for d in result], [2, 5, 9, 12])
+
+    def test_every_other_week_skips_ahead_to_window(self):
+        result = list(expand(rule(RepeatInterval=2), datetime(2026, 6, 1), datetime(2026, 7, 1)))
+        # 2026-06-01 is 52 weeks after 2025-06-02
+        self.assertEqual(result, [datetime(2026, 6, d, 7, 0) for d in (1, 15, 29)])
+
+    def test_daily_until_is_inclusive(self):
+        result = list(expand(
+            rule(Frequency='DAILY', Until=datetime(2025, 6, 4, 7, 0)),
+            datetime(2025, 6, 1), datetime(2025, 7, 1),
+        ))
+        self.assertEqual([d.day for d in result], [2, 3, 4])
+
+    def test_count_includes_occurrences_before_window_and_exceptions(self):
+        r = rule(Frequency='DAILY', Count=5, Exceptions=[datetime(2025, 6, 5, 7, 0)])
+        result = list(expand(r, datetime(2025, 6, 4), datetime(2025, 7, 1)))
+        self.assertEqual([d.day for d in result], [4, 6])
+
+    def test_monthly_skips_missing_days(self):
+        r = rule(Frequency='MONTHLY', StartDate=datetime(2025, 1, 31, 18, 0))
+        result = list(expand(r, datetime(2025, 1, 1), datetime(2025, 6, 1)))
+        self.assertEqual([d.month for d in result], [1, 3, 5])
+
+    def test_unknown_frequency_raises(self):
+        with self.assertRaises(ValueError):
+            list(expand(rule(Frequency='HOURLY'), datetime(2025, 6, 1), datetime(2025, 7, 1)))
+
+
+class TestOccurrences(unittest.TestCase):
+
+    def test_occurrences_get_their_own_event_ids(self):
+        occurrences = expand_occurrences(
+            [rule(GroupName='Runners')], datetime(2025, 6, 1), datetime(2025, 6, 10),
+        )
+
+        self.assertEqual([o['EventId'] for o in occurrences], ['rule1@20250602T0700', 'rule1@20250609T0700'])
+        self.assertEqual(occurrences[0]['GroupName'], 'Runners')
+        self.assertNotIn('Frequency', occurrences[0])
+
+    def test_occurrence_ids_round_trip(self):
+        start = datetime(2025, 6, 2, 7, 0)
+        self.assertEqual(parse_occurrence_id(occurrence_id('rule1', start)), ('rule1', start))
+        self.assertIsNone(parse_occurrence_id('event_group1_202506020700'))
+
+
+@patch('recurring_events.get_gateway')
+class TestMissingRulesTable(unittest.TestCase):
+
+    def test_readers_treat_missing_table_as_no_rules(self, mock_get_gateway):
+        mock_get_gateway.return_value.query.side_effect = MISSING_RULES
+        self.assertEqual(fetch_group_rules(['group1']), [])
+
+    def test_other_errors_are_raised(self, mock_get_gateway):
+        mock_get_gateway.return_value.query.side_effect = NotFound("Not found: Table p:ISE.FitnessGroups")
+        with self.assertRaises(NotFound):
+            fetch_group_rules(['group1'])
+
+    def test_first_rule_creates_the_table(self, mock_get_gateway):
+        client = mock_get_gateway.return_value
+        client.table.side_effect = lambda name: f"`p.ISE.{name}`"
+        client.query.side_effect = [MISSING_RULES, MagicMock(), MagicMock()]
+
+        rule_id = create_recurring_event('group1', 'alice', datetime(2025, 6, 2, 7, 0), 'WEEKLY')
+
+        self.assertTrue(rule_id.startswith('rule_'))
+        queries = [call.args[0] for call in client.query.call_args_list]
+        self.assertIn('CREATE TABLE IF NOT EXISTS `p.ISE.RecurringEvents`', queries[1])
+        self.assertIn('INSERT INTO', queries[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+#############################################################################
+# rsvp_engine.py
+#
+# This file contains the RSVP engine behind rsvp_to_workout and the event
+# cards. Each event's capacity, attendees and waitlist are loaded once (for
+# many events in a single query) and kept in memory, so:
+#
+# - RSVPs for the same event are admitted one at a time under a per-event
+#   lock, which enforces uniqueness and MaxParticipants without a
+#   check-then-insert race. A full event puts the user on the waitlist.
+# - The decision is made in memory and the lock is released before the row
+#   is written (a streaming insert, no DML job), so a burst of RSVPs for a
+#   popular event is not serialized on BigQuery round trips.
+# - Cards read attendee counts and capacity from memory.
+#
+# Waitlisted users are stored in ISE.EventWaitlist:
+#     EventId STRING, UserId STRING, JoinedAt TIMESTAMP
+#
+# Admission is serialized per app instance. Event state is re-read after
+# EVENT_STATE_TTL so RSVPs made through other instances are picked up; the
+# re-read rows are merged into the existing EventState under its lock, so
+# there is only ever one object admitting for an event and admissions whose
+# rows are still being written are never lost.
+#############################################################################
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from google.cloud import bigquery
+
+from data_gateway import get_gateway
+from recurring_events import RULES_TABLE, OCCURRENCE_SEPARATOR, parse_occurrence_id, rules_table_missing
+
+ATTENDEES_TABLE = "EventAttendees"
+WAITLIST_TABLE = "EventWaitlist"
+EVENT_STATE_TTL = 60
+# How many events' states are kept in memory; past this, the least recently
+# used states that are expired and not admitting anyone are dropped
+MAX_EVENTS = 2048
+# Used when an event has no MaxParticipants
+DEFAULT_CAPACITY = 20
+
+ATTENDING = "attending"
+WAITLISTED = "waitlisted"
+ALREADY_ATTENDING = "already_attending"
+ALREADY_WAITLISTED = "already_waitlisted"
+
+
+class EventState:
+    """Capacity, attendees and waitlist of one event."""
+
+    def __init__(self, event_id, creator_id, capacity, attendees, waitlist):
+        self.event_id = event_id
+        self.creator_id = creator_id
+        self.capacity = capacity if capacity is not None else DEFAULT_CAPACITY
+        self.attendees = set(attendees)
+        self.waitlist = list(waitlist)
+        self.lock = threading.Lock()
+        self.expires_at = time.monotonic() + EVENT_STATE_TTL
+
+    @property
+    def spots_left(self):
+        return max(self.capacity - len(self.attendees), 0)
+
+    def merge(self, loaded):
+        """Folds a freshly loaded state into this one. Call with self.lock held.
+
+        Attendees and waitlisted users already admitted in memory are kept,
+        since their rows may not have been written yet.
+        """
+        self.creator_id = loaded.creator_id
+        self.capacity = loaded.capacity
+        self.attendees |= loaded.attendees
+        self.waitlist += [u for u in loaded.waitlist if u not in self.waitlist and u not in self.attendees]
+        self.expires_at = loaded.expires_at
+
+
+def fetch_event_states(event_ids):
+    """Returns {event_id: EventState} for the given events with one query.
+
+    Occurrences of recurring workouts (see recurring_events.occurrence_id)
+    take their creator and capacity from their rule.
+    """
+    event_ids = list(event_ids)
+    occurrence_ids = [e for e in event_ids if parse_occurrence_id(e) is not None]
+    try:
+        return _query_event_states(event_ids, occurrence_ids)
+    except Exception as e:
+        if not occurrence_ids or not rules_table_missing(e):
+            raise
+        # No rules table yet, so there are no occurrences to look up
+        return _query_event_states(event_ids, [])
+
+
+def _query_event_states(event_ids, occurrence_ids):
+    client = get_gateway()
+    # Occurrences are only joined to their rules when some were asked for
+    occurrences = f"""
+            UNION ALL
+            SELECT occurrence AS EventId, r.CreatorId, r.MaxParticipants
+            FROM UNNEST(@occurrence_ids) AS occurrence
+            JOIN {client.table(RULES_TABLE)} r
+            ON r.RuleId = SPLIT(occurrence, '{OCCURRENCE_SEPARATOR}')[OFFSET(0)]
+    """ if occurrence_ids else ""
+    query = f"""
+        WITH events AS (
+            SELECT EventId, CreatorId, MaxParticipants
+            FROM {client.table('GroupEvents')}
+            WHERE EventId IN UNNEST(@event_ids)
+            {occurrences}
+        )
+        SELECT
+            e.EventId,
+            e.CreatorId,
+            e.MaxParticipants,
+            ARRAY(
+                SELECT a.UserId FROM {client.table(ATTENDEES_TABLE)} a
+                WHERE a.EventId = e.EventId
+            ) AS attendees,
+            ARRAY(
+                SELECT w.UserId FROM {client.table(WAITLIST_TABLE)} w
+                WHERE w.EventId = e.EventId
+                ORDER BY w.JoinedAt
+            ) AS waitlist
+        FROM events e
+    """
+    params = [bigquery.ArrayQueryParameter("event_ids", "STRING", event_ids)]
+    if occurrence_ids:
+        params.append(bigquery.ArrayQueryParameter("occurrence_ids", "STRING", occurrence_ids))
+    return {
+        row.EventId: EventState(row.EventId, row.CreatorId, row.MaxParticipants, row.attendees, row.waitlist)
+        for row in client.query(query, params=params).result()
+    }
+
+
+class RSVPEngine:
+    """In-memory event states with serialized, capacity-aware admission.
+
+    Args:
+        fetch: Callable fetch(event_ids) returning {event_id: EventState}.
+        write: Callable write(table_name, rows) persisting rows and returning
+            a list of errors (like insert_rows_json).
+        max_events: Number of event states kept in memory. Only expired,
+            unlocked states are evicted, so the bound can be exceeded while
+            many events are busy.
+    """
+
+    def __init__(self, fetch, write, max_events=MAX_EVENTS):
+        self._fetch = fetch
+        self._write = write
+        self.max_events = max_events
+        # event_id -> EventState, least recently used first; a stored state
+        # is never replaced, only evicted once expired and unlocked
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        # Only one thread reloads at a time, so a burst crossing the TTL
+        # causes one query instead of one per caller
+        self._load_lock = threading.Lock()
+
+    def _stale(self, event_ids):
+        now = time.monotonic()
+        with self._lock:
+            return [e for e in event_ids if e not in self._states or self._states[e].expires_at <= now]
+
+    def states(self, event_ids):
+        """Returns {event_id: EventState}, loading every missing or stale
+        event with a single fetch. Unknown events are left out."""
+        event_ids = list(dict.fromkeys(event_ids))
+        if self._stale(event_ids):
+            with self._load_lock:
+                # Another thread may have reloaded while we waited
+                stale = self._stale(event_ids)
+                if stale:
+                    self._load(stale)
+        with self._lock:
+            found = {e: self._states[e] for e in event_ids if e in self._states}
+            for event_id in found:
+                self._states.move_to_end(event_id)
+            return found
+
+    def _load(self, event_ids):
+        loaded = self._fetch(event_ids)
+        for event_id, fresh in loaded.items():
+            with self._lock:
+                state = self._states.setdefault(event_id, fresh)
+            if state is not fresh:
+                with state.lock:
+                    state.merge(fresh)
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        # Call with self._lock held. Drops least recently used states until
+        # the bound is met, skipping any that are fresh or mid-admission.
+        excess = len(self._states) - self.max_events
+        if excess <= 0:
+            return
+        now = time.monotonic()
+        for event_id, state in list(self._states.items()):
+            if excess <= 0:
+                break
+            if state.expires_at <= now and not state.lock.locked():
+                del self._states[event_id]
+                excess -= 1
+
+    def rsvp(self, user_id, event_id):
+        """RSVPs a user to an event.
+
+        Returns:
+            tuple: (status, waitlist_position). status is one of ATTENDING,
+            WAITLISTED, ALREADY_ATTENDING or ALREADY_WAITLISTED; the position
+            is 1-based and only set for waitlisted users.
+
+        Raises:
+            KeyError: If the event does not exist.
+            RuntimeError: If the RSVP could not be written (the admission is
+                rolled back).
+        """
+        state = self.states([event_id]).get(event_id)
+        if state is None:
+            raise KeyError(f"Unknown event: {event_id}")
+
+        with state.lock:
+            if user_id in state.attendees:
+                return ALREADY_ATTENDING, None
+            if user_id in state.waitlist:
+                return ALREADY_WAITLISTED, state.waitlist.index(user_id) + 1
+            if state.spots_left > 0:
+                state.attendees.add(user_id)
+                status, position = ATTENDING, None
+            else:
+                state.waitlist.append(user_id)
+                status, position = WAITLISTED, len(state.waitlist)
+
+        now = datetime.now(timezone.utc).isoformat()
+        if status == ATTENDING:
+            errors = self._write(ATTENDEES_TABLE, [{"EventId": event_id, "UserId": user_id, "RSVPDate": now}])
+        else:
+            errors = self._write(WAITLIST_TABLE, [{"EventId": event_id, "UserId": user_id, "JoinedAt": now}])
+
+        if errors:
+            with state.lock:
+                state.attendees.discard(user_id)
+                if user_id in state.waitlist:
+                    state.waitlist.remove(user_id)
+            raise RuntimeError(f"Failed to save RSVP: {errors}")
+        return status, position
+
+    def invalidate(self, event_ids=None):
+        """Marks event states stale so their next use reloads them (the
+        objects themselves are kept so in-flight admissions stay valid)."""
+        event_ids = None if event_ids is None else set(event_ids)
+        with self._lock:
+            for event_id, state in self._states.items():
+                if event_ids is None or event_id in event_ids:
+                    state.expires_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+def _write_rows(table_name, rows):
+    return get_gateway().insert_rows_json(table_name, rows)
+
+
+_engine = RSVPEngine(fetch_event_states, _write_rows)
+
+
+def rsvp(user_id, event_id):
+    """RSVPs a user to an event; see RSVPEngine.rsvp."""
+    return _engine.rsvp(user_id, event_id)
+
+
+def get_event_states(event_ids):
+    """Returns {event_id: EventState} for the given events (cached)."""
+    if not event_ids:
+        return {}
+    return _engine.states(event_ids)
+
+
+def invalidate_events(event_ids=None):
+    """Forgets cached event states (e.g. after an event is created or edited)."""
+    _engine.invalidate(event_ids)
@@ -0,0 +1,175 @@
+#############################################################################
+# rsvp_engine_test.py
+#
+# This file contains tests for rsvp_engine.py.
+#############################################################################
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import NotFound
+
+from rsvp_engine import (
+    RSVPEngine, EventState, fetch_event_states, ATTENDING, WAITLISTED, ALREADY_ATTENDING, ALREADY_WAITLISTED,
+)
+
+
+def make_engine(capacity=2, attendees=(), waitlist=(), write_errors=None):
+    fetch = MagicMock(side_effect=lambda ids: {
+        e: EventState(e, 'creator', capacity, attendees, waitlist) for e in ids
+    })
+    write = MagicMock(return_value=write_errors or [])
+    return RSVPEngine(fetch, write), fetch, write
+
+
+class TestRSVPEngine(unittest.TestCase):
+
+    def test_admits_until_full_then_waitlists(self):
+        engine, _, write = make_engine(capacity=2)
+
+        self.assertEqual(engine.rsvp('u1', 'e1'), (ATTENDING, None))
+        self.assertEqual(engine.rsvp('u2', 'e1'), (ATTENDING, None))
+        self.assertEqual(engine.rsvp('u3', 'e1'), (WAITLISTED, 1))
+        self.assertEqual(engine.rsvp('u4', 'e1'), (WAITLISTED, 2))
+
+        tables = [call.args[0] for call in write.call_args_list]
+        self.assertEqual(tables, ['EventAttendees', 'EventAttendees', 'EventWaitlist', 'EventWaitlist'])
+
+    def test_duplicate_rsvps_are_not_written(self):
+        engine, _, write = make_engine(capacity=1, attendees=['u1'], waitlist=['u2'])
+
+        self.assertEqual(engine.rsvp('u1', 'e1'), (ALREADY_ATTENDING, None))
+        self.assertEqual(engine.rsvp('u2', 'e1'), (ALREADY_WAITLISTED, 1))
+        write.assert_not_called()
+
+    def test_failed_write_rolls_back_admission(self):
+        engine, _, _ = make_engine(capacity=1, write_errors=['boom'])
+
+        with self.assertRaises(RuntimeError):
+            engine.rsvp('u1', 'e1')
+        self.assertEqual(len(engine.states(['e1'])['e1'].attendees), 0)
+
+    def test_states_are_loaded_once_for_many_events(self):
+        engine, fetch, _ = make_engine()
+
+        engine.states(['e1', 'e2'])
+        engine.rsvp('u1', 'e1')
+        engine.states(['e1', 'e2', 'e3'])
+
+        self.assertEqual(fetch.call_count, 2)
+        fetch.assert_called_with(['e3'])
+
+    def test_burst_never_oversubscribes(self):
+        engine, _, _ = make_engine(capacity=10)
+        engine.states(['e1'])
+        results = []
+
+        def attempt(user_id):
+            results.append(engine.rsvp(user_id, 'e1')[0])
+
+        threads = [threading.Thread(target=attempt, args=(f"u{i}",)) for i in range(200)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(ATTENDING), 10)
+        self.assertEqual(results.count(WAITLISTED), 190)
+        self.assertEqual(len(engine.states(['e1'])['e1'].attendees), 10)
+
+    def test_reload_merges_into_the_same_state(self):
+        engine, fetch, _ = make_engine(capacity=2, attendees=['db_user'])
+        state = engine.states(['e1'])['e1']
+        engine.rsvp('u1', 'e1')  # admitted in memory; its row may not be loadable yet
+        state.expires_at = 0
+
+        reloaded = engine.states(['e1'])['e1']
+
+        self.assertIs(reloaded, state)
+        self.assertEqual(state.attendees, {'db_user', 'u1'})
+        self.assertEqual(engine.rsvp('u2', 'e1'), (WAITLISTED, 1))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_stale_burst_reloads_once(self):
+        engine, fetch, _ = make_engine(capacity=5)
+        state = engine.states(['e1'])['e1']
+        state.expires_at = 0
+        results = []
+
+        def attempt(user_id):
+            results.append(engine.rsvp(user_id, 'e1')[0])
+
+        threads = [threading.Thread(target=attempt, args=(f"u{i}",)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(results.count(ATTENDING), 5)
+        self.assertIs(engine.states(['e1'])['e1'], state)
+
+    def test_invalidate_keeps_the_state_object(self):
+        engine, fetch, _ = make_engine()
+        state = engine.states(['e1'])['e1']
+        engine.invalidate(['e1'])
+        self.assertIs(engine.states(['e1'])['e1'], state)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_evicts_only_expired_unlocked_states(self):
+        engine, _, _ = make_engine()
+        engine.max_events = 2
+        busy = engine.states(['e1'])['e1']
+        idle = engine.states(['e2'])['e2']
+        engine.invalidate(['e1', 'e2'])
+
+        with busy.lock:
+            engine.states(['e3'])
+
+        self.assertIs(engine.states(['e1'])['e1'], busy)
+        self.assertIsNot(engine.states(['e2'])['e2'], idle)
+
+    def test_fresh_states_are_not_evicted(self):
+        engine, _, _ = make_engine()
+        engine.max_events = 1
+        first = engine.states(['e1'])['e1']
+        engine.states(['e2'])
+        self.assertIs(engine.states(['e1'])['e1'], first)
+
+    def test_unknown_event_raises(self):
+        engine = RSVPEngine(MagicMock(return_value={}), MagicMock())
+        with self.assertRaises(KeyError):
+            engine.rsvp('u1', 'missing')
+
+
+@patch('rsvp_engine.get_gateway')
+class TestFetchEventStates(unittest.TestCase):
+
+    def test_one_off_events_do_not_touch_the_rules_table(self, mock_get_gateway):
+        client = mock_get_gateway.return_value
+        client.table.side_effect = lambda name: f"`p.ISE.{name}`"
+        client.query.return_value.result.return_value = []
+
+        fetch_event_states(['event1'])
+
+        self.assertNotIn('RecurringEvents', client.query.call_args.args[0])
+
+    def test_missing_rules_table_falls_back_to_one_off_events(self, mock_get_gateway):
+        client = mock_get_gateway.return_value
+        client.table.side_effect = lambda name: f"`p.ISE.{name}`"
+        rows = MagicMock()
+        rows.result.return_value = [
+            MagicMock(EventId='event1', CreatorId='alice', MaxParticipants=5, attendees=[], waitlist=[]),
+        ]
+        client.query.side_effect = [
+            NotFound("Not found: Table p:ISE.RecurringEvents was not found in location US"), rows,
+        ]
+
+        states = fetch_event_states(['event1', 'rule1@20250602T0700'])
+
+        self.assertEqual(list(states), ['event1'])
+        self.assertNotIn('RecurringEvents', client.query.call_args.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
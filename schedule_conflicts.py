@@ -0,0 +1,241 @@
+#############################################################################
+# schedule_conflicts.py
+#
+# This file contains the scheduling conflict detector used by the workout
+# scheduling forms. Each user's commitments (events they created or RSVP'd
+# to) are kept in a sorted interval index, so "which of these users are
+# busy between t1 and t2" is a binary search per user instead of a query
+# per user. Commitments for a whole list of users (e.g. every member of a
+# group) are read with one query for events plus one for the recurring
+# workouts they created, whose occurrences are expanded up to
+# COMMITMENT_HORIZON ahead.
+#
+# GroupEvents has no duration column, so events are assumed to last
+# DEFAULT_EVENT_DURATION.
+#############################################################################
+
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta
+
+from google.cloud import bigquery
+
+from data_gateway import get_gateway
+from recurring_events import (
+    RULES_TABLE, OCCURRENCE_FORMAT, OCCURRENCE_SEPARATOR, expand_occurrences, fetch_created_rules,
+    rules_table_missing,
+)
+
+DEFAULT_EVENT_DURATION = timedelta(hours=1)
+# How long a user's loaded commitments are trusted before being re-read
+COMMITMENTS_TTL = 5 * 60
+# How far ahead the occurrences of a user's own recurring workouts count
+COMMITMENT_HORIZON = timedelta(days=365)
+
+
+def fetch_commitments(user_ids):
+    """Returns {user_id: [event dicts]} of events the users created or RSVP'd to.
+
+    Events include the occurrences of recurring workouts the users RSVP'd to
+    and, up to COMMITMENT_HORIZON ahead, of the ones they created. Every
+    user in user_ids gets an entry, even without events. Each event dict
+    has EventId, Title, start and end.
+    """
+    user_ids = list(user_ids)
+    commitments = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return commitments
+
+    try:
+        rows = _query_commitments(user_ids, include_occurrences=True)
+    except Exception as e:
+        if not rules_table_missing(e):
+            raise
+        # No rules table yet, so nobody can have RSVP'd to an occurrence
+        rows = _query_commitments(user_ids, include_occurrences=False)
+    for row in rows:
+        # An event without a date (or an occurrence id that does not parse)
+        # cannot conflict with anything
+        if row.EventDate is None:
+            continue
+        commitments.setdefault(row.UserId, []).append({
+            'EventId': row.EventId,
+            'Title': row.Title,
+            'start': row.EventDate,
+            'end': row.EventDate + DEFAULT_EVENT_DURATION,
+        })
+
+    # Occurrences of the users' own recurring workouts (skipping any they
+    # also RSVP'd to)
+    now = datetime.now()
+    window_start = now - DEFAULT_EVENT_DURATION
+    rules = fetch_created_rules(user_ids, window_start)
+    known = {}  # user_id -> EventIds already in their commitments
+    for occurrence in expand_occurrences(rules, window_start, now + COMMITMENT_HORIZON):
+        creator_id = occurrence['CreatorId']
+        events = commitments.setdefault(creator_id, [])
+        if creator_id not in known:
+            known[creator_id] = {event['EventId'] for event in events}
+        if occurrence['EventId'] in known[creator_id]:
+            continue
+        events.append({
+            'EventId': occurrence['EventId'],
+            'Title': occurrence['Title'],
+            'start': occurrence['EventDate'],
+            'end': occurrence['EventDate'] + DEFAULT_EVENT_DURATION,
+        })
+    return commitments
+
+
+def _query_commitments(user_ids, include_occurrences):
+    """Returns (UserId, EventId, Title, EventDate) rows of the events the
+    users created or RSVP'd to, including occurrences of recurring workouts
+    when include_occurrences is set."""
+    client = get_gateway()
+    occurrences = f"""
+        UNION DISTINCT
+        -- RSVPs to occurrences of recurring workouts; the start time is
+        -- part of the occurrence's EventId
+        SELECT a.UserId, a.EventId, r.Title,
+               SAFE.PARSE_DATETIME('{OCCURRENCE_FORMAT}', SPLIT(a.EventId, '{OCCURRENCE_SEPARATOR}')[SAFE_OFFSET(1)])
+        FROM {client.table('EventAttendees')} a
+        JOIN {client.table(RULES_TABLE)} r
+        ON r.RuleId = SPLIT(a.EventId, '{OCCURRENCE_SEPARATOR}')[SAFE_OFFSET(0)]
+        WHERE a.UserId IN UNNEST(@user_ids)
+        AND STRPOS(a.EventId, '{OCCURRENCE_SEPARATOR}') > 0
+        -- Cancelled occurrences are listed in the rule's Exceptions
+        AND SAFE.PARSE_DATETIME('{OCCURRENCE_FORMAT}', SPLIT(a.EventId, '{OCCURRENCE_SEPARATOR}')[SAFE_OFFSET(1)])
+            NOT IN UNNEST(IFNULL(r.Exceptions, []))
+    """ if include_occurrences else ""
+    query = f"""
+        SELECT e.CreatorId AS UserId, e.EventId, e.Title, e.EventDate
+        FROM {client.table('GroupEvents')} e
+        WHERE e.CreatorId IN UNNEST(@user_ids)
+        UNION DISTINCT
+        SELECT a.UserId, e.EventId, e.Title, e.EventDate
+        FROM {client.table('EventAttendees')} a
+        JOIN {client.table('GroupEvents')} e
+        ON a.EventId = e.EventId
+        WHERE a.UserId IN UNNEST(@user_ids)
+        {occurrences}
+    """
+    params = [bigquery.ArrayQueryParameter("user_ids", "STRING", user_ids)]
+    return client.query(query, params=params).result()
+
+
+class IntervalIndex:
+    """A user's commitments sorted by start, with a running maximum of end.
+
+    overlapping(start, end) finds the last interval starting before `end`
+    by binary search and walks back only while the running maximum end
+    shows that an earlier interval can still reach past `start`.
+    """
+
+    def __init__(self, intervals):
+        self._intervals = sorted(intervals, key=lambda i: i['start'])
+        self._starts = [i['start'] for i in self._intervals]
+        self._max_end = []
+        latest = None
+        for interval in self._intervals:
+            latest = interval['end'] if latest is None else max(latest, interval['end'])
+            self._max_end.append(latest)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def overlapping(self, start, end):
+        """Returns the intervals with interval.start < end and interval.end > start."""
+        found = []
+        position = bisect.bisect_left(self._starts, end) - 1
+        while position >= 0 and self._max_end[position] > start:
+            interval = self._intervals[position]
+            if interval['end'] > start:
+                found.append(interval)
+            position -= 1
+        found.reverse()
+        return found
+
+
+class ConflictDetector:
+    """Per-user interval indexes, loaded in bulk and refreshed after a TTL.
+
+    Args:
+        fetch: Callable fetch(user_ids) returning {user_id: [event dicts]}.
+        ttl: Seconds a user's index is trusted.
+    """
+
+    def __init__(self, fetch, ttl=COMMITMENTS_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._indexes = {}  # user_id -> (expires_at, IntervalIndex)
+        self._lock = threading.Lock()
+
+    def _indexes_for(self, user_ids):
+        now = time.monotonic()
+        wanted = set(user_ids)
+        with self._lock:
+            fresh = {u: e[1] for u, e in self._indexes.items() if u in wanted and e[0] > now}
+        missing = [u for u in user_ids if u not in fresh]
+        if missing:
+            # One query for every user that is not loaded yet
+            loaded = {u: IntervalIndex(events) for u, events in self._fetch(missing).items()}
+            with self._lock:
+                for user_id, index in loaded.items():
+                    self._indexes[user_id] = (now + self.ttl, index)
+            fresh.update(loaded)
+        return fresh
+
+    def find_conflicts(self, user_ids, start, end, exclude_event_id=None):
+        """Returns {user_id: [overlapping events]} for the users busy in [start, end).
+
+        Users without a conflict are left out.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        indexes = self._indexes_for(user_ids)
+        conflicts = {}
+        for user_id in user_ids:
+            index = indexes.get(user_id)
+            if index is None:
+                continue
+            events = [e for e in index.overlapping(start, end) if e['EventId'] != exclude_event_id]
+            if events:
+                conflicts[user_id] = events
+        return conflicts
+
+    def invalidate(self, user_ids=None):
+        """Drops loaded commitments for some users (or everyone)."""
+        with self._lock:
+            if user_ids is None:
+                self._indexes.clear()
+            else:
+                for user_id in user_ids:
+                    self._indexes.pop(user_id, None)
+
+
+_detector = ConflictDetector(fetch_commitments)
+
+
+def find_conflicts(user_ids, start, end=None, exclude_event_id=None):
+    """Returns {user_id: [overlapping events]} for the users already busy
+    between start and end (start + DEFAULT_EVENT_DURATION if end is None)."""
+    if end is None:
+        end = start + DEFAULT_EVENT_DURATION
+    return _detector.find_conflicts(user_ids, start, end, exclude_event_id)
+
+
+def invalidate_commitments(user_ids=None):
+    """Forgets loaded commitments after events or RSVPs change."""
+    _detector.invalidate(user_ids)
+
+
+def describe_conflicts(conflicts, names=None):
+    """Formats find_conflicts output as one warning line per busy user."""
+    names = names or {}
+    lines = []
+    for user_id, events in conflicts.items():
+        titles = ", ".join(
+            f"{event['Title']} ({event['start']:%b %d %I:%M %p})" for event in events
+        )
+        lines.append(f"{names.get(user_id, user_id)} is already busy: {titles}")
+    return lines
@@ -0,0 +1,119 @@
+#############################################################################
+# schedule_conflicts_test.py
+#
+# This file contains tests for schedule_conflicts.py.
+#############################################################################
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import NotFound
+
+from schedule_conflicts import ConflictDetector, IntervalIndex, describe_conflicts, fetch_commitments
+
+
+def commitment(event_id, start, hours=1):
+    return {'EventId': event_id, 'Title': event_id.title(), 'start': start, 'end': start + timedelta(hours=hours)}
+
+
+MORNING = datetime(2025, 6, 15, 8, 0)
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IntervalIndex([
+            commitment('late', MORNING + timedelta(hours=10)),
+            commitment('long', MORNING - timedelta(hours=2), hours=5),
+            commitment('early', MORNING - timedelta(hours=6)),
+        ])
+
+    def test_finds_overlaps_including_long_earlier_events(self):
+        found = self.index.overlapping(MORNING + timedelta(hours=2), MORNING + timedelta(hours=3))
+        self.assertEqual([e['EventId'] for e in found], ['long'])
+
+    def test_touching_intervals_do_not_overlap(self):
+        self.assertEqual(self.index.overlapping(MORNING + timedelta(hours=3), MORNING + timedelta(hours=4)), [])
+
+    def test_results_are_in_start_order(self):
+        found = self.index.overlapping(MORNING - timedelta(hours=6), MORNING + timedelta(hours=11))
+        self.assertEqual([e['EventId'] for e in found], ['early', 'long', 'late'])
+
+
+class TestConflictDetector(unittest.TestCase):
+
+    def test_group_wide_check_uses_one_fetch(self):
+        fetch = MagicMock(return_value={
+            'alice': [commitment('run', MORNING)],
+            'bob': [],
+            'carol': [commitment('yoga', MORNING + timedelta(hours=5))],
+        })
+        detector = ConflictDetector(fetch)
+
+        conflicts = detector.find_conflicts(['alice', 'bob', 'carol'], MORNING + timedelta(minutes=30), MORNING + timedelta(hours=2))
+        detector.find_conflicts(['alice', 'bob'], MORNING, MORNING + timedelta(hours=1))
+
+        fetch.assert_called_once_with(['alice', 'bob', 'carol'])
+        self.assertEqual(list(conflicts), ['alice'])
+        self.assertEqual(conflicts['alice'][0]['EventId'], 'run')
+
+    def test_invalidated_users_are_reloaded(self):
+        fetch = MagicMock(side_effect=[{'alice': []}, {'alice': [commitment('run', MORNING)]}])
+        detector = ConflictDetector(fetch)
+
+        self.assertEqual(detector.find_conflicts(['alice'], MORNING, MORNING + timedelta(hours=1)), {})
+        detector.invalidate(['alice'])
+        conflicts = detector.find_conflicts(['alice'], MORNING, MORNING + timedelta(hours=1))
+
+        self.assertIn('alice', conflicts)
+
+    @patch('schedule_conflicts.fetch_created_rules', return_value=[])
+    @patch('schedule_conflicts.get_gateway')
+    def test_rows_without_a_date_are_skipped(self, mock_get_gateway, mock_rules):
+        mock_get_gateway.return_value.query.return_value.result.return_value = [
+            MagicMock(UserId='alice', EventId='run', Title='Run', EventDate=MORNING),
+            MagicMock(UserId='alice', EventId='rule1@bad', Title='Yoga', EventDate=None),
+        ]
+
+        commitments = fetch_commitments(['alice'])
+
+        self.assertEqual([e['EventId'] for e in commitments['alice']], ['run'])
+
+    @patch('schedule_conflicts.fetch_created_rules')
+    @patch('schedule_conflicts.get_gateway')
+    def test_created_recurring_workouts_are_commitments(self, mock_get_gateway, mock_rules):
+        tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=7, minute=0, second=0, microsecond=0)
+        mock_get_gateway.return_value.query.return_value.result.return_value = []
+        mock_rules.return_value = [{
+            'RuleId': 'rule1', 'GroupId': 'g1', 'Title': 'Run Club', 'CreatorId': 'alice',
+            'StartDate': tomorrow, 'Frequency': 'WEEKLY', 'RepeatInterval': 1, 'Weekdays': None,
+            'Until': None, 'Count': 3, 'Exceptions': [tomorrow + timedelta(weeks=1)],
+        }]
+
+        commitments = fetch_commitments(['alice', 'bob'])
+
+        self.assertEqual([e['start'] for e in commitments['alice']], [tomorrow, tomorrow + timedelta(weeks=2)])
+        self.assertEqual(commitments['bob'], [])
+
+    @patch('schedule_conflicts.fetch_created_rules', return_value=[])
+    @patch('schedule_conflicts.get_gateway')
+    def test_missing_rules_table_falls_back_to_one_off_events(self, mock_get_gateway, mock_rules):
+        rows = MagicMock()
+        rows.result.return_value = [MagicMock(UserId='alice', EventId='run', Title='Run', EventDate=MORNING)]
+        mock_get_gateway.return_value.table.side_effect = lambda name: f"`p.ISE.{name}`"
+        mock_get_gateway.return_value.query.side_effect = [
+            NotFound("Not found: Table p:ISE.RecurringEvents was not found in location US"), rows,
+        ]
+
+        commitments = fetch_commitments(['alice'])
+
+        self.assertEqual([e['EventId'] for e in commitments['alice']], ['run'])
+        self.assertNotIn('RecurringEvents', mock_get_gateway.return_value.query.call_args.args[0])
+
+    def test_describe_conflicts_uses_names(self):
+        lines = describe_conflicts({'alice': [commitment('run', MORNING)]}, {'alice': 'Alice'})
+        self.assertEqual(lines, ["Alice is already busy: Run (Jun 15 08:00 AM)"])
+
+
+if __name__ == '__main__':
+    unittest.main()
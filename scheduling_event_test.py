@@ -2,7 +2,10 @@ import unittest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 import pandas as pd
-from fitness_groups import schedule_group_workout, get_group_events
+from fitness_groups import (
+    schedule_group_workout, get_group_events, get_event_statuses, create_event, create_event_with_report,
+    cancel_workout_occurrence, join_group, INVITED, INVITE_FAILED
+)
 
 
 class TestGroupEventsAndScheduling(unittest.TestCase):
@@ -49,6 +52,101 @@ class TestGroupEventsAndScheduling(unittest.TestCase):
         self.assertTrue(mock_success.called)
         self.assertFalse(mock_error.called)
 
+    @patch('rsvp_engine.get_gateway')
+    def test_get_event_statuses_single_query(self, mock_get_gateway):
+        """Test that statuses for many events come from one query"""
+        mock_get_gateway.return_value.query.return_value.result.return_value = [
+            MagicMock(EventId='event1', CreatorId=self.user_id, MaxParticipants=10, attendees=[], waitlist=[]),
+            MagicMock(EventId='event2', CreatorId='someone', MaxParticipants=4,
+                      attendees=['a', 'b', 'c', self.user_id], waitlist=['d']),
+        ]
+
+        result = get_event_statuses(self.user_id, ['event1', 'event2'])
+        get_event_statuses(self.user_id, ['event1', 'event2'])
+
+        self.assertEqual(mock_get_gateway.return_value.query.call_count, 1)
+        self.assertEqual(result['event1'], {
+            'is_creator': True, 'attending': False, 'waitlisted': False, 'attendee_count': 0, 'capacity': 10})
+        self.assertEqual(result['event2'], {
+            'is_creator': False, 'attending': True, 'waitlisted': False, 'attendee_count': 4, 'capacity': 4})
+
+    @patch('rsvp_engine.get_gateway')
+    def test_get_event_statuses_no_events(self, mock_get_gateway):
+        """Test that an empty event list needs no query"""
+        self.assertEqual(get_event_statuses(self.user_id, []), {})
+        mock_get_gateway.assert_not_called()
+
+    @patch('fitness_groups.warn_about_conflicts')
+    @patch('fitness_groups.get_client')
+    def test_create_event_invites_everyone_in_one_job(self, mock_client, mock_warn):
+        """Test that the event and all invitees are written with a single query"""
+        invitees = [f"member{i}" for i in range(300)] + ["member0", self.user_id]
+
+        event_id, report = create_event_with_report("Group Ride", self.future_time, 60, self.user_id, invitees)
+
+        self.assertIsNotNone(event_id)
+        self.assertEqual(mock_client.return_value.query.call_count, 1)
+        params = {p.name: p for p in mock_client.return_value.query.call_args.kwargs['job_config'].query_parameters}
+        # The creator is invited like anyone else listed
+        self.assertEqual(len(params['invitee_ids'].values), 301)
+        self.assertEqual(report['member1'], INVITED)
+        # A repeated invitee keeps their first status and is invited once
+        self.assertEqual(report['member0'], INVITED)
+        self.assertEqual(params['invitee_ids'].values.count('member0'), 1)
+        self.assertEqual(len(report), 301)
+        self.assertEqual(report[self.user_id], INVITED)
+
+    @patch('streamlit.error')
+    @patch('fitness_groups.warn_about_conflicts')
+    @patch('fitness_groups.get_client')
+    def test_create_event_failure_reports_every_invitee(self, mock_client, mock_warn, mock_error):
+        """Test that a failed write marks the invitees as failed"""
+        mock_client.return_value.query.side_effect = Exception("BigQuery error")
+
+        event_id, report = create_event_with_report("Group Ride", self.future_time, 60, self.user_id, ["a", "b", "a", self.user_id])
+
+        self.assertIsNone(event_id)
+        self.assertEqual(report, {"a": INVITE_FAILED, "b": INVITE_FAILED, self.user_id: INVITE_FAILED})
+        mock_error.assert_called_once()
+
+    @patch('fitness_groups.warn_about_conflicts')
+    @patch('fitness_groups.get_client')
+    def test_create_event_returns_event_id(self, mock_client, mock_warn):
+        """Test that create_event still returns just the new EventId"""
+        event_id = create_event("Group Ride", self.future_time, 60, self.user_id, ["a"])
+        self.assertIsInstance(event_id, str)
+
+    @patch('streamlit.success')
+    @patch('fitness_groups.invalidate_commitments')
+    @patch('fitness_groups.cancel_occurrence')
+    def test_cancel_workout_occurrence(self, mock_cancel, mock_invalidate, mock_success):
+        """Test that cancelling an occurrence records an exception on its rule"""
+        self.assertTrue(cancel_workout_occurrence("rule1@20250602T0700"))
+        mock_cancel.assert_called_once_with("rule1", datetime(2025, 6, 2, 7, 0))
+        mock_invalidate.assert_called_once_with()
+
+    @patch('streamlit.error')
+    @patch('fitness_groups.cancel_occurrence')
+    def test_cancel_one_off_event_is_rejected(self, mock_cancel, mock_error):
+        """Test that one-off events cannot be cancelled as occurrences"""
+        self.assertFalse(cancel_workout_occurrence("event_group1_202506020700"))
+        mock_cancel.assert_not_called()
+
+    @patch('streamlit.success')
+    @patch('fitness_groups.record_membership')
+    @patch('fitness_groups.record_membership_change')
+    @patch('fitness_groups.invalidate_calendar')
+    @patch('fitness_groups.get_client')
+    def test_join_group_invalidates_calendar(self, mock_client, mock_invalidate, mock_change, mock_record, mock_success):
+        """Test that joining a group drops the user's cached calendar months"""
+        mock_client.return_value.query.return_value.to_dataframe.side_effect = [
+            pd.DataFrame({'is_member': [0]}),
+            pd.DataFrame({'Name': ['Run Club']}),
+        ]
+
+        self.assertTrue(join_group(self.user_id, self.group_id))
+        mock_invalidate.assert_called_once()
+        self.assertEqual(mock_invalidate.call_args.kwargs['user_id'], self.user_id)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,317 @@
+#############################################################################
+# social_graph.py
+#
+# This file contains the in-memory social graph used for friend and group
+# co-member lookups. Friends and GroupMemberships are read with one query
+# and stored as compressed sparse rows (CSR): for every node, a slice of one
+# sorted numpy array holds its neighbours, so
+#
+# - friends of a user is an array slice,
+# - mutual friends of two users is an intersection of two sorted slices,
+# - friend-of-friend suggestions and co-members are one concatenation and
+#   one np.unique over the neighbours' slices,
+#
+# instead of a BigQuery round trip each.
+#
+# Users and groups are interned to integer ids. Friendships added or
+# removed after loading (and group joins/leaves) are kept in a small overlay
+# of per-node sets that is merged into lookups, and folded into freshly
+# built arrays once it grows past COMPACT_AFTER changes. The whole graph is
+# re-read after GRAPH_TTL to pick up changes made through other instances.
+#############################################################################
+
+import threading
+import time
+
+import numpy as np
+
+from data_gateway import get_gateway
+
+GRAPH_TTL = 10 * 60
+# Pending overlay changes before the arrays are rebuilt
+COMPACT_AFTER = 1024
+DEFAULT_SUGGESTIONS = 5
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def fetch_edges():
+    """Returns (friendships, memberships) as lists of (UserId, UserId) and
+    (UserId, GroupId) pairs, read with a single query."""
+    client = get_gateway()
+    query = f"""
+        SELECT 'friend' AS Kind, UserId1 AS Source, UserId2 AS Target
+        FROM {client.table('Friends')}
+        UNION ALL
+        SELECT 'member' AS Kind, UserId AS Source, GroupId AS Target
+        FROM {client.table('GroupMemberships')}
+    """
+    friendships, memberships = [], []
+    for row in client.query(query).result():
+        if row.Kind == 'friend':
+            friendships.append((row.Source, row.Target))
+        else:
+            memberships.append((row.Source, row.Target))
+    return friendships, memberships
+
+
+class CSRAdjacency:
+    """Neighbour lists of nodes 0..n-1 packed into two numpy arrays.
+
+    The neighbours of node i are targets[offsets[i]:offsets[i + 1]], sorted
+    and without duplicates.
+    """
+
+    def __init__(self, sources, targets, size):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if len(sources):
+            pairs = np.unique(np.stack([sources, targets], axis=1), axis=0)
+            sources, targets = pairs[:, 0], pairs[:, 1]
+        self.size = size
+        self.targets = targets
+        self.offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=size), out=self.offsets[1:])
+
+    def row(self, node):
+        if node is None or node >= self.size:
+            return EMPTY
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edges(self):
+        """Returns (sources, targets) arrays of every stored edge."""
+        return np.repeat(np.arange(self.size), np.diff(self.offsets)), self.targets
+
+
+class Relation:
+    """A CSR adjacency plus an overlay of edges added or removed since it
+    was built."""
+
+    def __init__(self, sources=(), targets=(), size=0):
+        self._csr = CSRAdjacency(sources, targets, size)
+        self._added = {}  # node -> set of neighbours
+        self._removed = {}  # node -> set of neighbours
+        self.pending = 0
+
+    def row(self, node):
+        base = self._csr.row(node)
+        removed = self._removed.get(node)
+        added = self._added.get(node)
+        if removed:
+            base = base[~np.isin(base, list(removed))]
+        if added:
+            base = np.union1d(base, np.fromiter(added, dtype=np.int64))
+        return base
+
+    def change(self, source, target, present):
+        """Records an edge being added (present=True) or removed."""
+        keep, drop = (self._added, self._removed) if present else (self._removed, self._added)
+        drop.get(source, set()).discard(target)
+        in_base = target in set(self._csr.row(source).tolist())
+        if in_base != present:
+            keep.setdefault(source, set()).add(target)
+        self.pending += 1
+
+    def compacted(self, size):
+        """Returns a new Relation with the overlay folded into the arrays."""
+        sources, targets = self._csr.edges()
+        if self._removed:
+            keep = np.ones(len(sources), dtype=bool)
+            for node, removed in self._removed.items():
+                start, end = self._csr.offsets[node], self._csr.offsets[node + 1]
+                keep[start:end] &= ~np.isin(targets[start:end], list(removed))
+            sources, targets = sources[keep], targets[keep]
+        added = [(node, target) for node, targets_ in self._added.items() for target in targets_]
+        if added:
+            extra = np.array(added, dtype=np.int64)
+            sources = np.concatenate([sources, extra[:, 0]])
+            targets = np.concatenate([targets, extra[:, 1]])
+        return Relation(sources, targets, size)
+
+
+class Interner:
+    """Maps string ids to dense integer ids and back.
+
+    With fold_case, ids that differ only in case map to the same node (user
+    ids are matched with LOWER() elsewhere in the app); the first spelling
+    seen is the one returned.
+    """
+
+    def __init__(self, fold_case=False):
+        self.ids = []
+        self._index = {}
+        self._fold_case = fold_case
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _key(self, key):
+        return key.lower() if self._fold_case and isinstance(key, str) else key
+
+    def get(self, key):
+        return self._index.get(self._key(key))
+
+    def add(self, key):
+        folded = self._key(key)
+        node = self._index.get(folded)
+        if node is None:
+            node = self._index[folded] = len(self.ids)
+            self.ids.append(key)
+        return node
+
+    def names(self, nodes):
+        return [self.ids[node] for node in nodes]
+
+
+class SocialGraph:
+    """Friendships and group memberships with fast neighbourhood queries.
+
+    Args:
+        fetch: Callable returning (friendships, memberships) pairs.
+        ttl: Seconds before the graph is re-read from fetch.
+    """
+
+    def __init__(self, fetch, ttl=GRAPH_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.clear()
+
+    def load(self, friendships, memberships):
+        """Rebuilds the graph from (user, user) and (user, group) pairs."""
+        users, groups = Interner(fold_case=True), Interner()
+        friend_edges = []
+        for a, b in friendships:
+            if a == b:
+                continue
+            a, b = users.add(a), users.add(b)
+            friend_edges += [(a, b), (b, a)]
+        member_edges = [(users.add(u), groups.add(g)) for u, g in memberships]
+
+        friends = Relation(*_columns(friend_edges), len(users))
+        groups_of = Relation(*_columns(member_edges), len(users))
+        members = Relation(*_columns([(g, u) for u, g in member_edges]), len(groups))
+        with self._lock:
+            self._users, self._groups = users, groups
+            self._friends, self._groups_of, self._members = friends, groups_of, members
+            self._loaded_until = time.monotonic() + self.ttl
+
+    def _ensure_loaded(self):
+        with self._lock:
+            fresh = self._loaded_until > time.monotonic()
+        if not fresh:
+            self.load(*self._fetch())
+
+    def friends_of(self, user_id):
+        """Returns the user's friends' ids."""
+        self._ensure_loaded()
+        with self._lock:
+            node = self._users.get(user_id)
+            return self._users.names(self._friends.row(node))
+
+    def mutual_friend_count(self, user_id, other_id):
+        """Returns how many friends two users have in common."""
+        self._ensure_loaded()
+        with self._lock:
+            a = self._friends.row(self._users.get(user_id))
+            b = self._friends.row(self._users.get(other_id))
+            return int(len(np.intersect1d(a, b, assume_unique=True)))
+
+    def suggest_friends(self, user_id, k=DEFAULT_SUGGESTIONS):
+        """Returns up to k (user_id, mutual friend count) pairs of friends of
+        friends who are not yet friends with the user, most mutual first."""
+        self._ensure_loaded()
+        with self._lock:
+            node = self._users.get(user_id)
+            friends = self._friends.row(node)
+            if node is None or not len(friends):
+                return []
+            reachable = np.concatenate([self._friends.row(friend) for friend in friends])
+            candidates, counts = np.unique(reachable, return_counts=True)
+            keep = (candidates != node) & ~np.isin(candidates, friends)
+            candidates, counts = candidates[keep], counts[keep]
+            # Highest count first, ties broken by interned id (stable order)
+            order = np.lexsort((candidates, -counts))[:k]
+            return [(self._users.ids[candidates[i]], int(counts[i])) for i in order]
+
+    def co_members(self, user_id):
+        """Returns the ids of everyone sharing at least one group with the user."""
+        self._ensure_loaded()
+        with self._lock:
+            node = self._users.get(user_id)
+            groups = self._groups_of.row(node)
+            if not len(groups):
+                return []
+            members = np.unique(np.concatenate([self._members.row(group) for group in groups]))
+            return self._users.names(members[members != node])
+
+    def record_friendship(self, user_id, other_id, added=True):
+        """Adds or removes a friendship without reloading the graph."""
+        if user_id == other_id:
+            return
+        # Load first so a later load does not drop the change
+        self._ensure_loaded()
+        with self._lock:
+            a, b = self._users.add(user_id), self._users.add(other_id)
+            self._friends.change(a, b, added)
+            self._friends.change(b, a, added)
+            self._compact_if_needed()
+
+    def record_membership(self, user_id, group_id, joined=True):
+        """Adds or removes a group membership without reloading the graph."""
+        self._ensure_loaded()
+        with self._lock:
+            user, group = self._users.add(user_id), self._groups.add(group_id)
+            self._groups_of.change(user, group, joined)
+            self._members.change(group, user, joined)
+            self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        if self._friends.pending + self._groups_of.pending > COMPACT_AFTER:
+            self._friends = self._friends.compacted(len(self._users))
+            self._groups_of = self._groups_of.compacted(len(self._users))
+            self._members = self._members.compacted(len(self._groups))
+
+    def clear(self):
+        with self._lock:
+            self._users, self._groups = Interner(fold_case=True), Interner()
+            self._friends, self._groups_of, self._members = Relation(), Relation(), Relation()
+            self._loaded_until = 0.0
+
+
+def _columns(edges):
+    """Splits a list of (source, target) pairs into two sequences."""
+    if not edges:
+        return (), ()
+    sources, targets = zip(*edges)
+    return sources, targets
+
+
+_graph = SocialGraph(fetch_edges)
+
+
+def get_friends(user_id):
+    """Returns a user's friends' ids from the social graph."""
+    return _graph.friends_of(user_id)
+
+
+def get_mutual_friend_count(user_id, other_id):
+    return _graph.mutual_friend_count(user_id, other_id)
+
+
+def suggest_friends(user_id, k=DEFAULT_SUGGESTIONS):
+    """Returns up to k (user_id, mutual friend count) friend suggestions."""
+    return _graph.suggest_friends(user_id, k)
+
+
+def get_co_members(user_id):
+    """Returns the ids of users sharing a group with the user."""
+    return _graph.co_members(user_id)
+
+
+def record_friendship(user_id, other_id, added=True):
+    _graph.record_friendship(user_id, other_id, added)
+
+
+def record_membership(user_id, group_id, joined=True):
+    _graph.record_membership(user_id, group_id, joined)
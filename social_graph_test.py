@@ -0,0 +1,71 @@
+#############################################################################
+# social_graph_test.py
+#
+# This file contains tests for social_graph.py.
+#############################################################################
+import unittest
+from unittest.mock import MagicMock, patch
+
+import social_graph
+from social_graph import SocialGraph
+
+FRIENDSHIPS = [('ana', 'ben'), ('ben', 'cam'), ('dee', 'ana'), ('dee', 'cam'), ('cam', 'eli')]
+MEMBERSHIPS = [('ana', 'cycling'), ('fay', 'cycling'), ('ben', 'yoga'), ('ana', 'yoga')]
+
+
+class TestSocialGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = MagicMock(return_value=(FRIENDSHIPS, MEMBERSHIPS))
+        self.graph = SocialGraph(self.fetch)
+
+    def test_friendships_are_symmetric(self):
+        self.assertEqual(self.graph.friends_of('ana'), ['ben', 'dee'])
+        self.assertEqual(self.graph.friends_of('cam'), ['ben', 'dee', 'eli'])
+        self.assertEqual(self.graph.friends_of('nobody'), [])
+
+    def test_mutual_friends_and_suggestions(self):
+        self.assertEqual(self.graph.mutual_friend_count('ana', 'cam'), 2)
+        # cam is reachable through ben and dee; ana's own friends are excluded
+        self.assertEqual(self.graph.suggest_friends('ana'), [('cam', 2)])
+        self.assertEqual(self.graph.suggest_friends('eli'), [('ben', 1), ('dee', 1)])
+
+    def test_co_members(self):
+        self.assertEqual(self.graph.co_members('ana'), ['ben', 'fay'])
+        self.assertEqual(self.graph.co_members('eli'), [])
+
+    def test_user_ids_match_case_insensitively(self):
+        graph = SocialGraph(MagicMock(return_value=([('Ana', 'ben')], [('ANA', 'cycling'), ('fay', 'cycling')])))
+
+        self.assertEqual(graph.friends_of('ana'), ['ben'])
+        self.assertEqual(graph.friends_of('BEN'), ['Ana'])
+        self.assertEqual(graph.co_members('ana'), ['fay'])
+
+    def test_graph_is_loaded_once(self):
+        self.graph.friends_of('ana')
+        self.graph.co_members('ben')
+        self.fetch.assert_called_once()
+
+    def test_incremental_changes(self):
+        self.graph.record_friendship('ana', 'cam')
+        self.graph.record_friendship('ana', 'ben', added=False)
+        self.graph.record_membership('gus', 'cycling')
+        self.graph.record_membership('ana', 'yoga', joined=False)
+
+        self.assertEqual(self.graph.friends_of('ana'), ['cam', 'dee'])
+        self.assertEqual(self.graph.friends_of('ben'), ['cam'])
+        self.assertEqual(self.graph.co_members('ana'), ['fay', 'gus'])
+        self.fetch.assert_called_once()
+
+    def test_compaction_keeps_changes(self):
+        with patch.object(social_graph, 'COMPACT_AFTER', 0):
+            self.graph.friends_of('ana')
+            self.graph.record_friendship('eli', 'fay')
+            self.graph.record_friendship('cam', 'eli', added=False)
+
+        self.assertEqual(self.graph.friends_of('eli'), ['fay'])
+        self.assertEqual(self.graph.friends_of('cam'), ['ben', 'dee'])
+
+
+if __name__ == '__main__':
+    unittest.main()
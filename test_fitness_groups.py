@@ -52,12 +52,51 @@ class TestFitnessGroups(unittest.TestCase):
             'MaxParticipants': [10]
         })
 
+    def status_rows(self, is_creator, attending):
+        return [MagicMock(
+            EventId='event1',
+            CreatorId=self.user_id if is_creator else 'user1',
+            MaxParticipants=10,
+            attendees=[self.user_id] if attending else ['user2'],
+            waitlist=[],
+        )]
+
     @patch('google.cloud.bigquery.Client')
     def test_display_fitness_groups_no_groups(self, mock_client):
         mock_client.return_value.query.return_value.to_dataframe.return_value = pd.DataFrame()
         result = display_fitness_groups(self.user_id)
         self.assertEqual(mock_client.return_value.query.call_count, 2)
 
+    @patch('google.cloud.bigquery.Client')
+    def test_display_fitness_groups_reads_catalog_once(self, mock_client):
+        mock_client.return_value.query.return_value.to_dataframe.return_value = pd.DataFrame()
+        display_fitness_groups(self.user_id)
+        display_fitness_groups(self.user_id)
+        # The catalog comes from the read cache on the second render; only
+        # the user's joined groups are queried again
+        self.assertEqual(mock_client.return_value.query.call_count, 3)
+
+    @patch('fitness_groups.get_recommended_groups', return_value=[('group2', 0.5)])
+    @patch('group_calendar.prefetch_month')
+    @patch('streamlit.image')
+    @patch('streamlit.button', return_value=False)
+    @patch('google.cloud.bigquery.Client')
+    def test_display_fitness_groups_counts_in_one_round_trip(self, mock_client, mock_button, mock_image, mock_prefetch, mock_recommended):
+        mock_client.return_value.query.side_effect = [
+            MagicMock(to_dataframe=MagicMock(return_value=self.mock_all_groups)),
+            MagicMock(to_dataframe=MagicMock(return_value=self.mock_joined_groups)),
+            MagicMock(result=MagicMock(return_value=[])),
+            MagicMock(result=MagicMock(return_value=[])),
+        ]
+        display_fitness_groups(self.user_id)
+
+        # Groups, joined groups and the calendar month (events and recurring
+        # rules); member counts come back with the group queries rather than
+        # one COUNT(*) per group
+        self.assertEqual(mock_client.return_value.query.call_count, 4)
+        for call in mock_client.return_value.query.call_args_list[:2]:
+            self.assertIn("GROUP BY GroupId", call.args[0])
+
     @patch('google.cloud.bigquery.Client')
     def test_display_fitness_groups_error_handling(self, mock_client):
         mock_client.return_value.query.side_effect = Exception("BigQuery error")
@@ -83,8 +122,8 @@ class TestFitnessGroups(unittest.TestCase):
             MagicMock(to_dataframe=MagicMock(return_value=group_df)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_members)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_workouts)),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'is_creator': [True]}))),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'has_rsvp': [False]}))),
+            MagicMock(result=MagicMock(return_value=[])),  # recurring workout rules
+            MagicMock(result=MagicMock(return_value=self.status_rows(is_creator=True, attending=False))),
         ]
 
         result = display_group_page('group1', self.user_id)
@@ -116,8 +155,8 @@ class TestFitnessGroups(unittest.TestCase):
             MagicMock(to_dataframe=MagicMock(return_value=group_df)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_members)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_workouts)),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'is_creator': [False]}))),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'has_rsvp': [True]}))),
+            MagicMock(result=MagicMock(return_value=[])),  # recurring workout rules
+            MagicMock(result=MagicMock(return_value=self.status_rows(is_creator=False, attending=True))),
         ]
 
         result = display_group_page('group1', self.user_id)
@@ -143,8 +182,8 @@ class TestFitnessGroups(unittest.TestCase):
             MagicMock(to_dataframe=MagicMock(return_value=group_df)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_members)),
             MagicMock(to_dataframe=MagicMock(return_value=self.mock_workouts)),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'is_creator': [False]}))),
-            MagicMock(to_dataframe=MagicMock(return_value=pd.DataFrame({'has_rsvp': [True]}))),
+            MagicMock(result=MagicMock(return_value=[])),  # recurring workout rules
+            MagicMock(result=MagicMock(return_value=self.status_rows(is_creator=False, attending=True))),
         ]
 
         result = display_group_page('group1', self.user_id)
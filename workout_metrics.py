@@ -0,0 +1,124 @@
+#############################################################################
+# workout_metrics.py
+#
+# This file contains the workout metrics engine. It computes per-workout
+# aggregates (duration, moving time, pace, heart rate, cadence, elevation
+# gain) for a whole list of workouts at once with vectorized pandas/NumPy
+# operations, so a user's full history is summarized in one pass instead of
+# parsing timestamps workout by workout.
+#############################################################################
+
+import numpy as np
+import pandas as pd
+
+from data_fetcher import get_user_workouts, get_user_sensor_samples
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Sensor names as stored in ISE.SensorTypes
+HEART_RATE = "Heart Rate"
+SPEED = "Speed"
+CADENCE = "Cadence"
+ELEVATION = "Elevation"
+
+# A sample counts towards moving time when speed (m/s) is above this.
+MOVING_SPEED_THRESHOLD = 0.5
+# Gaps between samples longer than this (seconds) are treated as pauses.
+MAX_SAMPLE_GAP_S = 10.0
+
+METRIC_COLUMNS = [
+    "duration_s", "moving_time_s", "distance", "steps", "calories_burned",
+    "pace_min_per_km", "avg_heart_rate", "max_heart_rate", "avg_cadence",
+    "elevation_gain",
+]
+
+
+def compute_workout_metrics(workouts, samples=None):
+    """Computes a metrics table for many workouts at once.
+
+    Args:
+        workouts (list): Workout dictionaries as returned by get_user_workouts.
+        samples (DataFrame): Optional long-format sensor samples as returned by
+            get_user_sensor_samples. Sensor-based metrics are NaN without it,
+            and moving time falls back to the total duration.
+
+    Returns:
+        DataFrame: One row per workout, indexed by workout_id, with the
+        columns in METRIC_COLUMNS. Durations are in seconds and pace in
+        minutes per km.
+    """
+    frame = pd.DataFrame(
+        workouts,
+        columns=["workout_id", "start_timestamp", "end_timestamp", "distance", "steps", "calories_burned"],
+    )
+    start = pd.to_datetime(frame["start_timestamp"], format=TIMESTAMP_FORMAT)
+    end = pd.to_datetime(frame["end_timestamp"], format=TIMESTAMP_FORMAT)
+
+    metrics = pd.DataFrame(index=pd.Index(frame["workout_id"], name="workout_id"), columns=METRIC_COLUMNS, dtype=float)
+    metrics["duration_s"] = (end - start).dt.total_seconds().to_numpy()
+    metrics["distance"] = pd.to_numeric(frame["distance"], errors="coerce").to_numpy()
+    metrics["steps"] = pd.to_numeric(frame["steps"], errors="coerce").to_numpy()
+    metrics["calories_burned"] = pd.to_numeric(frame["calories_burned"], errors="coerce").to_numpy()
+    metrics["moving_time_s"] = metrics["duration_s"]
+
+    if samples is not None and not samples.empty:
+        _add_sensor_metrics(metrics, samples)
+
+    distance = metrics["distance"].where(metrics["distance"] > 0)
+    metrics["pace_min_per_km"] = metrics["moving_time_s"] / 60.0 / distance
+    return metrics
+
+
+def _add_sensor_metrics(metrics, samples):
+    """Fills the sensor-based columns of `metrics` from long-format samples."""
+    samples = samples.sort_values(["workout_id", "timestamp"], kind="stable")
+    by_sensor = samples["sensor_type"].astype(str)
+
+    heart_rate = samples[by_sensor == HEART_RATE].groupby("workout_id", observed=True)["value"]
+    metrics["avg_heart_rate"] = heart_rate.mean().reindex(metrics.index)
+    metrics["max_heart_rate"] = heart_rate.max().reindex(metrics.index)
+
+    cadence = samples[by_sensor == CADENCE].groupby("workout_id", observed=True)["value"]
+    metrics["avg_cadence"] = cadence.mean().reindex(metrics.index)
+
+    elevation = samples[by_sensor == ELEVATION]
+    if not elevation.empty:
+        climb = elevation.groupby("workout_id", observed=True)["value"].diff().clip(lower=0)
+        gain = climb.groupby(elevation["workout_id"], observed=True).sum()
+        metrics["elevation_gain"] = gain.reindex(metrics.index)
+
+    speed = samples[by_sensor == SPEED]
+    if not speed.empty:
+        gaps = speed.groupby("workout_id", observed=True)["timestamp"].diff() / 1000.0
+        gaps = gaps.where(gaps <= MAX_SAMPLE_GAP_S, 0.0)
+        moving = gaps.where(speed["value"].to_numpy() > MOVING_SPEED_THRESHOLD, 0.0).fillna(0.0)
+        moving_time = moving.groupby(speed["workout_id"], observed=True).sum().reindex(metrics.index)
+        metrics["moving_time_s"] = moving_time.fillna(metrics["moving_time_s"])
+
+
+def get_workout_metrics(user_id, workout_ids=None):
+    """Returns the metrics table for a user's workouts.
+
+    Workouts come from get_user_workouts and all of their sensor samples
+    are read with a single query.
+
+    Args:
+        user_id (str): The ID of the user.
+        workout_ids (list): Optional; only these workouts are included.
+    """
+    workouts = get_user_workouts(user_id)
+    if workout_ids is not None:
+        wanted = set(workout_ids)
+        workouts = [w for w in workouts if w["workout_id"] in wanted]
+    if not workouts:
+        return compute_workout_metrics([])
+    samples = get_user_sensor_samples(user_id, [w["workout_id"] for w in workouts])
+    return compute_workout_metrics(workouts, samples)
+
+
+def format_duration(seconds):
+    """Formats a duration in seconds as 'X min Y sec'."""
+    if seconds is None or np.isnan(seconds):
+        return "Unknown"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes} min {secs} sec"
@@ -0,0 +1,119 @@
+#############################################################################
+# workout_metrics_test.py
+#
+# This file contains tests for workout_metrics.py.
+#############################################################################
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from workout_metrics import compute_workout_metrics, get_workout_metrics, format_duration
+
+
+def workout(workout_id, start, end, distance=5.0):
+    return {
+        'workout_id': workout_id,
+        'start_timestamp': start,
+        'end_timestamp': end,
+        'distance': distance,
+        'steps': 6000,
+        'calories_burned': 300,
+    }
+
+
+def samples(rows):
+    frame = pd.DataFrame(rows, columns=['workout_id', 'sensor_type', 'timestamp', 'value'])
+    frame['workout_id'] = frame['workout_id'].astype('category')
+    frame['sensor_type'] = frame['sensor_type'].astype('category')
+    return frame
+
+
+class TestComputeWorkoutMetrics(unittest.TestCase):
+
+    def test_duration_and_pace_without_sensors(self):
+        metrics = compute_workout_metrics([
+            workout('w1', '2024-01-01 10:00:00', '2024-01-01 10:30:00', distance=5.0),
+            workout('w2', '2024-01-02 10:00:00', '2024-01-02 10:45:30', distance=0),
+        ])
+
+        self.assertEqual(metrics.loc['w1', 'duration_s'], 1800)
+        self.assertEqual(metrics.loc['w1', 'pace_min_per_km'], 6.0)
+        self.assertEqual(metrics.loc['w2', 'duration_s'], 2730)
+        self.assertTrue(np.isnan(metrics.loc['w2', 'pace_min_per_km']))
+        self.assertTrue(np.isnan(metrics.loc['w1', 'avg_heart_rate']))
+
+    def test_sensor_metrics(self):
+        metrics = compute_workout_metrics(
+            [workout('w1', '2024-01-01 10:00:00', '2024-01-01 10:00:05', distance=0.01)],
+            samples([
+                ('w1', 'Heart Rate', 0, 120.0),
+                ('w1', 'Heart Rate', 1000, 150.0),
+                ('w1', 'Cadence', 0, 80.0),
+                ('w1', 'Cadence', 1000, 90.0),
+                ('w1', 'Elevation', 0, 10.0),
+                ('w1', 'Elevation', 1000, 13.0),
+                ('w1', 'Elevation', 2000, 12.0),
+                ('w1', 'Elevation', 3000, 14.0),
+                # Stopped between 2s and 3s, then a 60s gap (a pause)
+                ('w1', 'Speed', 0, 3.0),
+                ('w1', 'Speed', 1000, 3.0),
+                ('w1', 'Speed', 2000, 3.0),
+                ('w1', 'Speed', 3000, 0.0),
+                ('w1', 'Speed', 63000, 3.0),
+            ]),
+        )
+
+        self.assertEqual(metrics.loc['w1', 'avg_heart_rate'], 135.0)
+        self.assertEqual(metrics.loc['w1', 'max_heart_rate'], 150.0)
+        self.assertEqual(metrics.loc['w1', 'avg_cadence'], 85.0)
+        self.assertEqual(metrics.loc['w1', 'elevation_gain'], 5.0)
+        self.assertEqual(metrics.loc['w1', 'moving_time_s'], 2.0)
+
+    def test_full_history_is_fast(self):
+        workouts = [
+            workout(f'w{i}', '2024-01-01 10:00:00', '2024-01-01 11:00:00') for i in range(5000)
+        ]
+        n = 200000
+        ids = np.repeat([f'w{i}' for i in range(5000)], n // 5000)
+        sensor_samples = pd.DataFrame({
+            'workout_id': pd.Categorical(ids),
+            'sensor_type': pd.Categorical(np.tile(['Heart Rate', 'Speed'], n // 2)),
+            'timestamp': np.arange(n, dtype=np.int64) * 1000,
+            'value': np.random.default_rng(0).uniform(0, 200, n),
+        })
+
+        started = time.perf_counter()
+        metrics = compute_workout_metrics(workouts, sensor_samples)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(metrics), 5000)
+        self.assertLess(elapsed, 1.0)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(3600), "60 min 0 sec")
+        self.assertEqual(format_duration(float('nan')), "Unknown")
+
+
+class TestGetWorkoutMetrics(unittest.TestCase):
+
+    @patch('workout_metrics.get_user_sensor_samples')
+    @patch('workout_metrics.get_user_workouts')
+    def test_one_sample_query_for_selected_workouts(self, mock_workouts, mock_samples):
+        mock_workouts.return_value = [
+            workout('w1', '2024-01-01 10:00:00', '2024-01-01 10:30:00'),
+            workout('w2', '2024-01-02 10:00:00', '2024-01-02 10:30:00'),
+        ]
+        mock_samples.return_value = samples([('w2', 'Heart Rate', 0, 140.0)])
+
+        metrics = get_workout_metrics('user1', ['w2'])
+
+        mock_samples.assert_called_once_with('user1', ['w2'])
+        self.assertListEqual(list(metrics.index), ['w2'])
+        self.assertEqual(metrics.loc['w2', 'avg_heart_rate'], 140.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
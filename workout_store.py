@@ -0,0 +1,109 @@
+#############################################################################
+# workout_store.py
+#
+# This file contains the local workout store behind
+# data_fetcher.get_user_workouts. Instead of re-reading a user's whole
+# workout history on every call, the store keeps each user's workouts in
+# memory together with a high-water mark on StartTimestamp and only asks
+# BigQuery for workouts that started at or after that mark.
+#############################################################################
+
+import threading
+from collections import OrderedDict
+
+# How many users' histories are kept in memory before the least recently
+# used one is dropped (and fully re-read on its next sync).
+MAX_USERS = 256
+
+
+class WorkoutStore:
+    """Per-user workout lists kept up to date with incremental syncs.
+
+    Args:
+        fetch: Callable fetch(user_id, since) returning workout dicts (as
+            produced by get_user_workouts) whose start_timestamp is >= since,
+            or the user's full history when since is None.
+        max_users: Number of users kept in memory.
+
+    Workouts are matched on workout_id, so rows re-read at the high-water
+    mark are not duplicated. Edits to workouts that are older than the mark
+    are not picked up until the user is resynced with full=True.
+    """
+
+    def __init__(self, fetch, max_users=MAX_USERS):
+        self._fetch = fetch
+        self.max_users = max_users
+        self._users = OrderedDict()  # user_id -> {'workouts': [...], 'high_water': str}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Registers listener(user_id, new_workouts, reset, changed), called
+        after every sync that brought in workouts the store had not seen or
+        re-read workouts that differ from the stored copy (e.g. a workout in
+        progress that has since ended). changed is a list of (old, new)
+        workout pairs. reset is True when the user's history was (re)read
+        from scratch, in which case new_workouts is the whole history and
+        changed is empty."""
+        self._listeners.append(listener)
+
+    def sync(self, user_id, full=False):
+        """Fetches the user's new workouts and merges them into the store.
+
+        Returns:
+            list: The workouts that were new to the store.
+        """
+        with self._lock:
+            entry = None if full else self._users.get(user_id)
+            since = entry['high_water'] if entry else None
+
+        fetched = self._fetch(user_id, since)
+
+        with self._lock:
+            entry = None if full else self._users.get(user_id)
+            reset = entry is None
+            known = {w['workout_id']: w for w in entry['workouts']} if entry else {}
+            new_workouts = [w for w in fetched if w['workout_id'] not in known]
+            changed = [
+                (known[w['workout_id']], w) for w in fetched
+                if w['workout_id'] in known and known[w['workout_id']] != w
+            ]
+            known.update((w['workout_id'], w) for w in fetched)
+
+            workouts = sorted(known.values(), key=lambda w: w['start_timestamp'], reverse=True)
+            high_water = workouts[0]['start_timestamp'] if workouts else None
+            self._users[user_id] = {'workouts': workouts, 'high_water': high_water}
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+        if new_workouts or changed or reset:
+            for listener in self._listeners:
+                # A failing listener must not break reading workouts
+                try:
+                    listener(user_id, new_workouts, reset, changed)
+                except Exception as e:
+                    print(f"Workout store listener failed for {user_id}: {e}")
+        return new_workouts
+
+    def get(self, user_id):
+        """Syncs the user and returns their workouts, newest first."""
+        self.sync(user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            return list(entry['workouts']) if entry else []
+
+    def high_water(self, user_id):
+        """Returns the newest start_timestamp held for the user (or None)."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            return entry['high_water'] if entry else None
+
+    def forget(self, user_id):
+        """Drops a user's workouts so the next sync re-reads everything."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
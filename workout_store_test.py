@@ -0,0 +1,58 @@
+#############################################################################
+# workout_store_test.py
+#
+# This file contains tests for workout_store.py.
+#############################################################################
+import unittest
+from unittest.mock import MagicMock
+
+from workout_store import WorkoutStore
+
+
+def workout(workout_id, start):
+    return {'workout_id': workout_id, 'start_timestamp': start, 'steps': 100}
+
+
+class TestWorkoutStore(unittest.TestCase):
+
+    def test_first_sync_reads_full_history(self):
+        fetch = MagicMock(return_value=[workout('w2', '2024-01-02 08:00:00'), workout('w1', '2024-01-01 08:00:00')])
+        store = WorkoutStore(fetch)
+
+        result = store.get('user1')
+
+        fetch.assert_called_once_with('user1', None)
+        self.assertEqual([w['workout_id'] for w in result], ['w2', 'w1'])
+        self.assertEqual(store.high_water('user1'), '2024-01-02 08:00:00')
+
+    def test_later_syncs_only_ask_for_newer_workouts(self):
+        fetch = MagicMock(side_effect=[
+            [workout('w1', '2024-01-01 08:00:00')],
+            # The row at the high-water mark comes back again with the new one
+            [workout('w2', '2024-01-03 08:00:00'), workout('w1', '2024-01-01 08:00:00')],
+            [workout('w2', '2024-01-03 08:00:00')],
+        ])
+        store = WorkoutStore(fetch)
+
+        store.get('user1')
+        new_workouts = store.sync('user1')
+
+        fetch.assert_called_with('user1', '2024-01-01 08:00:00')
+        self.assertEqual([w['workout_id'] for w in new_workouts], ['w2'])
+        self.assertEqual([w['workout_id'] for w in store.get('user1')], ['w2', 'w1'])
+
+    def test_full_resync_and_eviction(self):
+        fetch = MagicMock(return_value=[])
+        store = WorkoutStore(fetch, max_users=1)
+
+        store.get('user1')
+        store.get('user2')
+        store.get('user1')
+
+        self.assertEqual(fetch.call_args_list[-1][0], ('user1', None))
+        store.sync('user1', full=True)
+        self.assertEqual(fetch.call_args_list[-1][0], ('user1', None))
+
+
+if __name__ == '__main__':
+    unittest.main()